@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gateway event handling latency while tweets are being published.
+
+Simulates the Discord gateway as a stream of events dispatched every few
+milliseconds and measures how late each event is handled while several
+publishes with slow (blocking) Twitter API calls are in flight.
+
+Two modes are compared:
+    inline    - the blocking API call runs directly inside the coroutine,
+                which is how TwitterPublisher used to behave
+    publisher - TwitterPublisher.publish, which runs API calls on its
+                bounded thread pool
+
+Usage:
+    python benchmarks/bench_event_loop_latency.py [--publishes N] [--api-latency S]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from discopilot.publishers.twitter_publisher import TwitterPublisher
+
+EVENT_INTERVAL = 0.005
+
+
+class BenchConfig:
+    """Minimal stand-in for Config with fake Twitter credentials."""
+
+    twitter_api_key = "key"
+    twitter_api_secret = "secret"
+    twitter_access_token = "token"
+    twitter_access_secret = "token_secret"
+    twitter_bearer_token = "bearer"
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+def make_message():
+    message = MagicMock()
+    message.content = "Benchmark message"
+    message.attachments = []
+    message.embeds = []
+    return message
+
+
+async def gateway_events(duration, lags):
+    """Dispatch a fake gateway event every EVENT_INTERVAL and record lag."""
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    while loop.time() < end:
+        expected = loop.time() + EVENT_INTERVAL
+        await asyncio.sleep(EVENT_INTERVAL)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run(mode, publishes, api_latency):
+    response = MagicMock()
+    response.data = {"id": "1"}
+
+    def create_tweet(**kwargs):
+        time.sleep(api_latency)
+        return response
+
+    publisher = TwitterPublisher(BenchConfig())
+    publisher.api = MagicMock()
+    publisher.client = MagicMock()
+    publisher.client.create_tweet.side_effect = create_tweet
+
+    async def inline_publish(message):
+        return publisher.client.create_tweet(text=message.content)
+
+    publish = publisher.publish if mode == "publisher" else inline_publish
+
+    lags = []
+    duration = api_latency * publishes + 0.1
+    await asyncio.gather(
+        gateway_events(duration, lags),
+        *(publish(make_message()) for _ in range(publishes)),
+    )
+    await publisher.close()
+    return lags
+
+
+def report(mode, lags):
+    lags_ms = sorted(lag * 1000 for lag in lags)
+    p99 = lags_ms[int(len(lags_ms) * 0.99) - 1]
+    print(
+        f"{mode:>9}: events={len(lags_ms):5d} "
+        f"p50={statistics.median(lags_ms):8.2f}ms "
+        f"p99={p99:8.2f}ms max={lags_ms[-1]:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--publishes", type=int, default=4)
+    parser.add_argument("--api-latency", type=float, default=0.25)
+    args = parser.parse_args()
+
+    for mode in ("inline", "publisher"):
+        lags = asyncio.run(run(mode, args.publishes, args.api_latency))
+        report(mode, lags)
+
+
+if __name__ == "__main__":
+    main()
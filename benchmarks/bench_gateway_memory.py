@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resident memory of the gateway client per 1,000 guilds.
+
+Feeds synthetic GUILD_CREATE and MESSAGE_CREATE payloads into discord.py's
+connection state, as the gateway would on startup and under message traffic,
+and reports the growth in RSS. Each mode runs in a fresh interpreter.
+
+Two modes are compared:
+    default    - HedwigBot's default intents and discord.py's default caches
+    low-memory - gateway_options(low_memory=True): trimmed intents, no member,
+                 emoji or discord.py message caching, no startup chunking
+
+Usage:
+    python benchmarks/bench_gateway_memory.py [--guilds N] [--messages N]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+import discord
+
+from discopilot.bot.discord_client import HedwigBot
+
+BOT_ID = 1
+
+# Shape of a typical guild
+TEXT_CHANNELS = 20
+VOICE_CHANNELS = 3
+ROLES = 10
+EMOJIS = 30
+STICKERS = 5
+VOICE_MEMBERS = 5
+
+
+def rss_bytes():
+    """Current resident set size, falling back to the peak off Linux."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def user(user_id):
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "discriminator": "0",
+        "avatar": None,
+        "global_name": None,
+    }
+
+
+def guild_payload(guild_id, intents):
+    """A GUILD_CREATE payload, with only the data the intents subscribe to."""
+    base = guild_id * 1000
+    channels = [
+        {
+            "id": str(base + i),
+            "type": 0,
+            "name": f"channel-{i}",
+            "position": i,
+            "permission_overwrites": [],
+            "topic": "Announcements and discussion",
+        }
+        for i in range(TEXT_CHANNELS)
+    ]
+    voice_ids = [base + 100 + i for i in range(VOICE_CHANNELS)]
+    channels += [
+        {
+            "id": str(channel_id),
+            "type": 2,
+            "name": f"voice-{channel_id}",
+            "position": TEXT_CHANNELS + i,
+            "permission_overwrites": [],
+            "bitrate": 64000,
+            "user_limit": 0,
+        }
+        for i, channel_id in enumerate(voice_ids)
+    ]
+    member_ids = [base + 500 + i for i in range(VOICE_MEMBERS)]
+    members = [
+        {
+            "user": user(member_id),
+            "roles": [],
+            "joined_at": None,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }
+        for member_id in [BOT_ID] + member_ids
+    ]
+
+    data = {
+        "id": str(guild_id),
+        "name": f"guild-{guild_id}",
+        "owner_id": str(BOT_ID),
+        "member_count": 500,
+        "features": [],
+        "channels": channels,
+        "roles": [
+            {
+                "id": str(guild_id if i == 0 else base + 200 + i),
+                "name": f"role-{i}",
+                "permissions": "0",
+                "position": i,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+            for i in range(ROLES)
+        ],
+        "emojis": [
+            {
+                "id": str(base + 300 + i),
+                "name": f"emoji{i}",
+                "roles": [],
+                "require_colons": True,
+                "managed": False,
+                "animated": False,
+                "available": True,
+            }
+            for i in range(EMOJIS)
+        ],
+        "stickers": [
+            {
+                "id": str(base + 400 + i),
+                "name": f"sticker{i}",
+                "tags": "tag",
+                "type": 2,
+                "format_type": 1,
+                "description": "A sticker",
+                "available": True,
+                "guild_id": str(guild_id),
+            }
+            for i in range(STICKERS)
+        ],
+        "members": members,
+    }
+    if intents.voice_states:
+        data["voice_states"] = [
+            {
+                "user_id": str(member_id),
+                "channel_id": str(voice_ids[i % VOICE_CHANNELS]),
+                "session_id": "session",
+                "deaf": False,
+                "mute": False,
+                "self_deaf": False,
+                "self_mute": False,
+                "self_video": False,
+                "suppress": False,
+                "request_to_speak_timestamp": None,
+            }
+            for i, member_id in enumerate(member_ids)
+        ]
+    else:
+        # Without the voice states intent only the bot itself is sent
+        data["members"] = members[:1]
+    return data
+
+
+def message_payload(message_id, guild_id):
+    return {
+        "id": str(message_id),
+        "channel_id": str(guild_id * 1000 + message_id % TEXT_CHANNELS),
+        "guild_id": str(guild_id),
+        "author": user(10_000 + message_id % 50),
+        "content": "Launch announcement! " * 5,
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def measure(low_memory, guilds, messages):
+    """Load the synthetic guilds and messages and return the RSS growth."""
+    before = rss_bytes()
+    client = HedwigBot(token="bench", low_memory=low_memory)
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data=user(BOT_ID))
+
+    for guild_id in range(1, guilds + 1):
+        state._add_guild_from_data(guild_payload(guild_id, state._intents))
+    for message_id in range(messages):
+        state.parse_message_create(message_payload(message_id, message_id % guilds + 1))
+
+    return {
+        "rss": rss_bytes() - before,
+        "guilds": len(client.guilds),
+        "members": sum(len(guild.members) for guild in client.guilds),
+        "emojis": len(client.emojis),
+        "messages": len(client.cached_messages),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--guilds", type=int, default=5_000)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument(
+        "--mode", choices=["default", "low-memory"], help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.mode:
+        result = measure(args.mode == "low-memory", args.guilds, args.messages)
+        print(json.dumps(result))
+        return
+
+    print(f"{args.guilds:,} guilds, {args.messages:,} messages")
+    for mode in ("default", "low-memory"):
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--mode",
+                mode,
+                "--guilds",
+                str(args.guilds),
+                "--messages",
+                str(args.messages),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        per_thousand = result["rss"] / args.guilds * 1000 / 2**20
+        print(
+            f"{mode:>10}: {per_thousand:6.1f} MiB RSS per 1,000 guilds, "
+            f"{result['members']:,} members, {result['emojis']:,} emojis, "
+            f"{result['messages']:,} messages cached"
+        )
+
+
+if __name__ == "__main__":
+    main()
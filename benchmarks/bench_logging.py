@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: event-loop time spent logging on the reaction and publish paths.
+
+Replays the log calls made while handling one reaction and publishing it,
+and measures how long they hold the calling (event loop) thread.
+
+Two modes are compared:
+    before - a synchronous StreamHandler and eager f-strings at INFO, which
+             is how run_bot used to log
+    after  - setup_logging's queue handler and background listener with lazy
+             %-style messages, per-event details at DEBUG
+
+Usage:
+    python benchmarks/bench_logging.py [--events N]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from discopilot.utils.logger import DEFAULT_FORMAT, setup_logging, shutdown_logging
+
+CONTENT = "Launch announcement! " * 20
+RESPONSE = {"data": {"id": "1234567890", "text": CONTENT, "edit_history": ["1"]}}
+
+
+def log_event_before(logger, i):
+    logger.info(f"Raw reaction detected: 📢 by user {i}")
+    logger.info(f"Found message: {i} with content: {CONTENT[:50]}...")
+    logger.info(f"Publishing message {i} from user#{i}")
+    logger.info(f"Message content: {CONTENT[:50]}...")
+    logger.info(f"Message has embeds: {False}")
+    logger.debug(f"Twitter API response: {RESPONSE}")
+    logger.info(f"Tweet posted successfully with ID: {i}")
+    logger.info(f"Published to twitter: {'Success'}")
+
+
+def log_event_after(logger, i):
+    logger.info("Publish triggered by %s from user %s on message %s", "📢", i, i)
+    logger.debug("Found message: %s with content: %.50s...", i, CONTENT)
+    logger.info("Publishing message %s from %s", i, f"user#{i}")
+    logger.debug("Message content: %.50s...", CONTENT)
+    logger.debug("Message has embeds: %s", False)
+    logger.debug("Twitter API response: %s", RESPONSE)
+    logger.info("Tweet posted successfully with ID: %s", i)
+    logger.info("Published to %s: %s", "twitter", "Success")
+
+
+def run(mode, events, output):
+    root = logging.getLogger()
+    if mode == "before":
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        root.handlers[:] = [handler]
+        root.setLevel(logging.INFO)
+        log_event = log_event_before
+    else:
+        setup_logging(logging.INFO, stream=output)
+        log_event = log_event_after
+
+    logger = logging.getLogger("discopilot.bench")
+    start = time.perf_counter()
+    for i in range(events):
+        log_event(logger, i)
+    elapsed = time.perf_counter() - start
+
+    # Writing out the queue happens off the event loop and isn't counted
+    shutdown_logging()
+    root.handlers[:] = []
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{args.events:,} reactions published")
+    for mode in ("before", "after"):
+        with tempfile.TemporaryFile("w") as output:
+            elapsed = run(mode, args.events, output)
+        per_event = elapsed / args.events * 1e6
+        print(
+            f"{mode:>7}: {elapsed:6.3f}s on the event loop, {per_event:6.1f} us/event"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of deciding whether a reaction triggers publishing.
+
+Generates synthetic raw reaction payloads, almost all of them irrelevant as
+in a large guild, and times how long it takes to filter them.
+
+Two modes are compared:
+    legacy   - the checks HedwigBot used to run: an f-string log line for
+               every reaction, str() of the emoji and linear list membership
+    compiled - ReactionFilter.match
+
+Usage:
+    python benchmarks/bench_reaction_filter.py [--payloads N] [--hit-rate R]
+"""
+
+import argparse
+import logging
+import random
+import time
+
+import discord
+
+from discopilot.bot.reaction_filter import ReactionFilter
+
+logger = logging.getLogger("bench")
+
+TRIGGER = "📢"
+NOISE_EMOJIS = ["👍", "❤️", "😂", "🎉", "👀", "<:pepe:123456789012345678>"]
+
+
+class Payload:
+    """Lightweight stand-in for discord.RawReactionActionEvent."""
+
+    __slots__ = ("emoji", "user_id", "guild_id", "channel_id", "message_id")
+
+    def __init__(self, emoji, user_id, guild_id, channel_id):
+        self.emoji = emoji
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = 1
+
+
+def make_payloads(count, hit_rate, admin_ids, server_ids, channel_ids):
+    rng = random.Random(0)
+    trigger = discord.PartialEmoji.from_str(TRIGGER)
+    noise = [discord.PartialEmoji.from_str(emoji) for emoji in NOISE_EMOJIS]
+    payloads = []
+    for _ in range(count):
+        emoji = trigger if rng.random() < hit_rate else rng.choice(noise)
+        payloads.append(
+            Payload(
+                emoji,
+                rng.choice(admin_ids + [rng.randrange(10**6)]),
+                rng.choice(server_ids),
+                rng.choice(channel_ids + [rng.randrange(10**6)]),
+            )
+        )
+    return payloads
+
+
+def legacy_match(payload, trigger_emoji, admin_ids, server_ids, channel_ids):
+    logger.info(f"Raw reaction detected: {payload.emoji} by user {payload.user_id}")
+    if str(payload.emoji) != trigger_emoji:
+        return False
+    if admin_ids and payload.user_id not in admin_ids:
+        return False
+    if server_ids and payload.guild_id not in server_ids:
+        return False
+    if channel_ids and payload.channel_id not in channel_ids:
+        return False
+    return True
+
+
+def run(mode, payloads, admin_ids, server_ids, channel_ids):
+    if mode == "legacy":
+        start = time.perf_counter()
+        matched = sum(
+            legacy_match(p, TRIGGER, admin_ids, server_ids, channel_ids)
+            for p in payloads
+        )
+    else:
+        match = ReactionFilter([TRIGGER], admin_ids, server_ids, channel_ids).match
+        start = time.perf_counter()
+        matched = sum(match(p)[0] for p in payloads)
+    elapsed = time.perf_counter() - start
+    return elapsed, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--payloads", type=int, default=2_000_000)
+    parser.add_argument("--hit-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    # Same shape as a busy deployment: a few admins, many watched channels
+    admin_ids = list(range(1000, 1020))
+    server_ids = list(range(100, 150))
+    channel_ids = list(range(5000, 5200))
+    payloads = make_payloads(
+        args.payloads, args.hit_rate, admin_ids, server_ids, channel_ids
+    )
+
+    # INFO is enabled in production, but keep the benchmark's output quiet
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{args.payloads:,} payloads, trigger hit rate {args.hit_rate:.2%}")
+    for mode in ("legacy", "compiled"):
+        elapsed, matched = run(mode, payloads, admin_ids, server_ids, channel_ids)
+        per_payload = elapsed / args.payloads * 1e9
+        print(
+            f"{mode:>9}: {elapsed:6.2f}s total, {per_payload:7.1f} ns/payload, "
+            f"{matched} matched"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time importing DiscoPilot adds to cold start.
+
+Each run imports the bot's modules in a fresh interpreter, after discord.py
+itself, and reports how long they took and whether the publisher SDKs were
+loaded with them. Publisher SDKs such as tweepy should only be imported once
+a publisher is created.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules that should only be imported once a publisher is used
+LAZY_MODULES = ["tweepy", "requests_oauthlib", "pkg_resources"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+import discord
+start = time.perf_counter()
+import discopilot.bot
+import discopilot.publishers
+import discopilot.utils
+import discopilot.scripts.run_bot
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_once():
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    reports = [run_once() for _ in range(args.runs)]
+    times = [report["elapsed"] * 1000 for report in reports]
+    loaded = sorted(
+        {
+            module
+            for report in reports
+            for module in LAZY_MODULES
+            if module in report["modules"]
+        }
+    )
+
+    print(f"{args.runs} cold imports after discord.py")
+    print(f" median: {statistics.median(times):7.1f} ms")
+    print(f"    min: {min(times):7.1f} ms")
+    print(f"    max: {max(times):7.1f} ms")
+    print(f"modules: {len(reports[-1]['modules'])} loaded")
+    print(f"   SDKs: {', '.join(loaded) if loaded else 'none loaded'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,6 @@ Discord bot module.
 
 # Import the Discord client
 from .discord_client import HedwigBot
+from .sharded_client import ShardedHedwigBot
 
-__all__ = ["HedwigBot"]
+__all__ = ["HedwigBot", "ShardedHedwigBot"]
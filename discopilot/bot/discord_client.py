@@ -1,13 +1,68 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 import discord
 from discord import RawReactionActionEvent
 
-from ..publishers.base_publisher import BasePublisher
+from ..publishers.base_publisher import BasePublisher, run_publisher
+from ..utils.config import Config, ConfigReloader
+from ..utils.media import MediaDownloader
+from ..utils.rate_limiter import RateLimitExceeded
+from .idempotency import IdempotencyIndex
+from .message_cache import DEFAULT_MAX_MESSAGES, MessageCache
+from .outbox import Outbox
+from .publish_queue import (
+    DEFAULT_MAX_QUEUE_SIZE,
+    DEFAULT_WORKERS,
+    PublishJob,
+    PublishQueue,
+)
+from .publisher_pool import ProcessPublisherPool
+from .reaction_filter import PublisherScopes, ReactionFilter
 
 logger = logging.getLogger(__name__)
 
+# Seconds a single publisher may take before it is cancelled
+DEFAULT_PUBLISH_TIMEOUT = 120.0
+
+
+def gateway_options(low_memory: bool = False) -> Dict:
+    """
+    Get the discord.py client options for the gateway connection.
+
+    The low-memory profile subscribes only to the events the bot uses:
+    guilds (for the channel cache), guild reactions, and guild messages with
+    their content (for cache eviction on edits and deletes, and to read
+    fetched messages). Members, emojis, stickers and voice states aren't
+    cached, guilds aren't chunked at startup, and discord.py's own message
+    cache is disabled since MessageCache keeps the messages that are fetched.
+
+    Args:
+        low_memory: Use the low-memory profile
+
+    Returns:
+        Dict: Keyword arguments for discord.Client
+    """
+    if not low_memory:
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.reactions = True
+        intents.guilds = True
+        return {"intents": intents}
+
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.guild_reactions = True
+    intents.message_content = True
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": None,
+    }
+
 
 class HedwigBot(discord.Client):
     """Discord client for the DiscoPilot bot."""
@@ -20,15 +75,26 @@ class HedwigBot(discord.Client):
         channel_ids: Optional[List[int]] = None,
         trigger_emoji: str = "📢",
         send_notifications: bool = False,
+        publish_timeout: float = DEFAULT_PUBLISH_TIMEOUT,
+        downloader: Optional[MediaDownloader] = None,
+        publish_workers: int = DEFAULT_WORKERS,
+        publish_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        outbox: Optional[Outbox] = None,
+        idempotency: Optional[IdempotencyIndex] = None,
+        message_cache_size: int = DEFAULT_MAX_MESSAGES,
+        reaction_rules: Optional[List[Dict]] = None,
+        publisher_scopes: Optional[PublisherScopes] = None,
+        config_reloader: Optional[ConfigReloader] = None,
+        publisher_pool: Optional[ProcessPublisherPool] = None,
+        low_memory: bool = False,
         *args,
         **kwargs,
     ):
         """Initialize the Discord client."""
-        intents = discord.Intents.default()
-        intents.message_content = True
-        intents.reactions = True
-        intents.guilds = True
-        super().__init__(intents=intents, *args, **kwargs)
+        # Explicit discord.py options take precedence over the profile
+        options = gateway_options(low_memory)
+        options.update(kwargs)
+        super().__init__(*args, **options)
 
         self.token = token
         self.server_ids = server_ids or []
@@ -36,99 +102,265 @@ class HedwigBot(discord.Client):
         self.channel_ids = channel_ids or []
         self.trigger_emoji = trigger_emoji
         self.send_notifications = send_notifications
+        self.publish_timeout = publish_timeout
         self.publishers: Dict[str, BasePublisher] = {}
 
-        logger.info(f"Initialized Discord client with trigger emoji: {trigger_emoji}")
-        logger.info(f"Trigger emoji repr: {repr(trigger_emoji)}")
-        logger.info(f"Trigger emoji bytes: {trigger_emoji.encode('utf-8').hex()}")
-        logger.info(f"Send notifications: {send_notifications}")
+        # Compiled once so irrelevant reactions are rejected cheaply
+        self.reaction_filter = ReactionFilter(
+            [trigger_emoji],
+            admin_ids=self.admin_ids,
+            server_ids=self.server_ids,
+            channel_ids=self.channel_ids,
+            rules=reaction_rules,
+            publisher_scopes=publisher_scopes,
+        )
+
+        # Attachment downloads share one pooled session owned by the bot
+        self.downloader = downloader or MediaDownloader()
+
+        # Reactions enqueue jobs; a pool of workers fetches and publishes them.
+        # With an outbox, jobs are persisted so they survive restarts. Workers
+        # wait for the gateway to be ready, as jobs replayed from the outbox
+        # need the channel cache.
+        self.publish_queue = PublishQueue(
+            self.process_job,
+            workers=publish_workers,
+            max_size=publish_queue_size,
+            outbox=outbox,
+            ready=self.wait_until_ready,
+        )
+
+        # Remembers where each message was published so it isn't published twice
+        self.idempotency = idempotency or IdempotencyIndex(path=None)
+
+        # Serves triggered messages from memory before falling back to REST
+        self.message_cache = MessageCache(
+            self._get_cached_message, max_size=message_cache_size
+        )
+
+        # With a pool, publishers run in worker processes instead of this one
+        self.publisher_pool = publisher_pool
+
+        # Applies configuration changes without reconnecting to the gateway
+        self.config_reloader = config_reloader
+        if config_reloader is not None:
+            config_reloader.subscribe(self.apply_config)
+
+        logger.info("Initialized Discord client with trigger emoji: %s", trigger_emoji)
+        logger.info("Trigger emoji repr: %s", repr(trigger_emoji))
+        logger.info("Trigger emoji bytes: %s", trigger_emoji.encode("utf-8").hex())
+        logger.info("Send notifications: %s", send_notifications)
 
         if server_ids:
-            logger.info(f"Listening to server IDs: {', '.join(map(str, server_ids))}")
+            logger.info("Listening to server IDs: %s", ", ".join(map(str, server_ids)))
         else:
             logger.info("Listening to all servers")
 
         if admin_ids:
-            logger.info(f"Admin IDs: {', '.join(map(str, admin_ids))}")
+            logger.info("Admin IDs: %s", ", ".join(map(str, admin_ids)))
         else:
             logger.warning("No admin IDs configured - anyone can trigger publishing")
 
         if channel_ids:
-            logger.info(f"Listening to channel IDs: {', '.join(map(str, channel_ids))}")
+            logger.info(
+                "Listening to channel IDs: %s", ", ".join(map(str, channel_ids))
+            )
         else:
             logger.info("Listening to all channels")
 
+    async def setup_hook(self):
+        """Start background services once the event loop is running."""
+        await self.downloader.start()
+        await self.idempotency.open()
+        for publisher in self.publishers.values():
+            await publisher.start()
+        if self.publisher_pool is not None:
+            await self.publisher_pool.start()
+        await self.publish_queue.start()
+        if self.config_reloader is not None:
+            await self.config_reloader.start()
+
+    def apply_config(self, config: Config):
+        """
+        Switch to the trigger and allow-list settings of a new config snapshot.
+
+        The new filter is built before anything is replaced, and the swap
+        happens without yielding to the event loop, so each reaction is
+        matched entirely against either the old or the new settings. The
+        gateway connection is left alone; changing the token or the publish
+        worker settings still needs a restart.
+
+        Args:
+            config: The new configuration snapshot
+        """
+        reaction_filter = ReactionFilter(
+            [config.trigger_emoji],
+            admin_ids=config.admin_ids,
+            server_ids=config.server_ids,
+            channel_ids=config.allowed_channel_ids,
+            rules=config.trigger_rules,
+            publisher_scopes=config.publisher_scopes,
+        )
+
+        self.server_ids = list(config.server_ids)
+        self.admin_ids = list(config.admin_ids)
+        self.channel_ids = list(config.allowed_channel_ids)
+        self.trigger_emoji = config.trigger_emoji
+        self.send_notifications = config.send_notifications
+        self.publish_timeout = config.publish_timeout
+        self.reaction_filter = reaction_filter
+
+        if config.discord_token != self.token:
+            logger.warning("Discord token changed; restart the bot to use it")
+        logger.info(
+            "Applied configuration: trigger %s, %d servers, %d channels, %d admins",
+            self.trigger_emoji,
+            len(self.server_ids),
+            len(self.channel_ids),
+            len(self.admin_ids),
+        )
+
     async def on_ready(self):
         """Handle the bot being ready."""
-        logger.info(f"Logged in as {self.user.name} ({self.user.id})")
-        logger.info(f"Bot is in {len(self.guilds)} servers")
+        logger.info("Logged in as %s (%s)", self.user.name, self.user.id)
+        logger.info("Bot is in %s servers", len(self.guilds))
         for guild in self.guilds:
-            logger.info(f"- {guild.name} (ID: {guild.id})")
+            logger.info("- %s (ID: %s)", guild.name, guild.id)
 
     async def on_raw_reaction_add(self, payload: RawReactionActionEvent):
         """Handle raw reaction add event."""
-        logger.info(f"Raw reaction detected: {payload.emoji} by user {payload.user_id}")
-
-        # Check if the emoji matches our trigger
-        if str(payload.emoji) != self.trigger_emoji:
-            logger.debug(
-                f"Emoji {payload.emoji} doesn't match trigger {self.trigger_emoji}"
-            )
+        accepted, publishers = self.reaction_filter.match(payload)
+        if not accepted:
             return
 
-        # Check if user is an admin (if admin_ids is set)
-        if self.admin_ids and payload.user_id not in self.admin_ids:
-            logger.warning(
-                f"User {payload.user_id} tried to publish but is not an admin"
-            )
-            return
+        logger.info(
+            "Publish triggered by %s from user %s on message %s",
+            payload.emoji,
+            payload.user_id,
+            payload.message_id,
+        )
 
-        # Check if message is in a server we're listening to
-        if self.server_ids and payload.guild_id not in self.server_ids:
-            logger.warning(
-                f"Message is in server {payload.guild_id} which is not in the allowed list"
-            )
+        # Skip messages that were already published everywhere
+        if self.idempotency.is_published(
+            payload.message_id, self._select_publishers(publishers)
+        ):
+            logger.info("Message %s was already published", payload.message_id)
             return
 
-        # Check if message is in a channel we're listening to
-        if self.channel_ids and payload.channel_id not in self.channel_ids:
-            logger.warning(
-                f"Message is in channel {payload.channel_id} which is not in the allowed list"
+        # Hand the job to the publish workers so the gateway handler returns fast
+        await self.publish_queue.enqueue(
+            PublishJob(
+                message_id=payload.message_id,
+                channel_id=payload.channel_id,
+                guild_id=payload.guild_id,
+                user_id=payload.user_id,
+                publishers=sorted(publishers) if publishers is not None else None,
             )
-            return
+        )
+
+    @property
+    def publisher_names(self) -> List[str]:
+        """Names of the publishers, whether in this process or in the pool."""
+        if self.publisher_pool is not None:
+            return list(self.publisher_pool.publisher_names)
+        return list(self.publishers)
 
-        # Get the channel and message
-        channel = self.get_channel(payload.channel_id)
-        if not channel:
-            logger.error(f"Could not find channel {payload.channel_id}")
+    def _select_publishers(self, publishers: Optional[Iterable[str]]) -> List[str]:
+        """Get the configured publishers out of a subset, or all if None."""
+        if publishers is None:
+            return self.publisher_names
+        return [name for name in self.publisher_names if name in publishers]
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """Drop edited messages from the message cache."""
+        self.message_cache.evict(payload.message_id)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """Drop deleted messages from the message cache."""
+        self.message_cache.evict(payload.message_id)
+
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
+        """Drop bulk-deleted messages from the message cache."""
+        self.message_cache.evict_many(payload.message_ids)
+
+    def _get_cached_message(self, message_id: int) -> Optional[discord.Message]:
+        """Look up a message in discord.py's own message cache."""
+        return discord.utils.get(self.cached_messages, id=message_id)
+
+    async def process_job(self, job: PublishJob):
+        """
+        Fetch the message for a queued job and publish it.
+
+        Errors propagate to the publish queue, which logs them and counts the
+        job as failed, so a job whose channel can't be found is retried.
+
+        Args:
+            job: The job taken from the publish queue
+        """
+        channel = self.get_channel(job.channel_id)
+        if channel is None:
+            # Not cached, e.g. a thread; raises if it can't be fetched either
+            channel = await self.fetch_channel(job.channel_id)
+
+        # Only one job may publish a given message at a time
+        if not self.idempotency.claim(job.message_id):
+            logger.info("Message %s is already being published", job.message_id)
             return
 
         try:
-            message = await channel.fetch_message(payload.message_id)
-            logger.info(
-                f"Found message: {message.id} with content: {message.content[:50]}..."
+            publishers = await self.idempotency.unpublished(
+                job.message_id, self._select_publishers(job.publishers)
+            )
+            if not publishers:
+                logger.info("Message %s was already published", job.message_id)
+                return
+
+            message = await self.message_cache.get(channel, job.message_id)
+            logger.debug(
+                "Found message: %s with content: %.50s...", message.id, message.content
             )
 
             # Process the message
-            await self.publish_message(message)
-        except Exception as e:
-            logger.error(f"Error fetching or publishing message: {e}", exc_info=True)
+            results = await self.publish_message(message, publishers)
+            retry_after = 0.0
+            for name, result in results.items():
+                if result["status"] == "Success":
+                    await self.idempotency.record(job.message_id, name, result["url"])
+                elif result.get("retry_after"):
+                    retry_after = max(retry_after, result["retry_after"])
 
-    async def publish_message(self, message):
-        """Publish a message to all configured platforms."""
-        logger.info(f"Publishing message {message.id} from {message.author}")
+            # Rate-limited platforms are retried once their limit resets; the
+            # idempotency index keeps the others from being published again
+            if retry_after:
+                raise RateLimitExceeded(retry_after)
+        finally:
+            self.idempotency.release(job.message_id)
 
-        results = {}
+    async def publish_message(
+        self, message, publishers: Optional[Iterable[str]] = None
+    ):
+        """
+        Publish a message to the configured platforms concurrently.
 
-        for name, publisher in self.publishers.items():
-            try:
-                logger.info(f"Publishing to {name}...")
-                status, url = await publisher.publish(message)
-                results[name] = {"status": status, "url": url}
-                logger.info(f"Published to {name}: {status}")
-            except Exception as e:
-                logger.error(f"Error publishing to {name}: {e}", exc_info=True)
-                results[name] = {"status": f"Error: {str(e)}", "url": None}
+        Args:
+            message: The Discord message to publish
+            publishers: Names of the publishers to use; defaults to all of them
+
+        Returns:
+            Dict: The status and URL of the post on each platform
+        """
+        logger.info("Publishing message %s from %s", message.id, message.author)
+
+        names = list(self.publisher_names if publishers is None else publishers)
+        if self.publisher_pool is not None:
+            results = await self.publisher_pool.publish(message, names)
+        else:
+            outcomes = await asyncio.gather(
+                *(self._publish_to(name, message) for name in names)
+            )
+            results = dict(zip(names, outcomes))
 
         # Format results message
         result_lines = ["Publishing results:"]
@@ -149,10 +381,42 @@ class HedwigBot(discord.Client):
 
         return results
 
+    async def _publish_to(self, name: str, message) -> Dict:
+        """
+        Publish a message to a single platform, bounded by its timeout.
+
+        Args:
+            name: The name of the publisher
+            message: The Discord message to publish
+
+        Returns:
+            Dict: The publishing status and URL for this platform
+        """
+        publisher = self.publishers[name]
+        timeout = publisher.publish_timeout or self.publish_timeout
+        return await run_publisher(name, publisher, message, timeout)
+
     def add_publisher(self, name: str, publisher: BasePublisher):
         """Add a publisher to the client."""
         self.publishers[name] = publisher
-        logger.info(f"Added publisher: {name}")
+        publisher.downloader = self.downloader
+        logger.info("Added publisher: %s", name)
+
+    async def close(self):
+        """Close the Discord connection and release publisher resources."""
+        if self.config_reloader is not None:
+            await self.config_reloader.stop()
+        await self.publish_queue.stop()
+        if self.publisher_pool is not None:
+            await self.publisher_pool.stop()
+        await self.idempotency.close()
+        for name, publisher in self.publishers.items():
+            try:
+                await publisher.close()
+            except Exception as e:
+                logger.error("Error closing publisher %s: %s", name, e, exc_info=True)
+        await self.downloader.close()
+        await super().close()
 
     def run_bot(self):
         """Run the bot."""
@@ -0,0 +1,229 @@
+"""
+Idempotency index that remembers which messages were published where.
+
+Lookups on the reaction hot path only touch an in-memory LRU, so they are
+O(1) and never block on I/O. Workers fall back to the persistent SQLite store
+for messages that have been evicted from the LRU before publishing.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.local/share/discopilot/published.db")
+
+# Number of messages kept in the in-memory LRU
+DEFAULT_CACHE_SIZE = 10000
+
+# Days after which a publish is forgotten and the message may be published again
+DEFAULT_RETENTION_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS published (
+    message_id INTEGER NOT NULL,
+    publisher TEXT NOT NULL,
+    url TEXT,
+    published_at REAL NOT NULL,
+    PRIMARY KEY (message_id, publisher)
+);
+CREATE INDEX IF NOT EXISTS published_at ON published (published_at);
+"""
+
+
+class IdempotencyIndex:
+    """Tracks published (message, publisher) pairs to prevent republishing."""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_INDEX_PATH,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            path: Path to the SQLite database, or None to keep the index in memory
+            cache_size: Number of messages kept in the in-memory LRU
+            retention_days: Days after which a publish is forgotten
+            clock: Function returning the current wall-clock time
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.retention = retention_days * 24 * 60 * 60
+        self.clock = clock
+
+        # message_id -> {publisher: published_at}, least recently used first
+        self._cache: "OrderedDict[int, Dict[str, float]]" = OrderedDict()
+        # Messages currently being published by a worker
+        self._claimed: Set[int] = set()
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def open(self):
+        """Open the persistent store, prune old entries and warm the LRU."""
+        if self.path is None or self._conn is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="discopilot-idempotency"
+        )
+        rows = await self._run(self._open_store)
+        # Rows are newest first; insert oldest first so the newest are kept
+        for message_id, publisher, published_at in reversed(rows):
+            self._remember(message_id, publisher, published_at)
+        logger.info("Loaded %s published messages from %s", len(self._cache), self.path)
+
+    def _open_store(self) -> List[tuple]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        cutoff = self.clock() - self.retention
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM published WHERE published_at < ?", (cutoff,)
+            )
+        return self._conn.execute(
+            "SELECT message_id, publisher, published_at FROM published "
+            "ORDER BY published_at DESC LIMIT ?",
+            (self.cache_size,),
+        ).fetchall()
+
+    async def close(self):
+        """Close the persistent store."""
+        if self._conn is None:
+            return
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=True)
+        self._conn = None
+        self._executor = None
+
+    def is_published(self, message_id: int, publishers: Iterable[str]) -> bool:
+        """
+        Check the in-memory LRU for whether a message was published everywhere.
+
+        This never touches the persistent store, so it is safe to call for
+        every reaction. A False result may be refined later by unpublished().
+
+        Args:
+            message_id: The Discord message ID
+            publishers: Names of the publishers the message would go to
+
+        Returns:
+            bool: True if every publisher is known to have published the message
+        """
+        entry = self._cache.get(message_id)
+        if entry is None:
+            return False
+        self._cache.move_to_end(message_id)
+        cutoff = self.clock() - self.retention
+        for publisher in publishers:
+            published_at = entry.get(publisher)
+            if published_at is None or published_at < cutoff:
+                return False
+        return True
+
+    async def unpublished(
+        self, message_id: int, publishers: Iterable[str]
+    ) -> List[str]:
+        """
+        Get the publishers that haven't published a message yet.
+
+        Consults the persistent store for publishers missing from the LRU.
+
+        Args:
+            message_id: The Discord message ID
+            publishers: Names of the candidate publishers
+
+        Returns:
+            List[str]: The publishers still to publish to, in the given order
+        """
+        publishers = list(publishers)
+        cutoff = self.clock() - self.retention
+        entry = self._cache.get(message_id, {})
+        missing = [
+            name for name in publishers if entry.get(name, float("-inf")) < cutoff
+        ]
+
+        if missing and self._conn is not None:
+            rows = await self._run(self._lookup, message_id, cutoff)
+            for publisher, published_at in rows:
+                self._remember(message_id, publisher, published_at)
+            stored = {publisher for publisher, _ in rows}
+            missing = [name for name in missing if name not in stored]
+
+        return missing
+
+    def _lookup(self, message_id: int, cutoff: float) -> List[tuple]:
+        return self._conn.execute(
+            "SELECT publisher, published_at FROM published "
+            "WHERE message_id = ? AND published_at >= ?",
+            (message_id, cutoff),
+        ).fetchall()
+
+    async def record(self, message_id: int, publisher: str, url: Optional[str] = None):
+        """
+        Record that a message was published.
+
+        Args:
+            message_id: The Discord message ID
+            publisher: Name of the publisher that published it
+            url: The URL of the published post, if any
+        """
+        published_at = self.clock()
+        self._remember(message_id, publisher, published_at)
+        if self._conn is not None:
+            await self._run(self._store, message_id, publisher, url, published_at)
+
+    def _store(self, message_id, publisher, url, published_at):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO published "
+                "(message_id, publisher, url, published_at) VALUES (?, ?, ?, ?)",
+                (message_id, publisher, url, published_at),
+            )
+
+    def claim(self, message_id: int) -> bool:
+        """
+        Mark a message as being published so concurrent jobs skip it.
+
+        Args:
+            message_id: The Discord message ID
+
+        Returns:
+            bool: True if claimed, False if another job is already publishing it
+        """
+        if message_id in self._claimed:
+            return False
+        self._claimed.add(message_id)
+        return True
+
+    def release(self, message_id: int):
+        """Release a message claimed with claim()."""
+        self._claimed.discard(message_id)
+
+    def _remember(self, message_id: int, publisher: str, published_at: float):
+        """Add an entry to the LRU, evicting the least recently used message."""
+        entry = self._cache.get(message_id)
+        if entry is None:
+            entry = self._cache[message_id] = {}
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(message_id)
+        entry[publisher] = published_at
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
@@ -0,0 +1,101 @@
+"""
+Message lookup layer in front of Discord's REST API.
+
+Messages are looked up in the client's own message cache first, then in a
+bounded LRU of messages fetched earlier, and only then fetched over REST.
+Raw edit and delete events evict messages from the LRU so it never serves
+stale content.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Number of fetched messages kept in the LRU
+DEFAULT_MAX_MESSAGES = 1000
+
+
+class MessageCache:
+    """Resolves message IDs to messages, avoiding REST fetches where possible."""
+
+    def __init__(
+        self,
+        client_lookup: Optional[Callable[[int], Optional[object]]] = None,
+        max_size: int = DEFAULT_MAX_MESSAGES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            client_lookup: Function returning a message from the client's own
+                cache, or None if it isn't cached there
+            max_size: Number of fetched messages kept in the LRU
+        """
+        self.client_lookup = client_lookup
+        self.max_size = max_size
+        self._messages: "OrderedDict[int, object]" = OrderedDict()
+
+        self.client_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, channel, message_id: int):
+        """
+        Get a message, fetching it from Discord only if it isn't cached.
+
+        Args:
+            channel: The channel the message was posted in
+            message_id: The Discord message ID
+
+        Returns:
+            The message
+        """
+        if self.client_lookup is not None:
+            message = self.client_lookup(message_id)
+            if message is not None:
+                self.client_hits += 1
+                return message
+
+        message = self._messages.get(message_id)
+        if message is not None:
+            self._messages.move_to_end(message_id)
+            self.hits += 1
+            return message
+
+        self.misses += 1
+        message = await channel.fetch_message(message_id)
+        self._messages[message_id] = message
+        if len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+        return message
+
+    def evict(self, message_id: int):
+        """Forget a message that was edited or deleted."""
+        self._messages.pop(message_id, None)
+
+    def evict_many(self, message_ids: Iterable[int]):
+        """Forget several messages, e.g. after a bulk delete."""
+        for message_id in message_ids:
+            self._messages.pop(message_id, None)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def stats(self) -> Dict:
+        """
+        Get hit and miss counts.
+
+        Returns:
+            Dict: Lookups served by the client cache, the LRU and REST fetches
+        """
+        lookups = self.client_hits + self.hits + self.misses
+        return {
+            "size": len(self._messages),
+            "max_size": self.max_size,
+            "client_hits": self.client_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.client_hits + self.hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,296 @@
+"""
+Durable SQLite outbox for publish jobs.
+
+Every job is written to the outbox before the reaction that triggered it is
+acknowledged, so jobs that are queued or in progress survive restarts and
+crashes. Writes from concurrent reactions are grouped into a single
+transaction (group commit) on a dedicated database thread, which keeps the
+outbox off the event loop and lets it absorb bursts of hundreds of reactions
+per second.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from .publish_queue import PublishJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_PATH = os.path.expanduser("~/.local/share/discopilot/outbox.db")
+
+# Seconds a worker may hold a claimed job before it can be reclaimed
+DEFAULT_LEASE_SECONDS = 600
+
+# Attempts after which a failing job is parked as failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+"""
+
+
+class Outbox:
+    """A SQLite-backed store of publish jobs that survives restarts."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_OUTBOX_PATH,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            path: Path to the SQLite database file
+            lease_seconds: Seconds a claimed job is reserved for its worker
+            max_attempts: Attempts after which a failing job is given up on
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.commits = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._writes: List[Tuple[str, tuple, asyncio.Future]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def open(self):
+        """Open the database, creating it in WAL mode if needed."""
+        if self._conn is not None:
+            return
+        # SQLite connections are bound to a thread, so all access goes
+        # through a single dedicated worker thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="discopilot-outbox"
+        )
+        self._conn = await self._run(self._connect)
+        logger.info("Opened publish outbox at %s", self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+        return conn
+
+    async def close(self):
+        """Flush outstanding writes and close the database."""
+        if self._conn is None:
+            return
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=True)
+        self._conn = None
+        self._executor = None
+
+    async def add(self, job: PublishJob) -> int:
+        """
+        Durably record a new job.
+
+        Args:
+            job: The job to record; its job_id is set on return
+
+        Returns:
+            int: The job's outbox ID
+        """
+        now = time.time()
+        job.job_id, _ = await self._write(
+            "INSERT INTO jobs (payload, status, available_at, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (json.dumps(job.to_dict()), PENDING, now, now),
+        )
+        return job.job_id
+
+    async def claim(self, job: PublishJob) -> bool:
+        """
+        Reserve a job for the calling worker under a lease.
+
+        Args:
+            job: The job to claim
+
+        Returns:
+            bool: True if the job was claimed, False if it is no longer available
+        """
+        now = time.time()
+        _, rowcount = await self._write(
+            "UPDATE jobs SET status = ?, lease_until = ?, attempts = attempts + 1 "
+            "WHERE id = ? AND (status = ? OR (status = ? AND lease_until < ?))",
+            (RUNNING, now + self.lease_seconds, job.job_id, PENDING, RUNNING, now),
+        )
+        if rowcount:
+            job.attempts += 1
+        return bool(rowcount)
+
+    async def complete(self, job: PublishJob):
+        """Remove a job that has been fully processed."""
+        await self._write("DELETE FROM jobs WHERE id = ?", (job.job_id,))
+
+    async def release(self, job: PublishJob, delay: float = 0.0) -> bool:
+        """
+        Return a failed job to the outbox so it can be retried later.
+
+        Jobs that have used up max_attempts are marked as failed instead.
+
+        Args:
+            job: The job to release
+            delay: Seconds before the job becomes available again
+
+        Returns:
+            bool: True if the job will be retried, False if it was given up on
+        """
+        if job.attempts >= self.max_attempts:
+            await self._write(
+                "UPDATE jobs SET status = ?, lease_until = NULL WHERE id = ?",
+                (FAILED, job.job_id),
+            )
+            return False
+
+        await self._write(
+            "UPDATE jobs SET status = ?, lease_until = NULL, available_at = ? "
+            "WHERE id = ?",
+            (PENDING, time.time() + delay, job.job_id),
+        )
+        return True
+
+    async def defer(self, job: PublishJob, delay: float):
+        """
+        Return a job to the outbox without counting the attempt.
+
+        Used when a job couldn't run because of a rate limit rather than an error.
+
+        Args:
+            job: The job to defer
+            delay: Seconds before the job becomes available again
+        """
+        job.attempts = max(0, job.attempts - 1)
+        await self._write(
+            "UPDATE jobs SET status = ?, lease_until = NULL, available_at = ?, "
+            "attempts = ? WHERE id = ?",
+            (PENDING, time.time() + delay, job.attempts, job.job_id),
+        )
+
+    async def recover(self) -> List[PublishJob]:
+        """
+        Reset jobs left running by a previous process and return pending jobs.
+
+        Only call this at startup, before any worker has claimed a job.
+
+        Returns:
+            List[PublishJob]: Every pending job, oldest first
+        """
+        await self._write(
+            "UPDATE jobs SET status = ?, lease_until = NULL WHERE status = ?",
+            (PENDING, RUNNING),
+        )
+        return await self.due_jobs()
+
+    async def due_jobs(self, exclude: Iterable[int] = ()) -> List[PublishJob]:
+        """
+        Get jobs that are ready to run.
+
+        This includes pending jobs whose delay has passed and running jobs
+        whose lease has expired.
+
+        Args:
+            exclude: Job IDs to leave out, e.g. those already queued in memory
+
+        Returns:
+            List[PublishJob]: The due jobs, oldest first
+        """
+        now = time.time()
+        rows = await self._run(
+            self._query,
+            "SELECT id, payload, attempts FROM jobs "
+            "WHERE (status = ? AND available_at <= ?) "
+            "OR (status = ? AND lease_until < ?) ORDER BY id",
+            (PENDING, now, RUNNING, now),
+        )
+        excluded = set(exclude)
+        jobs = []
+        for job_id, payload, attempts in rows:
+            if job_id in excluded:
+                continue
+            job = PublishJob.from_dict(json.loads(payload))
+            job.job_id = job_id
+            job.attempts = attempts
+            jobs.append(job)
+        return jobs
+
+    def _query(self, sql: str, params: tuple) -> list:
+        return self._conn.execute(sql, params).fetchall()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _write(self, sql: str, params: tuple) -> Tuple[int, int]:
+        """
+        Queue a write and wait until it has been committed.
+
+        Writes issued while a commit is in progress are grouped into the
+        next transaction.
+
+        Returns:
+            Tuple[int, int]: The statement's lastrowid and rowcount
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._writes.append((sql, params, future))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush())
+        return await future
+
+    async def _flush(self):
+        """Commit queued writes in batches until none are left."""
+        while self._writes:
+            batch, self._writes = self._writes, []
+            try:
+                results = await self._run(
+                    self._commit_batch, [(sql, params) for sql, params, _ in batch]
+                )
+            except Exception as e:
+                logger.error("Error writing to publish outbox: %s", e, exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _commit_batch(self, statements: List[Tuple[str, tuple]]) -> List[tuple]:
+        """Run statements in a single transaction on the database thread."""
+        results = []
+        with self._conn:
+            for sql, params in statements:
+                cursor = self._conn.execute(sql, params)
+                results.append((cursor.lastrowid, cursor.rowcount))
+        self.commits += 1
+        return results
@@ -0,0 +1,316 @@
+"""
+Bounded job queue that decouples reaction handling from publishing.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ..utils.rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the publish worker pool
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE_SIZE = 100
+DEFAULT_ENQUEUE_TIMEOUT = 5.0
+
+# Seconds between scans of the outbox for jobs that need to be (re)queued
+DEFAULT_SWEEP_INTERVAL = 30.0
+
+# Seconds before a failed job is retried from the outbox
+DEFAULT_RETRY_DELAY = 60.0
+
+
+class PublishJob:
+    """A request to publish a Discord message, created from a reaction."""
+
+    def __init__(
+        self,
+        message_id: int,
+        channel_id: int,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        publishers: Optional[List[str]] = None,
+    ):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.user_id = user_id
+        # Names of the publishers to use, or None for all of them
+        self.publishers = publishers
+        self.enqueued_at: Optional[float] = None
+
+        # Set once the job has been recorded in the outbox
+        self.job_id: Optional[int] = None
+        self.attempts = 0
+
+    def to_dict(self) -> Dict:
+        """Serialize the job for durable storage."""
+        return {
+            "message_id": self.message_id,
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "user_id": self.user_id,
+            "publishers": self.publishers,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PublishJob":
+        """Rebuild a job from its serialized form."""
+        return cls(
+            message_id=data["message_id"],
+            channel_id=data["channel_id"],
+            guild_id=data.get("guild_id"),
+            user_id=data.get("user_id"),
+            publishers=data.get("publishers"),
+        )
+
+    def __repr__(self):
+        return f"PublishJob(message_id={self.message_id}, channel_id={self.channel_id})"
+
+
+class PublishQueue:
+    """A bounded queue of publish jobs drained by a pool of asyncio workers."""
+
+    def __init__(
+        self,
+        handler: Callable[[PublishJob], Awaitable[None]],
+        workers: int = DEFAULT_WORKERS,
+        max_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        enqueue_timeout: float = DEFAULT_ENQUEUE_TIMEOUT,
+        outbox=None,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        ready: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            handler: Coroutine function that processes a single job
+            workers: Number of jobs processed concurrently
+            max_size: Maximum number of jobs waiting in the queue
+            enqueue_timeout: Seconds enqueue waits for space before dropping a job
+            outbox: Optional Outbox that makes jobs durable across restarts
+            sweep_interval: Seconds between scans of the outbox for due jobs
+            retry_delay: Seconds before a failed job is retried from the outbox
+            ready: Optional coroutine function the workers await before
+                processing their first job, e.g. until the client is connected
+        """
+        self.handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self.enqueue_timeout = enqueue_timeout
+        self.outbox = outbox
+        self.sweep_interval = sweep_interval
+        self.retry_delay = retry_delay
+        self.ready = ready
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs waiting out a rate limit when there is no outbox to hold them
+        self._retries: Set[asyncio.Task] = set()
+        # Outbox IDs of jobs currently queued or being processed
+        self._active_ids: Set[int] = set()
+
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.deferred = 0
+        self.in_progress = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def start(self):
+        """Start the worker pool, replaying any jobs left in the outbox."""
+        if self._tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+
+        if self.outbox is not None:
+            await self.outbox.open()
+            jobs = await self.outbox.recover()
+            if jobs:
+                logger.info("Replaying %s publish jobs from the outbox", len(jobs))
+            self._requeue(jobs)
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"publish-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if self.outbox is not None:
+            self._tasks.append(
+                asyncio.create_task(self._sweep(), name="publish-outbox-sweeper")
+            )
+        logger.info(
+            "Started %s publish workers (queue size %s)", self.workers, self.max_size
+        )
+
+    async def stop(self):
+        """Stop the worker pool, cancelling any jobs in progress."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._retries:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries = set()
+        if self.outbox is not None:
+            await self.outbox.close()
+
+    async def enqueue(self, job: PublishJob) -> bool:
+        """
+        Add a job to the queue, waiting briefly for space if it is full.
+
+        With an outbox, the job is durably recorded before this returns. A job
+        that doesn't fit in the queue then stays in the outbox and is picked up
+        by a later sweep instead of being lost.
+
+        Args:
+            job: The job to enqueue
+
+        Returns:
+            bool: True if the job was queued, False if it was dropped
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+
+        if self.outbox is not None:
+            await self.outbox.add(job)
+            self._active_ids.add(job.job_id)
+
+        job.enqueued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._queue.put(job), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            if self.outbox is not None:
+                self._active_ids.discard(job.job_id)
+                logger.warning(
+                    "Publish queue full (%s jobs), leaving %s in the outbox",
+                    self.max_size,
+                    job,
+                )
+            else:
+                logger.error(
+                    "Publish queue full (%s jobs), dropping %s", self.max_size, job
+                )
+            return False
+
+        self.enqueued += 1
+        return True
+
+    def _requeue(self, jobs: List[PublishJob]):
+        """Queue jobs loaded from the outbox, as many as there is room for."""
+        for job in jobs:
+            if self._queue.full():
+                break
+            job.enqueued_at = time.monotonic()
+            self._active_ids.add(job.job_id)
+            self._queue.put_nowait(job)
+            self.enqueued += 1
+
+    async def _sweep(self):
+        """Periodically queue outbox jobs that are due but not in memory."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self._requeue(await self.outbox.due_jobs(exclude=self._active_ids))
+            except Exception as e:
+                logger.error("Error sweeping publish outbox: %s", e, exc_info=True)
+
+    async def _retry_later(self, job: PublishJob, delay: float):
+        """Re-enqueue a rate-limited job once its delay has passed."""
+        await asyncio.sleep(delay)
+        await self.enqueue(job)
+
+    async def join(self):
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting to be processed."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict:
+        """
+        Get queue depth, throughput and wait time statistics.
+
+        Returns:
+            Dict: The current queue statistics
+        """
+        started = self.completed + self.failed + self.in_progress
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "in_progress": self.in_progress,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "deferred": self.deferred,
+            "avg_wait": self.total_wait / started if started else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    async def _worker(self):
+        """Process jobs from the queue until cancelled."""
+        if self.ready is not None:
+            await self.ready()
+        while True:
+            job = await self._queue.get()
+            wait = time.monotonic() - job.enqueued_at
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.in_progress += 1
+            try:
+                await self._process(job)
+            except Exception as e:
+                logger.error("Error updating outbox for %s: %s", job, e, exc_info=True)
+            finally:
+                self.in_progress -= 1
+                self._active_ids.discard(job.job_id)
+                self._queue.task_done()
+
+    async def _process(self, job: PublishJob):
+        """Run the handler for a job, keeping its outbox record in sync."""
+        if self.outbox is not None and not await self.outbox.claim(job):
+            logger.debug("%s is no longer available in the outbox, skipping", job)
+            return
+
+        try:
+            await self.handler(job)
+        except RateLimitExceeded as e:
+            self.deferred += 1
+            logger.info(
+                "%s is rate limited, retrying in %.0f seconds", job, e.retry_after
+            )
+            if self.outbox is not None:
+                await self.outbox.defer(job, e.retry_after)
+            else:
+                task = asyncio.create_task(self._retry_later(job, e.retry_after))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+            return
+        except Exception as e:
+            self.failed += 1
+            logger.error("Error processing %s: %s", job, e, exc_info=True)
+            if self.outbox is not None:
+                if await self.outbox.release(job, delay=self.retry_delay):
+                    logger.info(
+                        "%s will be retried in %s seconds", job, self.retry_delay
+                    )
+                else:
+                    logger.error("Giving up on %s after %s attempts", job, job.attempts)
+            return
+
+        self.completed += 1
+        if self.outbox is not None:
+            await self.outbox.complete(job)
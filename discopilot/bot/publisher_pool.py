@@ -0,0 +1,497 @@
+"""
+Publishing in worker processes, separate from the gateway process.
+
+The gateway process only handles Discord events: it fetches each triggered
+message and sends a picklable snapshot of it over a multiprocessing queue to
+a pool of worker processes. Each worker runs its own event loop with its own
+publishers, so media downloads, formatting and blocking SDK calls scale
+across cores without ever stalling the gateway heartbeat.
+
+A worker that dies is replaced. The jobs it was running fail with
+WorkerCrashed, so the publish queue retries them, and the gateway connection
+is unaffected.
+
+With more than one worker, every worker runs its own instance of each
+publisher against the same accounts, so their rate limits are kept in a
+shared SQLite store instead of in each worker's memory and state file.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..utils.shared_rate_limiter import DEFAULT_SHARED_LIMITS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Number of publisher worker processes
+DEFAULT_POOL_WORKERS = 2
+
+# Seconds between checks for crashed workers
+DEFAULT_MONITOR_INTERVAL = 1.0
+
+# Seconds a job may wait for its result on top of the publish timeout, in
+# case a worker hangs without dying
+DEFAULT_RESULT_GRACE = 30.0
+
+# Seconds each publisher may take, unless it sets its own publish_timeout
+DEFAULT_PUBLISH_TIMEOUT = 120.0
+
+
+class WorkerCrashed(Exception):
+    """Raised for a job whose worker process died while running it."""
+
+
+class AttachmentSnapshot:
+    """The parts of a Discord attachment needed to download it."""
+
+    def __init__(
+        self,
+        url: str,
+        filename: str,
+        size: Optional[int] = None,
+        content_type: Optional[str] = None,
+    ):
+        self.url = url
+        self.filename = filename
+        self.size = size
+        self.content_type = content_type
+
+    @classmethod
+    def from_attachment(cls, attachment) -> "AttachmentSnapshot":
+        return cls(
+            url=attachment.url,
+            filename=attachment.filename,
+            size=getattr(attachment, "size", None),
+            content_type=getattr(attachment, "content_type", None),
+        )
+
+
+class EmbedSnapshot:
+    """The parts of a Discord embed used when publishing."""
+
+    def __init__(
+        self,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        url: Optional[str] = None,
+    ):
+        self.title = title
+        self.description = description
+        self.url = url
+
+    @classmethod
+    def from_embed(cls, embed) -> "EmbedSnapshot":
+        return cls(title=embed.title, description=embed.description, url=embed.url)
+
+
+class MessageSnapshot:
+    """
+    A picklable copy of a Discord message that publishers accept in its place.
+
+    Only plain data is kept, so it can be sent to another process; the
+    attribute names match discord.Message for the parts publishers read.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        content: str,
+        author: str = "",
+        channel_id: Optional[int] = None,
+        guild_id: Optional[int] = None,
+        jump_url: Optional[str] = None,
+        attachments: Optional[List[AttachmentSnapshot]] = None,
+        embeds: Optional[List[EmbedSnapshot]] = None,
+    ):
+        self.id = id
+        self.content = content
+        self.author = author
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.jump_url = jump_url
+        self.attachments = attachments or []
+        self.embeds = embeds or []
+
+    @classmethod
+    def from_message(cls, message) -> "MessageSnapshot":
+        """Copy the publishable parts of a discord.Message."""
+        guild = getattr(message, "guild", None)
+        return cls(
+            id=message.id,
+            content=message.content or "",
+            author=str(message.author),
+            channel_id=message.channel.id,
+            guild_id=guild.id if guild is not None else None,
+            jump_url=getattr(message, "jump_url", None),
+            attachments=[
+                AttachmentSnapshot.from_attachment(attachment)
+                for attachment in message.attachments
+            ],
+            embeds=[EmbedSnapshot.from_embed(embed) for embed in message.embeds],
+        )
+
+    def __repr__(self):
+        return f"MessageSnapshot(id={self.id})"
+
+
+def _worker_main(
+    worker_id: int,
+    config_path: Optional[str],
+    jobs,
+    results,
+    publish_timeout: float,
+    log_level: int,
+    publisher_factory: Optional[Callable] = None,
+    shared_rate_limits_path: Optional[str] = None,
+):
+    """Entry point of a publisher worker process."""
+    from ..utils.logger import setup_logging
+
+    setup_logging(log_level)
+    try:
+        asyncio.run(
+            _serve(
+                worker_id,
+                config_path,
+                jobs,
+                results,
+                publish_timeout,
+                publisher_factory,
+                shared_rate_limits_path,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+async def _serve(
+    worker_id: int,
+    config_path: Optional[str],
+    jobs,
+    results,
+    publish_timeout: float,
+    publisher_factory: Optional[Callable],
+    shared_rate_limits_path: Optional[str] = None,
+):
+    """Run publish jobs taken from the jobs queue until told to stop."""
+    from ..publishers import get_publishers
+    from ..publishers.base_publisher import run_publisher
+    from ..utils.config import Config
+    from ..utils.media import MediaDownloader
+
+    config = Config(config_path)
+    publishers = (publisher_factory or get_publishers)(config)
+    downloader = MediaDownloader(
+        max_concurrency=config.media_max_concurrent_downloads,
+        connections_per_host=config.media_connections_per_host,
+        max_size=config.media_max_attachment_mb * 1024 * 1024,
+    )
+    await downloader.start()
+    for publisher in publishers.values():
+        publisher.downloader = downloader
+        if shared_rate_limits_path:
+            publisher.share_rate_limits(shared_rate_limits_path)
+        await publisher.start()
+
+    timeouts = {
+        name: publisher.publish_timeout or publish_timeout
+        for name, publisher in publishers.items()
+    }
+
+    async def publish(name, message):
+        publisher = publishers.get(name)
+        if publisher is None:
+            return {"status": "Error: Publisher not configured", "url": None}
+        return await run_publisher(name, publisher, message, timeouts[name])
+
+    async def run_job(job_id, message, names):
+        outcomes = await asyncio.gather(*(publish(name, message) for name in names))
+        results.put(("done", job_id, dict(zip(names, outcomes))))
+
+    loop = asyncio.get_running_loop()
+    # The gateway sizes its wait for each job's result from these
+    results.put(("ready", worker_id, timeouts))
+    logger.info("Publisher worker %s ready with %s", worker_id, list(publishers))
+
+    # Jobs run concurrently; the gateway's publish queue bounds how many
+    running: Set[asyncio.Task] = set()
+    try:
+        while True:
+            item = await loop.run_in_executor(None, jobs.get)
+            if item is None:
+                break
+            task = asyncio.create_task(run_job(*item))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+    finally:
+        for name, publisher in publishers.items():
+            try:
+                await publisher.close()
+            except Exception as e:
+                logger.error("Error closing publisher %s: %s", name, e)
+        await downloader.close()
+
+
+class ProcessPublisherPool:
+    """Runs publishers in a pool of worker processes fed by the gateway."""
+
+    def __init__(
+        self,
+        publisher_names: Iterable[str],
+        config_path: Optional[str] = None,
+        workers: int = DEFAULT_POOL_WORKERS,
+        publish_timeout: float = DEFAULT_PUBLISH_TIMEOUT,
+        monitor_interval: float = DEFAULT_MONITOR_INTERVAL,
+        result_grace: float = DEFAULT_RESULT_GRACE,
+        log_level: int = logging.INFO,
+        publisher_factory: Optional[Callable] = None,
+        shared_rate_limits_path: Optional[str] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            publisher_names: Names of the publishers the workers run
+            config_path: Configuration file loaded by each worker
+            workers: Number of worker processes
+            publish_timeout: Seconds each publisher may take, unless it sets
+                its own publish_timeout
+            monitor_interval: Seconds between checks for crashed workers
+            result_grace: Extra seconds to wait for a job's result beyond
+                the longest timeout of its publishers before giving up on it
+            log_level: Logging level in the worker processes
+            publisher_factory: Picklable function creating the publishers
+                from the config in each worker, defaults to get_publishers
+            shared_rate_limits_path: SQLite file the workers share their
+                publishers' rate limits through; with more than one worker
+                it defaults to the standard shared store
+        """
+        self.publisher_names = list(publisher_names)
+        self.config_path = config_path
+        self.workers = workers
+        self.publish_timeout = publish_timeout
+        self.monitor_interval = monitor_interval
+        self.result_grace = result_grace
+        self.log_level = log_level
+        self.publisher_factory = publisher_factory
+        if shared_rate_limits_path is None and workers > 1:
+            shared_rate_limits_path = DEFAULT_SHARED_LIMITS_PATH
+        self.shared_rate_limits_path = shared_rate_limits_path
+
+        # Workers are spawned rather than forked, so they don't inherit the
+        # gateway's event loop, sockets or threads
+        self._context = multiprocessing.get_context("spawn")
+        self._results = None
+        self._processes: List = []
+        # Each worker has its own job queue, so the jobs lost with a crashed
+        # worker are known exactly
+        self._queues: List = []
+        self._job_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Worker ID -> IDs of the jobs it is running
+        self._running: Dict[int, Set[int]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._monitor: Optional[asyncio.Task] = None
+        # Publisher name -> its effective publish timeout, reported by the
+        # workers once they have created their publishers
+        self.publish_timeouts: Dict[str, float] = {}
+        self._timeouts_reported: Optional[asyncio.Event] = None
+        self.restarts = 0
+
+    def _spawn(self, worker_id: int):
+        jobs = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                worker_id,
+                self.config_path,
+                jobs,
+                self._results,
+                self.publish_timeout,
+                self.log_level,
+                self.publisher_factory,
+                self.shared_rate_limits_path,
+            ),
+            name=f"discopilot-publisher-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        self._running[worker_id] = set()
+        return process, jobs
+
+    async def start(self):
+        """Start the worker processes and the result reader."""
+        if self._processes:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._timeouts_reported = asyncio.Event()
+        self._results = self._context.Queue()
+        for worker_id in range(self.workers):
+            process, jobs = self._spawn(worker_id)
+            self._processes.append(process)
+            self._queues.append(jobs)
+
+        # Results are read on a thread so the event loop never blocks on IPC
+        self._reader = threading.Thread(
+            target=self._read_results, name="discopilot-pool-results", daemon=True
+        )
+        self._reader.start()
+        self._monitor = asyncio.create_task(
+            self._watch_workers(), name="discopilot-pool-monitor"
+        )
+        logger.info("Started %s publisher worker processes", self.workers)
+
+    def _read_results(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_result, *item)
+
+    def _on_result(self, kind: str, job_id: int, value):
+        if kind == "ready":
+            logger.debug("Publisher worker %s is ready", job_id)
+            self.publish_timeouts.update(value)
+            self._timeouts_reported.set()
+        elif kind == "done":
+            future = self._pending.get(job_id)
+            if future is not None and not future.done():
+                future.set_result(value)
+
+    async def _watch_workers(self):
+        while True:
+            await asyncio.sleep(self.monitor_interval)
+            for worker_id, process in enumerate(self._processes):
+                if not process.is_alive():
+                    self._replace(worker_id, process.exitcode)
+
+    def _replace(self, worker_id: int, exitcode: Optional[int]):
+        """Fail the jobs of a dead worker and start a new one in its place."""
+        logger.error(
+            "Publisher worker %s died with exit code %s, restarting it",
+            worker_id,
+            exitcode,
+        )
+        for job_id in self._running.pop(worker_id, set()):
+            future = self._pending.get(job_id)
+            if future is not None and not future.done():
+                future.set_exception(
+                    WorkerCrashed(f"Publisher worker {worker_id} died")
+                )
+        self._processes[worker_id], self._queues[worker_id] = self._spawn(worker_id)
+        self.restarts += 1
+
+    async def publish(self, message, names: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Publish a message in a worker process.
+
+        Args:
+            message: A discord.Message or MessageSnapshot
+            names: Names of the publishers to use
+
+        Returns:
+            Dict: The status and URL of the post on each platform
+
+        Raises:
+            RuntimeError: If the pool isn't running
+            WorkerCrashed: If the worker died while publishing
+            asyncio.TimeoutError: If no result arrived in time
+        """
+        if not isinstance(message, MessageSnapshot):
+            message = MessageSnapshot.from_message(message)
+
+        names = list(names)
+        if not self._processes:
+            raise RuntimeError("Publisher pool is not running")
+
+        # Give the job to the least busy worker
+        worker_id = min(self._running, key=lambda worker: len(self._running[worker]))
+        job_id = next(self._job_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[job_id] = future
+        self._running[worker_id].add(job_id)
+        try:
+            self._queues[worker_id].put((job_id, message, names))
+            return await self._wait_for_result(future, names)
+        finally:
+            self._pending.pop(job_id, None)
+            self._running.get(worker_id, set()).discard(job_id)
+
+    def job_timeout(self, names: Iterable[str]) -> float:
+        """
+        Get the seconds to wait for a job's result before giving up on it.
+
+        Args:
+            names: Names of the job's publishers
+
+        Returns:
+            float: The longest timeout of the publishers, plus result_grace
+        """
+        timeout = max(
+            (self.publish_timeouts.get(name, self.publish_timeout) for name in names),
+            default=self.publish_timeout,
+        )
+        return timeout + self.result_grace
+
+    async def _wait_for_result(self, future: asyncio.Future, names: List[str]):
+        # Until a worker has reported its publishers' timeouts, a job can't
+        # be abandoned early: a publisher may allow itself longer than the
+        # pool-wide timeout, and a retried job could post twice
+        if not self._timeouts_reported.is_set():
+            reported = asyncio.ensure_future(self._timeouts_reported.wait())
+            try:
+                await asyncio.wait(
+                    [future, reported],
+                    timeout=self.publish_timeout + self.result_grace,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                reported.cancel()
+        return await asyncio.wait_for(future, self.job_timeout(names))
+
+    def stats(self) -> Dict:
+        """Get the pool's current state."""
+        return {
+            "workers": len(self._processes),
+            "alive": sum(1 for process in self._processes if process.is_alive()),
+            "pending": len(self._pending),
+            "restarts": self.restarts,
+        }
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the workers after their current jobs, then the reader."""
+        if not self._processes:
+            return
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+        for jobs in self._queues:
+            jobs.put(None)
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._queues = []
+        self._running = {}
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed("Publisher pool stopped"))
+
+        self._results.put(None)
+        await loop.run_in_executor(None, self._reader.join)
+        self._reader = None
+        logger.info("Stopped publisher worker processes")
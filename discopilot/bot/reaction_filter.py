@@ -0,0 +1,208 @@
+"""
+Precompiled filter deciding which reactions trigger publishing.
+
+Almost every reaction the bot sees is irrelevant, so the filter is built
+once from the configuration into frozensets and dicts keyed by normalized
+emoji. Rejecting a reaction is a couple of dict and set lookups that
+allocate nothing and log nothing.
+
+Publisher instances can be limited to some guilds or channels. Those scopes
+are compiled into dicts from guild and channel ID to the instances that
+apply there, so routing a reaction to its accounts is a lookup as well.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+import discord
+
+# Variation selector that may or may not follow a unicode emoji
+VARIATION_SELECTOR = "\ufe0f"
+
+# (accepted, publishers) where publishers is None for all publishers
+FilterResult = Tuple[bool, Optional[FrozenSet[str]]]
+
+REJECTED: FilterResult = (False, None)
+ALL_PUBLISHERS: FilterResult = (True, None)
+
+EmojiKey = Union[int, str]
+
+# Publisher name -> (guild IDs, channel IDs) it is limited to; both empty
+# means the publisher applies everywhere
+PublisherScopes = Dict[str, Tuple[Iterable[int], Iterable[int]]]
+
+
+def emoji_key(emoji: Union[str, discord.PartialEmoji]) -> EmojiKey:
+    """
+    Get the normalized key of an emoji.
+
+    Custom emoji are identified by ID; unicode emoji by their characters
+    without variation selectors, so "❤" and "❤️" are the same key.
+
+    Args:
+        emoji: An emoji string such as "📢" or "<:name:123>", or a PartialEmoji
+
+    Returns:
+        The emoji's key
+    """
+    if isinstance(emoji, str):
+        emoji = discord.PartialEmoji.from_str(emoji.strip())
+    if emoji.id is not None:
+        return emoji.id
+    return emoji.name.replace(VARIATION_SELECTOR, "")
+
+
+class _Route:
+    """Publisher subsets for one trigger emoji, by channel, guild and default."""
+
+    __slots__ = ("channels", "guilds", "default")
+
+    def __init__(self):
+        self.channels: Dict[int, FilterResult] = {}
+        self.guilds: Dict[int, FilterResult] = {}
+        self.default: FilterResult = REJECTED
+
+
+class ReactionFilter:
+    """Matches raw reaction payloads against the compiled trigger rules."""
+
+    def __init__(
+        self,
+        trigger_emojis: Iterable[str] = ("📢",),
+        admin_ids: Optional[Iterable[int]] = None,
+        server_ids: Optional[Iterable[int]] = None,
+        channel_ids: Optional[Iterable[int]] = None,
+        rules: Optional[List[Dict]] = None,
+        publisher_scopes: Optional[PublisherScopes] = None,
+    ):
+        """
+        Compile the filter.
+
+        Rules narrow a trigger emoji to a guild or channel and to a subset of
+        publishers. Each rule is a dict with an "emoji", an optional
+        "guild_id" or "channel_id", and an optional list of "publishers".
+        Channel rules take precedence over guild rules, which take precedence
+        over the global trigger emojis.
+
+        Args:
+            trigger_emojis: Emojis that trigger publishing everywhere
+            admin_ids: User IDs allowed to trigger publishing (empty = anyone)
+            server_ids: Guild IDs to listen to (empty = all)
+            channel_ids: Channel IDs to listen to (empty = all)
+            rules: Per-guild and per-channel routing rules
+            publisher_scopes: Guilds and channels each publisher instance is
+                limited to; a reaction is only routed to the instances that
+                apply where it was added
+        """
+        if isinstance(trigger_emojis, str):
+            trigger_emojis = [trigger_emojis]
+
+        self.admin_ids: FrozenSet[int] = frozenset(admin_ids or ())
+        self.server_ids: FrozenSet[int] = frozenset(server_ids or ())
+        self.channel_ids: FrozenSet[int] = frozenset(channel_ids or ())
+
+        self._by_id: Dict[int, _Route] = {}
+        self._by_name: Dict[str, _Route] = {}
+
+        for emoji in trigger_emojis:
+            self._route(emoji).default = ALL_PUBLISHERS
+
+        for rule in rules or []:
+            publishers = rule.get("publishers")
+            result = (True, frozenset(publishers) if publishers else None)
+            route = self._route(rule["emoji"])
+            if rule.get("channel_id") is not None:
+                route.channels[int(rule["channel_id"])] = result
+            elif rule.get("guild_id") is not None:
+                route.guilds[int(rule["guild_id"])] = result
+            else:
+                route.default = result
+
+        self._compile_scopes(publisher_scopes or {})
+
+    def _compile_scopes(self, publisher_scopes: PublisherScopes):
+        """Precompute the publisher instances that apply in each guild and channel."""
+        self._scoped = any(
+            guilds or channels for guilds, channels in publisher_scopes.values()
+        )
+        self._unscoped: FrozenSet[str] = frozenset(
+            name
+            for name, (guilds, channels) in publisher_scopes.items()
+            if not guilds and not channels
+        )
+
+        by_guild: Dict[int, set] = {}
+        by_channel: Dict[int, set] = {}
+        for name, (guilds, channels) in publisher_scopes.items():
+            for guild_id in guilds:
+                by_guild.setdefault(int(guild_id), set(self._unscoped)).add(name)
+            for channel_id in channels:
+                by_channel.setdefault(int(channel_id), set()).add(name)
+
+        self._guild_publishers: Dict[int, FrozenSet[str]] = {
+            guild_id: frozenset(names) for guild_id, names in by_guild.items()
+        }
+        self._channel_publishers: Dict[int, FrozenSet[str]] = {
+            channel_id: frozenset(names) for channel_id, names in by_channel.items()
+        }
+        # (rule's publishers, guild ID, channel ID) -> result, filled on first use
+        self._scoped_results: Dict[
+            Tuple[Optional[FrozenSet[str]], Optional[int], int], FilterResult
+        ] = {}
+
+    def _route(self, emoji: str) -> _Route:
+        key = emoji_key(emoji)
+        routes = self._by_id if isinstance(key, int) else self._by_name
+        if key not in routes:
+            routes[key] = _Route()
+        return routes[key]
+
+    def match(self, payload: discord.RawReactionActionEvent) -> FilterResult:
+        """
+        Decide whether a reaction triggers publishing.
+
+        Args:
+            payload: The raw reaction event
+
+        Returns:
+            FilterResult: REJECTED, or (True, publishers) where publishers is
+            the subset to publish to, or None for all publishers
+        """
+        emoji = payload.emoji
+        if emoji.id is not None:
+            route = self._by_id.get(emoji.id)
+        else:
+            name = emoji.name
+            route = self._by_name.get(name)
+            if route is None and VARIATION_SELECTOR in name:
+                route = self._by_name.get(name.replace(VARIATION_SELECTOR, ""))
+        if route is None:
+            return REJECTED
+
+        if self.server_ids and payload.guild_id not in self.server_ids:
+            return REJECTED
+        if self.channel_ids and payload.channel_id not in self.channel_ids:
+            return REJECTED
+        if self.admin_ids and payload.user_id not in self.admin_ids:
+            return REJECTED
+
+        result = route.channels.get(payload.channel_id)
+        if result is None:
+            result = route.guilds.get(payload.guild_id, route.default)
+        if self._scoped and result[0]:
+            return self._scope(result, payload.guild_id, payload.channel_id)
+        return result
+
+    def _scope(
+        self, result: FilterResult, guild_id: Optional[int], channel_id: int
+    ) -> FilterResult:
+        """Narrow a result to the publisher instances that apply in a channel."""
+        key = (result[1], guild_id, channel_id)
+        scoped = self._scoped_results.get(key)
+        if scoped is None:
+            allowed = self._guild_publishers.get(guild_id, self._unscoped)
+            allowed |= self._channel_publishers.get(channel_id, frozenset())
+            if result[1] is not None:
+                allowed &= result[1]
+            scoped = (True, allowed) if allowed else REJECTED
+            self._scoped_results[key] = scoped
+        return scoped
@@ -0,0 +1,133 @@
+"""
+Sharded variant of the DiscoPilot bot for very large guild counts.
+
+discord.py's AutoShardedClient runs several gateway connections (shards) in
+one process, each receiving the events of its share of the guilds. With
+shard_ids, a process only runs some of the shards, so the shards of one bot
+can be spread over several processes or hosts.
+"""
+
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+import discord
+
+from .discord_client import HedwigBot
+
+logger = logging.getLogger(__name__)
+
+
+class ShardedHedwigBot(HedwigBot, discord.AutoShardedClient):
+    """HedwigBot running one or more gateway shards in this process."""
+
+    def __init__(
+        self,
+        token: str,
+        shard_count: Optional[int] = None,
+        shard_ids: Optional[Sequence[int]] = None,
+        **kwargs,
+    ):
+        """
+        Initialize the sharded client.
+
+        Args:
+            token: Discord bot token
+            shard_count: Total number of shards across all processes, or None
+                to use the count recommended by Discord
+            shard_ids: Shards run by this process, or None to run all of them
+            **kwargs: Passed on to HedwigBot
+        """
+        if shard_ids is not None:
+            if shard_count is None:
+                raise ValueError("shard_ids requires shard_count")
+            invalid = [shard for shard in shard_ids if not 0 <= shard < shard_count]
+            if invalid:
+                raise ValueError(
+                    f"Shard IDs {invalid} are outside 0..{shard_count - 1}"
+                )
+            shard_ids = list(shard_ids)
+
+        super().__init__(token, shard_count=shard_count, shard_ids=shard_ids, **kwargs)
+
+        # Shard ID -> monotonic time the shard became ready, None while not
+        self._shard_ready: Dict[int, Optional[float]] = {
+            shard_id: None for shard_id in shard_ids or ()
+        }
+
+        if shard_ids is not None:
+            logger.info(
+                "Running shards %s of %s", ", ".join(map(str, shard_ids)), shard_count
+            )
+        elif shard_count is not None:
+            logger.info("Running all %s shards", shard_count)
+        else:
+            logger.info("Running the shard count recommended by Discord")
+
+    async def on_ready(self):
+        """Handle every shard of this process being ready."""
+        await super().on_ready()
+        for shard in self.shard_status():
+            logger.info(
+                "Shard %s: %s guilds, latency %s",
+                shard["shard_id"],
+                shard["guilds"],
+                "unknown" if shard["latency"] is None else f"{shard['latency']:.3f}s",
+            )
+
+    async def on_shard_connect(self, shard_id: int):
+        """Track a shard that connected to the gateway."""
+        self._shard_ready.setdefault(shard_id, None)
+        logger.info("Shard %s connected", shard_id)
+
+    async def on_shard_ready(self, shard_id: int):
+        """Mark a shard as ready once its guilds have been received."""
+        self._shard_ready[shard_id] = time.monotonic()
+        logger.info(
+            "Shard %s ready with %s guilds",
+            shard_id,
+            sum(1 for guild in self.guilds if guild.shard_id == shard_id),
+        )
+
+    async def on_shard_resumed(self, shard_id: int):
+        """Mark a shard as ready again after it resumed its session."""
+        self._shard_ready[shard_id] = time.monotonic()
+        logger.info("Shard %s resumed", shard_id)
+
+    async def on_shard_disconnect(self, shard_id: int):
+        """Mark a shard as not ready while it reconnects."""
+        self._shard_ready[shard_id] = None
+        logger.warning("Shard %s disconnected", shard_id)
+
+    def shard_status(self) -> List[Dict]:
+        """
+        Report the state of each shard run by this process.
+
+        Returns:
+            List[Dict]: Per shard, ordered by ID: shard_id, ready, latency
+            (seconds, None until the first heartbeat), guilds and
+            ready_for (seconds since it became ready, None while not ready)
+        """
+        guild_counts: Dict[int, int] = {}
+        for guild in self.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+        now = time.monotonic()
+        status = []
+        for shard_id in sorted(set(self.shard_ids or ()) | set(self._shard_ready)):
+            ready_since = self._shard_ready.get(shard_id)
+            shard = self.get_shard(shard_id)
+            latency = shard.latency if shard is not None else None
+            if latency is not None and not math.isfinite(latency):
+                latency = None
+            status.append(
+                {
+                    "shard_id": shard_id,
+                    "ready": ready_since is not None,
+                    "latency": latency,
+                    "guilds": guild_counts.get(shard_id, 0),
+                    "ready_for": None if ready_since is None else now - ready_since,
+                }
+            )
+        return status
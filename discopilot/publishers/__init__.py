@@ -1,31 +1,109 @@
 """
 Publishers module for DiscoPilot.
 Contains classes for publishing content to various social media platforms.
+
+Publisher modules import their platform SDKs, so they are only loaded when a
+publisher is first used rather than when this package is imported. Publisher
+types are found through entry points; see registry.py.
 """
 
+import importlib
+
 from .base_publisher import BasePublisher
-from .twitter_publisher import TwitterPublisher
+from .registry import available_publishers, load_publisher_class
+
+# Publisher class name -> module defining it, imported on first access
+_LAZY_PUBLISHERS = {
+    "HttpError": ".http_publisher",
+    "HttpPublisher": ".http_publisher",
+    "TwitterPublisher": ".twitter_publisher",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_PUBLISHERS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def _instance_configs(config):
+    """
+    Get the configs of the publishers the configuration enables.
+
+    Named instances in a "publishers" section take precedence. Without one,
+    a flat section named after a registered publisher type (e.g. "twitter")
+    enables that publisher when it sets an api_key or "enabled: true".
+    """
+    instances = getattr(config, "publisher_configs", None)
+    if instances:
+        return list(instances)
+
+    from ..utils.config import PublisherConfig
+
+    sections = getattr(config, "config", None) or {}
+    views = []
+    for name in available_publishers():
+        view = PublisherConfig(config, name, sections.get(name) or {}, flat=True)
+        if view.get(f"{name}_enabled", bool(view.get(f"{name}_api_key"))):
+            views.append(view)
+    return views
+
+
+def configured_publishers(config):
+    """
+    Get the names of the publishers enabled by the configuration.
+
+    Nothing is imported or initialized, so this is cheap enough for processes
+    that route jobs to publishers running elsewhere.
+
+    Args:
+        config: The application configuration
+
+    Returns:
+        list: Names of the configured publishers
+    """
+    return [view.publisher_name for view in _instance_configs(config)]
 
 
 def get_publishers(config):
     """
     Initialize and return all configured publishers.
 
+    Publisher classes are looked up in the registry by type, and only the
+    modules of the enabled publishers are imported.
+
     Args:
         config: The application configuration
 
     Returns:
         dict: A dictionary of publisher instances
+
+    Raises:
+        ValueError: If a publisher has an unknown type
     """
     publishers = {}
-
-    # Initialize Twitter publisher if configured
-    if hasattr(config, "twitter_api_key") and config.twitter_api_key:
-        publishers["twitter"] = TwitterPublisher(config)
-
-    # Add other publishers here as needed
-
+    for view in _instance_configs(config):
+        try:
+            cls = load_publisher_class(view.publisher_type)
+        except ValueError:
+            raise ValueError(
+                f"Unknown type {view.publisher_type!r} "
+                f"for publisher {view.publisher_name!r}"
+            ) from None
+        publishers[view.publisher_name] = cls(view)
     return publishers
 
 
-__all__ = ["BasePublisher", "TwitterPublisher", "get_publishers"]
+__all__ = [
+    "BasePublisher",
+    "HttpError",
+    "HttpPublisher",
+    "TwitterPublisher",
+    "available_publishers",
+    "configured_publishers",
+    "get_publishers",
+    "load_publisher_class",
+]
@@ -1,12 +1,25 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
+from typing import Dict
+
+from ..utils.rate_limiter import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
 
 
 class BasePublisher(ABC):
     """Base class for all social media publishers"""
 
+    # Seconds a single publish may take; None uses the bot's default
+    publish_timeout = None
+
     def __init__(self, config):
         self.config = config
+        # Name of the publisher instance, for configs of named instances
+        self.name = getattr(config, "publisher_name", None)
+        # Shared attachment downloader, assigned by the bot
+        self.downloader = None
         self.logger = logging.getLogger(
             f"discopilot.publishers.{self.__class__.__name__}"
         )
@@ -25,10 +38,76 @@ class BasePublisher(ABC):
         """
 
     @abstractmethod
-    async def check_rate_limit(self):
+    async def check_rate_limit(self) -> bool:
         """
         Check if the publisher is rate limited
 
+        Schedulers and dashboards may poll this, so implementations answer
+        from local state rather than calling the platform's API.
+
         Returns:
             bool: True if rate limited, False otherwise
         """
+
+    def share_rate_limits(self, path: str):
+        """
+        Keep the publisher's rate limits in a SQLite store shared between
+        processes, e.g. by the workers of a publisher pool that all use the
+        same account. Called before start(). The default implementation
+        does nothing, for publishers without rate limiters.
+
+        Args:
+            path: Path to the shared SQLite database
+        """
+
+    async def start(self):
+        """
+        Start any background work the publisher needs.
+
+        Called once the bot's event loop is running. The default implementation
+        does nothing.
+        """
+
+    async def close(self):
+        """
+        Release any resources held by the publisher.
+
+        Called when the bot shuts down. The default implementation does nothing.
+        """
+
+
+async def run_publisher(name: str, publisher: BasePublisher, message, timeout) -> Dict:
+    """
+    Publish a message with one publisher, bounded by a timeout.
+
+    Errors are reported in the result rather than raised, so one failing
+    platform doesn't affect the others.
+
+    Args:
+        name: The name of the publisher
+        publisher: The publisher to use
+        message: The message to publish
+        timeout: Seconds the publisher may take
+
+    Returns:
+        Dict: The publishing status and URL, plus retry_after in seconds if
+        the platform is rate limited
+    """
+    try:
+        logger.info("Publishing to %s...", name)
+        status, url = await asyncio.wait_for(publisher.publish(message), timeout)
+        logger.info("Published to %s: %s", name, status)
+        return {"status": status, "url": url}
+    except RateLimitExceeded as e:
+        logger.warning("Publishing to %s is rate limited: %s", name, e)
+        return {
+            "status": f"Rate limited, retrying in {e.retry_after:.0f} seconds",
+            "url": None,
+            "retry_after": e.retry_after,
+        }
+    except asyncio.TimeoutError:
+        logger.error("Publishing to %s timed out after %s seconds", name, timeout)
+        return {"status": f"Error: Timed out after {timeout} seconds", "url": None}
+    except Exception as e:
+        logger.error("Error publishing to %s: %s", name, e, exc_info=True)
+        return {"status": f"Error: {str(e)}", "url": None}
@@ -0,0 +1,334 @@
+"""
+Base class for publishers that talk to a platform's HTTP API.
+
+HttpPublisher owns a pooled aiohttp session per publisher and sends every
+request through the same pipeline: wait for rate limit capacity, bound the
+requests in flight, apply a per-request timeout, and retry transient
+failures with jittered exponential backoff. Subclasses only turn messages
+into requests and responses into results.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Dict, Mapping, Optional, Tuple
+
+import aiohttp
+
+from ..utils.media import create_session
+from ..utils.rate_limiter import (
+    RateLimiter,
+    acquire_or_reschedule,
+    pause_after_rate_limit,
+)
+from ..utils.shared_rate_limiter import SharedLimiterStore, SharedRateLimiter
+from .base_publisher import BasePublisher
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single request may take, including reading the response
+DEFAULT_REQUEST_TIMEOUT = 30
+
+# Requests one publisher sends at the same time
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Times a request that failed transiently is retried
+DEFAULT_MAX_RETRIES = 3
+
+# Backoff before the first retry; doubled per attempt, up to the maximum
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_MAX_RETRY_DELAY = 30.0
+
+# Seconds a request waits for rate limit capacity before the job is rescheduled
+DEFAULT_MAX_RATE_LIMIT_WAIT = 30
+
+# Seconds to back off after a 429 that doesn't say when to retry
+DEFAULT_RETRY_AFTER = 60
+
+# Statuses other than 5xx that may succeed if the request is sent again
+RETRYABLE_STATUSES = frozenset([408])
+
+# Methods that can be sent again without repeating their effect
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+class HttpError(Exception):
+    """Raised when a request to a platform's API fails."""
+
+    def __init__(self, message: str, status: Optional[int] = None, body: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+    @property
+    def retryable(self) -> bool:
+        """Whether the failed request may succeed if sent again."""
+        return (
+            self.status is None
+            or self.status >= 500
+            or self.status in RETRYABLE_STATUSES
+        )
+
+
+class HttpPublisher(BasePublisher):
+    """
+    Publisher for platforms with an HTTP API.
+
+    Subclasses set platform (the prefix of their settings), base_url and
+    rate_limits, implement publish() with request(), and may override the
+    request_headers() and observe_response() hooks.
+
+    Settings, read as "<platform>_<key>":
+        base_url: Overrides the class's base_url, e.g. for self-hosted servers
+        request_timeout: Seconds per request
+        max_concurrent_requests: Requests in flight at once
+        max_retries: Retries of a transiently failed request
+        retry_delay: Seconds before the first retry
+        max_rate_limit_wait: Seconds to wait for rate limit capacity
+        connections_per_host: Pooled connections kept open per host
+        rate_limits: Per-endpoint max_calls and period, overriding rate_limits
+    """
+
+    # Prefix of the publisher's settings when not configured as an instance
+    platform = "http"
+
+    # URL that request paths are relative to
+    base_url = ""
+
+    # Endpoint name -> (max calls, period in seconds)
+    rate_limits: Dict[str, Tuple[int, float]] = {}
+
+    def __init__(self, config):
+        """
+        Initialize the publisher. The session is created on first use, on the
+        event loop that uses it.
+
+        Args:
+            config: The publisher's configuration
+        """
+        super().__init__(config)
+        self.settings_prefix = getattr(config, "publisher_type", None) or self.platform
+
+        self.base_url = self.setting("base_url") or self.base_url
+        self.request_timeout = self.setting("request_timeout", DEFAULT_REQUEST_TIMEOUT)
+        self.max_concurrent_requests = self.setting(
+            "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self.max_retries = self.setting("max_retries", DEFAULT_MAX_RETRIES)
+        self.retry_delay = self.setting("retry_delay", DEFAULT_RETRY_DELAY)
+        self.max_retry_delay = self.setting("max_retry_delay", DEFAULT_MAX_RETRY_DELAY)
+        self.max_rate_limit_wait = self.setting(
+            "max_rate_limit_wait", DEFAULT_MAX_RATE_LIMIT_WAIT
+        )
+        self.connections_per_host = self.setting(
+            "connections_per_host", self.max_concurrent_requests
+        )
+
+        # Budgets are enforced locally so requests wait for capacity instead
+        # of being rejected by the platform with a 429
+        self.shared_limiter_store: Optional[SharedLimiterStore] = None
+        self.limiters: Dict[str, RateLimiter] = {}
+        self._create_limiters()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def setting(self, key: str, default=None):
+        """
+        Get one of the publisher's settings.
+
+        Args:
+            key: The setting's name without the platform prefix
+            default: Value to use if the setting isn't configured
+
+        Returns:
+            The configured value, or default if it is unset or None
+        """
+        value = self.config.get(f"{self.settings_prefix}_{key}")
+        return default if value is None else value
+
+    def _create_limiters(self):
+        configured_limits = self.setting("rate_limits") or {}
+        for endpoint, (max_calls, period) in self.rate_limits.items():
+            limit = configured_limits.get(endpoint, {})
+            max_calls = limit.get("max_calls", max_calls)
+            period = limit.get("period", period)
+            if self.shared_limiter_store is not None:
+                self.limiters[endpoint] = SharedRateLimiter(
+                    self.shared_limiter_store,
+                    f"{self.settings_prefix}:{self.name or 'default'}:{endpoint}",
+                    max_calls,
+                    period,
+                )
+            else:
+                self.limiters[endpoint] = RateLimiter(max_calls, period)
+
+    def share_rate_limits(self, path: str):
+        """Keep the endpoint limiters in a store shared between processes."""
+        if self.shared_limiter_store is None and self.rate_limits:
+            self.shared_limiter_store = SharedLimiterStore(path)
+            self._create_limiters()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The publisher's pooled HTTP session, created on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session(
+                connections_per_host=self.connections_per_host
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._session
+
+    async def close(self):
+        """Close the HTTP session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.shared_limiter_store is not None:
+            # Queued limiter writes must reach the store before it closes
+            for limiter in self.limiters.values():
+                await limiter.flush()
+            self.shared_limiter_store.close()
+
+    async def check_rate_limit(self) -> bool:
+        """
+        Check if any endpoint is rate limited.
+
+        Returns:
+            bool: True if rate limited, False otherwise
+        """
+        return any(limiter.is_limited() for limiter in self.limiters.values())
+
+    def request_headers(self, method: str, url: str) -> Dict[str, str]:
+        """
+        Get the headers to send with a request, e.g. for authentication.
+
+        Called before every attempt, so signatures can include a timestamp.
+        The default implementation sends no extra headers.
+        """
+        return {}
+
+    def observe_response(
+        self, endpoint: Optional[str], status: int, headers: Mapping[str, str]
+    ):
+        """
+        Inspect a response before it is handled, e.g. to sync a limiter with
+        the quota the platform reports. The default implementation does
+        nothing.
+
+        Args:
+            endpoint: The limiter name the request was made under, if any
+            status: The HTTP status
+            headers: The response headers
+        """
+
+    def _label(self, endpoint: Optional[str]) -> str:
+        return f"{self.settings_prefix} {endpoint or 'request'}"
+
+    def _backoff(self, attempt: int) -> float:
+        """Seconds to wait before a retry: exponential, with full jitter."""
+        return random.uniform(
+            0, min(self.max_retry_delay, self.retry_delay * 2**attempt)
+        )
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        endpoint: Optional[str] = None,
+        timeout: Optional[float] = None,
+        retry: Optional[bool] = None,
+        **kwargs,
+    ) -> Dict:
+        """
+        Send a request, retrying transient failures if it is safe to.
+
+        Each attempt waits for the endpoint's rate limit capacity and a free
+        request slot. A request that timed out or failed with a 5xx may still
+        have taken effect, so only idempotent methods are retried unless
+        retry says otherwise: a retried create-post POST could post twice.
+        Bodies are sent again on retries, so pass json, bytes or a dict as
+        data rather than a stream.
+
+        Args:
+            method: The HTTP method
+            path: A URL, or a path relative to base_url
+            endpoint: The limiter to spend a call from, if the endpoint is limited
+            timeout: Seconds the request may take, defaults to request_timeout
+            retry: Whether to retry transient failures; defaults to True for
+                idempotent methods and False otherwise, e.g. for POST. Set it
+                for requests the platform deduplicates, such as those with an
+                idempotency key
+            **kwargs: Passed on to aiohttp, e.g. json, data or params
+
+        Returns:
+            Dict: The decoded JSON response, empty if there was no body
+
+        Raises:
+            HttpError: If the request failed and retrying didn't help
+            RateLimitExceeded: If the endpoint is rate limited
+        """
+        url = path if "://" in path else self.base_url.rstrip("/") + path
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.request_timeout)
+        extra_headers = kwargs.pop("headers", None) or {}
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        max_retries = self.max_retries if retry else 0
+
+        for attempt in range(max_retries + 1):
+            if endpoint in self.limiters:
+                await acquire_or_reschedule(
+                    self.limiters[endpoint],
+                    self.max_rate_limit_wait,
+                    self._label(endpoint),
+                )
+            try:
+                return await self._send(
+                    method,
+                    url,
+                    endpoint,
+                    headers={**self.request_headers(method, url), **extra_headers},
+                    timeout=client_timeout,
+                    **kwargs,
+                )
+            except (HttpError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if isinstance(e, HttpError) and not e.retryable:
+                    raise
+                if attempt == max_retries:
+                    if isinstance(e, HttpError):
+                        raise
+                    raise HttpError(f"{method} {url} failed: {e!r}") from e
+                delay = self._backoff(attempt)
+                logger.warning(
+                    "%s %s failed (%r), retrying in %.1f seconds",
+                    method,
+                    url,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _send(self, method: str, url: str, endpoint: Optional[str], **kwargs):
+        """Send a single attempt of a request."""
+        session = self.session
+        async with self._semaphore:
+            async with session.request(method, url, **kwargs) as resp:
+                self.observe_response(endpoint, resp.status, resp.headers)
+                if resp.status == 429:
+                    raise pause_after_rate_limit(
+                        self.limiters.get(endpoint),
+                        resp.headers,
+                        self._label(endpoint),
+                        DEFAULT_RETRY_AFTER,
+                    )
+                if resp.status >= 400:
+                    text = await resp.text()
+                    raise HttpError(
+                        f"{method} {url} failed with HTTP {resp.status}: {text}",
+                        resp.status,
+                        text,
+                    )
+                body = await resp.read()
+                if not body:
+                    return {}
+                return await resp.json(content_type=None)
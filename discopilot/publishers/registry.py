@@ -0,0 +1,103 @@
+"""
+Registry of the publisher types that can be configured.
+
+Publishers are found through the "discopilot.publishers" entry point group,
+so another package can add a platform by declaring, in its pyproject.toml:
+
+    [project.entry-points."discopilot.publishers"]
+    mastodon = "discopilot_mastodon:MastodonPublisher"
+
+Discovering publishers only reads package metadata. A publisher's module,
+and with it its platform SDK, is imported when the configuration enables it.
+"""
+
+import logging
+from importlib.metadata import EntryPoint, entry_points
+from typing import Dict, Type
+
+from .base_publisher import BasePublisher
+
+logger = logging.getLogger(__name__)
+
+# Entry point group publishers are registered under
+ENTRY_POINT_GROUP = "discopilot.publishers"
+
+# Publishers shipped with DiscoPilot, available even when the package
+# metadata isn't installed (e.g. when running from a source checkout)
+BUILTIN_PUBLISHERS = {
+    "twitter": "discopilot.publishers.twitter_publisher:TwitterPublisher",
+}
+
+# Publisher type -> entry point, filled on first use
+_registry: Dict[str, EntryPoint] = {}
+
+# Publisher type -> loaded class
+_classes: Dict[str, Type[BasePublisher]] = {}
+
+
+def _discover() -> Dict[str, EntryPoint]:
+    """Find the publishers registered by the installed packages."""
+    found = {
+        name: EntryPoint(name, value, ENTRY_POINT_GROUP)
+        for name, value in BUILTIN_PUBLISHERS.items()
+    }
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # Python 3.9 returns a dict of groups
+        eps = eps.get(ENTRY_POINT_GROUP, ())
+    for ep in eps:
+        found[ep.name] = ep
+    return found
+
+
+def available_publishers() -> Dict[str, EntryPoint]:
+    """
+    Get the publisher types that can be configured.
+
+    Nothing is imported, so this is cheap enough to call at startup.
+
+    Returns:
+        Dict[str, EntryPoint]: Publisher type -> entry point of its class
+    """
+    if not _registry:
+        _registry.update(_discover())
+    return _registry
+
+
+def load_publisher_class(publisher_type: str) -> Type[BasePublisher]:
+    """
+    Import the class of a publisher type.
+
+    Args:
+        publisher_type: The registered name, e.g. "twitter"
+
+    Returns:
+        Type[BasePublisher]: The publisher class
+
+    Raises:
+        ValueError: If no publisher is registered under the name
+        TypeError: If the entry point isn't a BasePublisher subclass
+    """
+    cls = _classes.get(publisher_type)
+    if cls is not None:
+        return cls
+
+    ep = available_publishers().get(publisher_type)
+    if ep is None:
+        raise ValueError(f"Unknown publisher type {publisher_type!r}")
+
+    cls = ep.load()
+    if not (isinstance(cls, type) and issubclass(cls, BasePublisher)):
+        raise TypeError(
+            f"Publisher {publisher_type!r} ({ep.value}) is not a BasePublisher"
+        )
+    logger.debug("Loaded publisher %r from %s", publisher_type, ep.value)
+    _classes[publisher_type] = cls
+    return cls
+
+
+def reset_registry():
+    """Forget discovered and loaded publishers, e.g. after installing a plugin."""
+    _registry.clear()
+    _classes.clear()
@@ -0,0 +1,265 @@
+"""
+Chunked media upload engine for Twitter (X).
+
+Implements the INIT/APPEND/FINALIZE/STATUS flow of the media upload endpoint
+natively on aiohttp, so large videos are streamed from disk in segments and
+processing status is polled without blocking the event loop.
+"""
+
+import asyncio
+import logging
+import mimetypes
+import os
+from typing import Callable, Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+
+# Twitter accepts APPEND segments of up to 5 MB
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Times a single failed segment is retried before the upload is abandoned
+DEFAULT_MAX_CHUNK_RETRIES = 3
+
+# Files larger than this are always uploaded in chunks
+CHUNKED_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+
+
+class MediaUploadError(Exception):
+    """Raised when a chunked media upload fails."""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        # Response headers, e.g. the rate limit reset of a 429
+        self.headers = dict(headers or {})
+
+    @property
+    def retryable(self) -> bool:
+        """
+        Whether the failed request may succeed if sent again right away.
+
+        A 429 is not: it has to wait for the rate limit to reset, so the
+        whole job is rescheduled instead.
+        """
+        return self.status is None or self.status >= 500
+
+
+class OAuth1Signer:
+    """Signs upload requests with OAuth 1.0a user credentials."""
+
+    def __init__(self, api_key, api_secret, access_token, access_secret):
+        from oauthlib.oauth1 import Client
+
+        self._client = Client(
+            api_key,
+            client_secret=api_secret,
+            resource_owner_key=access_token,
+            resource_owner_secret=access_secret,
+        )
+
+    def sign(self, method: str, url: str) -> Dict[str, str]:
+        """
+        Build the Authorization header for a request.
+
+        Only the query string is signed, which is what Twitter expects for
+        multipart uploads.
+
+        Args:
+            method: The HTTP method
+            url: The full request URL, including query parameters
+
+        Returns:
+            Dict: Headers to send with the request
+        """
+        _, headers, _ = self._client.sign(url, http_method=method)
+        return headers
+
+
+def get_media_category(file_path: str) -> str:
+    """
+    Map a file to the Twitter media category used for chunked uploads.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        The media category string
+    """
+    mime_type = mimetypes.guess_type(file_path)[0] or ""
+    if mime_type == "image/gif":
+        return "tweet_gif"
+    if mime_type.startswith("video/"):
+        return "tweet_video"
+    return "tweet_image"
+
+
+class ChunkedUploader:
+    """Uploads media to Twitter with the chunked INIT/APPEND/FINALIZE flow."""
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        signer,
+        upload_url: str = UPLOAD_URL,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = DEFAULT_MAX_CHUNK_RETRIES,
+        retry_delay: float = 1.0,
+        on_response: Optional[Callable[[Mapping[str, str]], None]] = None,
+    ):
+        """
+        Initialize the uploader.
+
+        Args:
+            session: The HTTP session to upload with
+            signer: Object whose sign(method, url) returns auth headers
+            upload_url: The media upload endpoint
+            chunk_size: Bytes sent per APPEND segment
+            max_retries: Retries for a single failed segment
+            retry_delay: Initial delay in seconds between segment retries
+            on_response: Called with the headers of every response, e.g. to
+                track the rate limit quota
+        """
+        self.session = session
+        self.signer = signer
+        self.upload_url = upload_url
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_response = on_response
+
+    async def upload(self, file_path: str) -> str:
+        """
+        Upload a file and wait until Twitter has finished processing it.
+
+        Args:
+            file_path: Path to the file to upload
+
+        Returns:
+            str: The Twitter media ID
+
+        Raises:
+            MediaUploadError: If any step of the upload fails
+        """
+        total_bytes = os.path.getsize(file_path)
+        media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+        info = await self._command(
+            "INIT",
+            total_bytes=total_bytes,
+            media_type=media_type,
+            media_category=get_media_category(file_path),
+        )
+        media_id = info["media_id_string"]
+        logger.debug("Initialized chunked upload %s (%s bytes)", media_id, total_bytes)
+
+        await self._append_file(media_id, file_path)
+
+        info = await self._command("FINALIZE", media_id=media_id)
+        await self._wait_for_processing(media_id, info.get("processing_info"))
+        return media_id
+
+    async def _append_file(self, media_id: str, file_path: str):
+        """Stream a file from disk as a sequence of APPEND segments."""
+        loop = asyncio.get_running_loop()
+        with open(file_path, "rb") as f:
+            segment_index = 0
+            while True:
+                chunk = await loop.run_in_executor(None, f.read, self.chunk_size)
+                if not chunk:
+                    break
+                await self._append_chunk(media_id, segment_index, chunk)
+                segment_index += 1
+
+    async def _append_chunk(self, media_id: str, segment_index: int, chunk: bytes):
+        """Send one segment, retrying just this segment on transient errors."""
+        for attempt in range(self.max_retries + 1):
+            form = aiohttp.FormData()
+            form.add_field(
+                "media",
+                chunk,
+                filename="media",
+                content_type="application/octet-stream",
+            )
+            try:
+                await self._command(
+                    "APPEND", data=form, media_id=media_id, segment_index=segment_index
+                )
+                return
+            except (MediaUploadError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if isinstance(e, MediaUploadError) and not e.retryable:
+                    raise
+                if attempt == self.max_retries:
+                    raise MediaUploadError(
+                        f"Segment {segment_index} of media {media_id} failed "
+                        f"after {self.max_retries} retries: {e}",
+                        getattr(e, "status", None),
+                        getattr(e, "headers", None),
+                    ) from e
+                delay = self.retry_delay * 2**attempt
+                logger.warning(
+                    "Segment %s of media %s failed (%s), retrying in %s seconds",
+                    segment_index,
+                    media_id,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _wait_for_processing(self, media_id: str, processing_info):
+        """Poll STATUS until Twitter reports the media as processed."""
+        while processing_info:
+            state = processing_info.get("state")
+            if state == "succeeded":
+                return
+            if state == "failed":
+                error = processing_info.get("error", {})
+                raise MediaUploadError(
+                    f"Processing of media {media_id} failed: "
+                    f"{error.get('message', 'unknown error')}"
+                )
+
+            await asyncio.sleep(processing_info.get("check_after_secs", 1))
+            info = await self._command("STATUS", method="GET", media_id=media_id)
+            processing_info = info.get("processing_info")
+
+    async def _command(self, command: str, method: str = "POST", data=None, **params):
+        """
+        Send a single signed upload command.
+
+        Args:
+            command: The upload command (INIT, APPEND, FINALIZE or STATUS)
+            method: The HTTP method
+            data: Optional request body
+            **params: Query parameters for the command
+
+        Returns:
+            Dict: The decoded JSON response, empty if there was no body
+        """
+        url = f"{self.upload_url}?{urlencode({'command': command, **params})}"
+        headers = self.signer.sign(method, url)
+        async with self.session.request(
+            method, url, headers=headers, data=data
+        ) as resp:
+            if self.on_response is not None:
+                self.on_response(resp.headers)
+            if resp.status >= 400:
+                text = await resp.text()
+                raise MediaUploadError(
+                    f"{command} failed with HTTP {resp.status}: {text}",
+                    resp.status,
+                    resp.headers,
+                )
+            body = await resp.read()
+            if not body:
+                return {}
+            return await resp.json(content_type=None)
@@ -1,14 +1,62 @@
+import asyncio
+import functools
 import logging
 import os
-from typing import Dict, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
 
+import aiohttp
 import tweepy
 
-from ..utils.media import download_attachments, get_media_type
+from ..utils.media import MediaDownloader, cleanup_files, get_media_type
+from ..utils.rate_limiter import (
+    RateLimiter,
+    RateLimitExceeded,
+    acquire_or_reschedule,
+    load_limiter_state,
+    pause_after_rate_limit,
+    save_limiter_state,
+)
+from ..utils.shared_rate_limiter import SharedLimiterStore, SharedRateLimiter
 from .base_publisher import BasePublisher
+from .twitter_media import (
+    CHUNKED_UPLOAD_THRESHOLD,
+    ChunkedUploader,
+    MediaUploadError,
+    OAuth1Signer,
+)
 
 logger = logging.getLogger(__name__)
 
+# Number of threads used to run blocking tweepy calls off the event loop
+DEFAULT_MAX_WORKERS = 4
+
+# Twitter accepts at most four media items per tweet
+MAX_MEDIA_PER_TWEET = 4
+
+# Per-user limits of the endpoints we call, as (max_calls, period in seconds)
+DEFAULT_RATE_LIMITS = {
+    "create_tweet": (200, 15 * 60),
+    "media_upload": (415, 15 * 60),
+}
+
+# Seconds a call waits for rate limit capacity before the job is rescheduled
+DEFAULT_MAX_RATE_LIMIT_WAIT = 30.0
+
+# Seconds between refreshes of the rate limit status snapshot; the status
+# endpoint is itself limited to 180 calls per 15 minutes
+DEFAULT_RATE_LIMIT_REFRESH_INTERVAL = 300
+
+# Seconds between saves of the limiter state file
+DEFAULT_RATE_LIMIT_SAVE_INTERVAL = 60
+
+# Seconds to back off after a 429 that doesn't say when the limit resets
+DEFAULT_RETRY_AFTER = 15 * 60
+
+# Limiter state file of a publisher without a configured path, by its name
+DEFAULT_RATE_LIMIT_STATE_PATH = "~/.local/share/discopilot/{name}_limits.json"
+
 
 class TwitterPublisher(BasePublisher):
     """Publisher for Twitter (X)."""
@@ -24,6 +72,54 @@ class TwitterPublisher(BasePublisher):
         self.access_secret = config.twitter_access_secret
         self.bearer_token = config.twitter_bearer_token
 
+        self.publish_timeout = config.get("twitter_publish_timeout")
+
+        # tweepy is synchronous, so every API call runs on a bounded thread
+        # pool to keep the Discord event loop responsive
+        self.max_workers = (
+            config.get("twitter_max_workers", DEFAULT_MAX_WORKERS)
+            or DEFAULT_MAX_WORKERS
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="discopilot-twitter"
+        )
+
+        # One token bucket per endpoint, so calls wait locally for capacity
+        # instead of being rejected by Twitter with a 429. Processes sharing
+        # these credentials can share their buckets too.
+        self.rate_limits = config.get("twitter_rate_limits") or {}
+        self.shared_limiter_store: Optional[SharedLimiterStore] = None
+        self.limiters: Dict[str, RateLimiter] = {}
+        self._create_limiters(config.get("twitter_shared_rate_limits_path"))
+        self.max_rate_limit_wait = (
+            config.get("twitter_max_rate_limit_wait", DEFAULT_MAX_RATE_LIMIT_WAIT)
+            or DEFAULT_MAX_RATE_LIMIT_WAIT
+        )
+        # Loop the limiters live on; responses arrive on executor threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Snapshot of the account's rate limit status, refreshed in the background
+        self.rate_limit_refresh_interval = (
+            config.get("twitter_rate_limit_refresh_interval")
+            or DEFAULT_RATE_LIMIT_REFRESH_INTERVAL
+        )
+        self._rate_limit_status: Optional[Dict] = None
+        self._rate_limit_fetched_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Limiter state is saved periodically and on shutdown, and restored at
+        # startup, so restarts don't reset the budget
+        self.rate_limit_state_path = config.get(
+            "twitter_rate_limit_state_path"
+        ) or os.path.expanduser(
+            DEFAULT_RATE_LIMIT_STATE_PATH.format(name=self.name or "twitter")
+        )
+        self._save_task: Optional[asyncio.Task] = None
+
+        # Large media goes through the async chunked uploader, created on first use
+        self._uploader: Optional[ChunkedUploader] = None
+        self._upload_session: Optional[aiohttp.ClientSession] = None
+
         # Check if credentials are provided
         if not all(
             [self.api_key, self.api_secret, self.access_token, self.access_secret]
@@ -48,17 +144,279 @@ class TwitterPublisher(BasePublisher):
             access_token_secret=self.access_secret,
         )
 
+        # Feed the quota Twitter reports on every response into the limiters
+        for session in (self.api.session, self.client.session):
+            session.hooks["response"].append(self._on_response)
+
         logger.info("Twitter publisher initialized")
 
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking tweepy call on the publisher's thread pool.
+
+        Args:
+            func: The synchronous callable to run
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        loop = self._loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _acquire(self, endpoint: str):
+        """Wait for rate limit capacity on an endpoint, see acquire_or_reschedule."""
+        await acquire_or_reschedule(
+            self.limiters[endpoint], self.max_rate_limit_wait, f"Twitter {endpoint}"
+        )
+
+    @staticmethod
+    def _endpoint_for(url: str) -> Optional[str]:
+        """Get the limiter name for a Twitter API URL, if it is one we limit."""
+        if "/media/upload" in url:
+            return "media_upload"
+        if url.split("?")[0].endswith("/2/tweets"):
+            return "create_tweet"
+        return None
+
+    def _on_response(self, response, *args, **kwargs):
+        """requests response hook; runs on the executor thread that made the call."""
+        endpoint = self._endpoint_for(response.url)
+        if endpoint is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(
+                self._observe_headers, endpoint, dict(response.headers)
+            )
+        return response
+
+    def _observe_headers(self, endpoint: str, headers: Mapping[str, str]):
+        """Sync an endpoint's limiter with the quota reported in response headers."""
+        headers = {key.lower(): value for key, value in headers.items()}
+        limiter = self.limiters[endpoint]
+        now = time.time()
+        try:
+            remaining = headers.get("x-rate-limit-remaining")
+            reset = headers.get("x-rate-limit-reset")
+            if remaining is not None and reset is not None:
+                limit = headers.get("x-rate-limit-limit")
+                limiter.update(
+                    int(remaining), float(reset) - now, int(limit) if limit else None
+                )
+
+            # Tweet creation also has a daily cap per user
+            daily_remaining = headers.get("x-user-limit-24hour-remaining")
+            daily_reset = headers.get("x-user-limit-24hour-reset")
+            if daily_remaining == "0" and daily_reset is not None:
+                limiter.set_cooldown(float(daily_reset) - now)
+        except ValueError:
+            logger.debug("Ignoring malformed rate limit headers: %s", headers)
+
+    def _handle_rate_limited(self, endpoint: str, headers: Mapping[str, str]):
+        """
+        Pause an endpoint after a 429 and build the error to reschedule with.
+
+        Returns:
+            RateLimitExceeded: Carries the seconds until the limit resets
+        """
+        self._observe_headers(endpoint, headers)
+        return pause_after_rate_limit(
+            self.limiters[endpoint], headers, f"Twitter {endpoint}", DEFAULT_RETRY_AFTER
+        )
+
+    async def _upload_attachments(self, attachments: List) -> List[str]:
+        """
+        Download and upload attachments as a pipeline.
+
+        Each attachment starts uploading as soon as its own download finishes,
+        so media time is roughly that of the slowest attachment rather than the
+        sum of all of them. If any download or upload fails, the remaining
+        transfers are cancelled and the error is raised, so a tweet is never
+        posted with some of its media missing.
+
+        Args:
+            attachments: List of Discord attachment objects
+
+        Returns:
+            List of Twitter media IDs, in attachment order
+        """
+        if len(attachments) > MAX_MEDIA_PER_TWEET:
+            logger.warning(
+                "Message has %s attachments, only the first %s will be uploaded",
+                len(attachments),
+                MAX_MEDIA_PER_TWEET,
+            )
+            attachments = attachments[:MAX_MEDIA_PER_TWEET]
+
+        if self.downloader is None:
+            async with MediaDownloader() as downloader:
+                return await self._transfer_all(attachments, downloader)
+        return await self._transfer_all(attachments, self.downloader)
+
+    async def _transfer_all(self, attachments: List, downloader) -> List[str]:
+        """Run one download-then-upload transfer per attachment concurrently."""
+        tasks = [
+            asyncio.ensure_future(self._transfer_attachment(attachment, downloader))
+            for attachment in attachments
+        ]
+        try:
+            media_ids = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return list(media_ids)
+
+    async def _transfer_attachment(self, attachment, downloader) -> str:
+        """
+        Download a single attachment and upload it to Twitter.
+
+        Args:
+            attachment: A Discord attachment object
+            downloader: The MediaDownloader to fetch the attachment with
+
+        Returns:
+            The Twitter media ID
+
+        Raises:
+            Exception: If the attachment couldn't be downloaded or uploaded
+        """
+        file_path = await downloader.download_one(attachment)
+        if not file_path:
+            raise Exception(f"Failed to download {attachment.filename}")
+
+        try:
+            media_type = get_media_type(file_path)
+            logger.debug("Uploading %s media file: %s", media_type, attachment.filename)
+            await self._acquire("media_upload")
+            try:
+                if self._needs_chunked_upload(file_path, media_type):
+                    uploader = await self._get_uploader()
+                    media_id = await uploader.upload(file_path)
+                else:
+                    uploaded = await self._run_blocking(
+                        self.api.media_upload, filename=file_path
+                    )
+                    media_id = uploaded.media_id_string
+            except tweepy.TooManyRequests as e:
+                raise self._handle_rate_limited("media_upload", e.response.headers)
+            except MediaUploadError as e:
+                if e.status == 429:
+                    raise self._handle_rate_limited("media_upload", e.headers)
+                raise
+            logger.debug("Media uploaded successfully, ID: %s", media_id)
+            return media_id
+        finally:
+            cleanup_files([file_path])
+
+    @staticmethod
+    def _needs_chunked_upload(file_path: str, media_type: Optional[str]) -> bool:
+        """Videos, GIFs and large files must use the chunked upload flow."""
+        return (
+            media_type == "video"
+            or file_path.lower().endswith(".gif")
+            or os.path.getsize(file_path) > CHUNKED_UPLOAD_THRESHOLD
+        )
+
+    async def _get_uploader(self) -> ChunkedUploader:
+        """Create the chunked uploader and its HTTP session on first use."""
+        if self._uploader is None:
+            self._upload_session = aiohttp.ClientSession()
+            self._uploader = ChunkedUploader(
+                self._upload_session,
+                OAuth1Signer(
+                    self.api_key,
+                    self.api_secret,
+                    self.access_token,
+                    self.access_secret,
+                ),
+                on_response=functools.partial(self._observe_headers, "media_upload"),
+            )
+        return self._uploader
+
+    def _create_limiters(self, shared_path: Optional[str]):
+        """Create the endpoint limiters, in the shared store if a path is given."""
+        if shared_path:
+            self.shared_limiter_store = SharedLimiterStore(shared_path)
+        # Access tokens start with the ID of the account they belong to
+        account = (self.access_token or "").split("-")[0] or "default"
+
+        for endpoint, (max_calls, period) in DEFAULT_RATE_LIMITS.items():
+            limit = self.rate_limits.get(endpoint, {})
+            max_calls = limit.get("max_calls", max_calls)
+            period = limit.get("period", period)
+            if self.shared_limiter_store is not None:
+                self.limiters[endpoint] = SharedRateLimiter(
+                    self.shared_limiter_store,
+                    f"twitter:{account}:{endpoint}",
+                    max_calls,
+                    period,
+                )
+            else:
+                self.limiters[endpoint] = RateLimiter(max_calls, period)
+
+    def share_rate_limits(self, path: str):
+        """Keep the rate limiters in a shared store, unless one is configured."""
+        if self.shared_limiter_store is None:
+            self._create_limiters(path)
+
+    async def start(self):
+        """Restore saved limiter state and start the background tasks."""
+        # Shared limiters already live in their database
+        if (
+            self.rate_limit_state_path
+            and self.shared_limiter_store is None
+            and self._save_task is None
+        ):
+            restored = load_limiter_state(self.rate_limit_state_path, self.limiters)
+            if restored:
+                logger.info(
+                    "Restored %s rate limiters from %s",
+                    restored,
+                    self.rate_limit_state_path,
+                )
+            self._save_task = asyncio.create_task(
+                self._save_limiters_periodically(), name="twitter-rate-limit-save"
+            )
+
+        if self.api is not None and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(
+                self._refresh_rate_limits(), name="twitter-rate-limit-refresh"
+            )
+
+    async def close(self):
+        """Shut down the thread pool and upload session used for API calls."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        if self._save_task is not None:
+            self._save_task.cancel()
+            await asyncio.gather(self._save_task, return_exceptions=True)
+            self._save_task = None
+            await self.save_limiters()
+        if self.shared_limiter_store is not None:
+            # Queued limiter writes must reach the store before it closes
+            for limiter in self.limiters.values():
+                await limiter.flush()
+            self.shared_limiter_store.close()
+        self._executor.shutdown(wait=False)
+        if self._upload_session is not None:
+            await self._upload_session.close()
+            self._upload_session = None
+            self._uploader = None
+
     async def publish(self, message) -> Tuple[str, Optional[str]]:
         """Publish a message to Twitter."""
         try:
             # Log the entire message object structure
-            logger.info(f"Publishing message type: {type(message)}")
+            logger.debug("Publishing message type: %s", type(message))
 
             # Check if message is a Discord message object
             if hasattr(message, "id"):
-                logger.info(f"Message ID: {message.id}")
+                logger.debug("Message ID: %s", message.id)
             else:
                 logger.error("Message object doesn't have an ID attribute")
                 return "Error: Invalid message object", None
@@ -73,28 +431,25 @@ class TwitterPublisher(BasePublisher):
             try:
                 if hasattr(message, "content"):
                     content = message.content
-                    logger.info(
-                        f"Message content: {content[:50]}..."
-                        if content
-                        else "No content"
-                    )
+                    logger.debug("Message content: %.50s...", content)
                 else:
                     # If message is a string (from test scripts)
                     if isinstance(message, str):
                         content = message
-                        logger.info(f"Message is a string: {content[:50]}...")
+                        logger.debug("Message is a string: %.50s...", content)
                     else:
                         logger.error(
-                            f"Message has no content attribute and is not a string: {type(message)}"
+                            "Message has no content attribute and is not a string: %s",
+                            type(message),
                         )
                         return "Error: Cannot extract content from message", None
             except Exception as e:
-                logger.error(f"Error accessing message content: {e}", exc_info=True)
+                logger.error("Error accessing message content: %s", e, exc_info=True)
                 return f"Error accessing message content: {str(e)}", None
 
             # Check for embeds if content is empty
             has_embeds = hasattr(message, "embeds") and message.embeds
-            logger.info(f"Message has embeds: {has_embeds}")
+            logger.debug("Message has embeds: %s", has_embeds)
 
             if has_embeds and not content:
                 # Format embed content in the original style
@@ -104,13 +459,9 @@ class TwitterPublisher(BasePublisher):
                 description = embed.description or ""
                 url = embed.url or ""
 
-                logger.info(f"Embed title: {title}")
-                logger.info(
-                    f"Embed description: {description[:50]}..."
-                    if description
-                    else "No description"
-                )
-                logger.info(f"Embed URL: {url}")
+                logger.debug("Embed title: %s", title)
+                logger.debug("Embed description: %.50s...", description)
+                logger.debug("Embed URL: %s", url)
 
                 # Calculate available space for description
                 # Title line: title + ":"
@@ -119,8 +470,10 @@ class TwitterPublisher(BasePublisher):
                 reserved_chars = len(title) + 1 + len("Source: ") + len(url) + 2
                 available_chars = 280 - reserved_chars
 
-                logger.info(
-                    f"Reserved chars: {reserved_chars}, Available for description: {available_chars}"
+                logger.debug(
+                    "Reserved chars: %s, Available for description: %s",
+                    reserved_chars,
+                    available_chars,
                 )
 
                 # Format the tweet with single line breaks
@@ -168,8 +521,8 @@ class TwitterPublisher(BasePublisher):
 
                 # Combine parts into final content with single line breaks
                 content = "\n".join(tweet_parts)
-                logger.info(f"Formatted tweet content: {content[:100]}...")
-                logger.info(f"Tweet length: {len(content)} characters")
+                logger.debug("Formatted tweet content: %.100s...", content)
+                logger.debug("Tweet length: %s characters", len(content))
 
             # Check if we have content, embeds, or attachments
             has_attachments = hasattr(message, "attachments") and message.attachments
@@ -178,89 +531,150 @@ class TwitterPublisher(BasePublisher):
                 logger.error("Message has no content, embeds, or attachments")
                 return "Error: Empty message", None
 
-            # Download attachments if any
+            # Download and upload attachments if any
             media_ids = []
             if has_attachments:
-                logger.debug(f"Message has {len(message.attachments)} attachments")
-                media_files = await download_attachments(message.attachments)
-
-                if media_files:
-                    logger.info(
-                        f"Uploading media for tweet: "
-                        f"{', '.join([f'{m.filename} ({m.size} bytes)' for m in media_files])}"
-                    )
-
-                    # Upload media to Twitter
-                    for media in media_files:
-                        media_type = get_media_type(media.filename)
-                        logger.debug(
-                            f"Media type: {media_type} for file {media.filename}"
-                        )
-                        try:
-                            logger.debug(f"Uploading media file: {media.filename}")
-                            media_id = self.api.media_upload(
-                                filename=media.filename, file=media.file
-                            ).media_id_string
-                            logger.debug(f"Media uploaded successfully, ID: {media_id}")
-                            media_ids.append(media_id)
-                        except Exception as e:
-                            logger.error(f"Error uploading media: {e}", exc_info=True)
-                            return f"Error uploading media: {str(e)}", None
-
-                            # Clean up temp files
-                            try:
-                                os.unlink(media.filename)
-                            except Exception as e:
-                                logger.warning(f"Error deleting temp file: {e}")
+                logger.debug("Message has %s attachments", len(message.attachments))
+                try:
+                    media_ids = await self._upload_attachments(message.attachments)
+                except RateLimitExceeded:
+                    raise
+                except Exception as e:
+                    logger.error("Error uploading media: %s", e, exc_info=True)
+                    return f"Error uploading media: {str(e)}", None
 
             # Final check to ensure we're under 280 characters
             if len(content) > 280:
-                logger.debug(f"Content too long ({len(content)} chars), truncating")
+                logger.debug("Content too long (%s chars), truncating", len(content))
                 content = content[:277] + "..."
 
             try:
                 # Post tweet
                 logger.debug(
-                    f"Attempting to post tweet with content: '{content[:50]}...'"
+                    "Attempting to post tweet with content: '%s...'", content[:50]
                 )
-                logger.debug(f"Using media IDs: {media_ids}")
+                logger.debug("Using media IDs: %s", media_ids)
+                await self._acquire("create_tweet")
 
                 if media_ids:
                     logger.debug("Creating tweet with media")
-                    response = self.client.create_tweet(
-                        text=content, media_ids=media_ids
+                    response = await self._run_blocking(
+                        self.client.create_tweet, text=content, media_ids=media_ids
                     )
                 else:
                     logger.debug("Creating tweet without media")
-                    response = self.client.create_tweet(text=content)
+                    response = await self._run_blocking(
+                        self.client.create_tweet, text=content
+                    )
 
-                logger.debug(f"Twitter API response: {response}")
+                logger.debug("Twitter API response: %s", response)
                 tweet_id = response.data["id"]
                 tweet_url = f"https://twitter.com/user/status/{tweet_id}"
-                logger.info(f"Tweet posted successfully with ID: {tweet_id}")
+                logger.info("Tweet posted successfully with ID: %s", tweet_id)
                 return "Success", tweet_url
+            except RateLimitExceeded:
+                raise
+            except tweepy.TooManyRequests as e:
+                raise self._handle_rate_limited("create_tweet", e.response.headers)
             except Exception as e:
-                logger.error(f"Error posting tweet: {e}", exc_info=True)
+                logger.error("Error posting tweet: %s", e, exc_info=True)
                 import traceback
 
-                logger.error(f"Traceback: {traceback.format_exc()}")
+                logger.error("Traceback: %s", traceback.format_exc())
                 return f"Error: {str(e)}", None
+        except RateLimitExceeded:
+            # Propagated so the bot can reschedule the job for after the reset
+            raise
         except Exception as e:
-            logger.error(f"Error publishing message: {e}", exc_info=True)
+            logger.error("Error publishing message: %s", e, exc_info=True)
             return f"Error: {str(e)}", None
 
-    def check_rate_limit(self) -> Dict:
-        """Check Twitter API rate limit status."""
+    async def save_limiters(self):
+        """Write the limiters' state to the state file off the event loop."""
+        states = {name: limiter.snapshot() for name, limiter in self.limiters.items()}
+        try:
+            await self._run_blocking(
+                save_limiter_state, self.rate_limit_state_path, states
+            )
+        except Exception as e:
+            logger.error("Error saving rate limiter state: %s", e, exc_info=True)
+
+    async def _save_limiters_periodically(self):
+        """Save the limiters' state until cancelled."""
+        while True:
+            await asyncio.sleep(DEFAULT_RATE_LIMIT_SAVE_INTERVAL)
+            await self.save_limiters()
+
+    async def _refresh_rate_limits(self):
+        """Refresh the rate limit status snapshot until cancelled."""
+        while True:
+            await self.refresh_rate_limit_status()
+            await asyncio.sleep(self.rate_limit_refresh_interval)
+
+    async def refresh_rate_limit_status(self):
+        """Fetch the account's rate limit status and cache it."""
+        try:
+            self._rate_limit_status = await self._run_blocking(
+                self.api.rate_limit_status
+            )
+            self._rate_limit_fetched_at = time.monotonic()
+            logger.debug("Refreshed Twitter rate limit status")
+        except Exception as e:
+            logger.error("Error refreshing rate limit status: %s", e, exc_info=True)
+
+    async def check_rate_limit(self) -> bool:
+        """
+        Check if any Twitter endpoint is rate limited.
+
+        Only the local limiters are read, which follow the quota Twitter
+        reports on every response, so this can be polled freely.
+
+        Returns:
+            bool: True if rate limited, False otherwise
+        """
+        return any(limiter.is_limited() for limiter in self.limiters.values())
+
+    async def get_rate_limit_status(self) -> Dict:
+        """
+        Get the cached Twitter rate limit status, e.g. for a dashboard.
+
+        This only reads the snapshot kept fresh by the background refresh, so
+        it can be polled freely. The first call before any refresh fetches the
+        status once.
+
+        Returns:
+            Dict: The rate limit status from the API, plus "age" (seconds since
+            it was fetched) and "limiters" (the local per-endpoint limiters)
+        """
         if not self.api:
             return {"error": "Twitter API not configured"}
 
+        if self._rate_limit_status is None:
+            await self.refresh_rate_limit_status()
+            if self._rate_limit_status is None:
+                return {"error": "Rate limit status unavailable"}
+        elif self._refresh_task is None and (
+            time.monotonic() - self._rate_limit_fetched_at
+            > self.rate_limit_refresh_interval
+        ):
+            # Without the background task, refresh stale snapshots lazily
+            self._refresh_task = asyncio.create_task(self._refresh_once())
+
+        return {
+            **self._rate_limit_status,
+            "age": time.monotonic() - self._rate_limit_fetched_at,
+            "limiters": {
+                endpoint: {
+                    "remaining": limiter.get_remaining_calls(),
+                    "reset_in": limiter.get_reset_time(),
+                }
+                for endpoint, limiter in self.limiters.items()
+            },
+        }
+
+    async def _refresh_once(self):
+        """Refresh a stale snapshot when the background refresh isn't running."""
         try:
-            rate_limit_status = self.api.rate_limit_status()
-            logger.info(
-                f"Rate limit status: "
-                f"{rate_limit_status.get('resources', {}).get('statuses', {})}"
-            )
-            return rate_limit_status
-        except Exception as e:
-            logger.error(f"Error checking rate limit: {e}", exc_info=True)
-            return {"error": str(e)}
+            await self.refresh_rate_limit_status()
+        finally:
+            self._refresh_task = None
@@ -3,9 +3,23 @@ import asyncio
 import logging
 import sys
 
-from ..bot.discord_client import HedwigBot
-from ..publishers import get_publishers
-from ..utils.config import Config
+from ..utils.logger import set_sample_rates, setup_logging
+from ..utils.startup import StartupProfile
+
+
+async def _profile_services(client, profile: StartupProfile):
+    """
+    Time the startup of the client's services that have no side effects.
+
+    The publish queue, outbox replay, publisher pool, config reloader and
+    publishers' own start() are left alone: they would publish pending
+    jobs, spawn processes or call platform APIs.
+    """
+    try:
+        with profile.stage("open downloader"):
+            await client.downloader.start()
+    finally:
+        await client.close()
 
 
 def main():
@@ -18,16 +32,25 @@ def main():
         default="INFO",
         help="Set the logging level",
     )
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="Write logs as plain text or as one JSON object per line",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Report the time taken by each startup stage and exit "
+        "without connecting to Discord",
+    )
     args = parser.parse_args()
+    profile = StartupProfile()
 
-    # Set up logging
+    # Set up logging; records are written by a background thread so the
+    # event loop never blocks on log output
     log_level = getattr(logging, args.log_level)
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler()],
-        force=True,
-    )
+    setup_logging(log_level, json_format=args.log_format == "json")
 
     # Set discord.py logger to DEBUG
     discord_logger = logging.getLogger("discord")
@@ -36,33 +59,130 @@ def main():
     )
 
     logger = logging.getLogger("discopilot")
-    logger.info(f"Logging level set to {args.log_level}")
+    logger.info("Logging level set to %s", args.log_level)
+
+    # The bot's modules pull in discord.py and aiohttp, so they are imported
+    # here where the time can be attributed to a stage
+    with profile.stage("import bot"):
+        from ..bot.discord_client import HedwigBot
+        from ..bot.idempotency import IdempotencyIndex
+        from ..bot.outbox import Outbox
+        from ..bot.publisher_pool import ProcessPublisherPool
+        from ..bot.sharded_client import ShardedHedwigBot
+        from ..utils.media import MediaDownloader
+
+    with profile.stage("import publishers"):
+        from ..publishers import configured_publishers, get_publishers
+
+    with profile.stage("import config"):
+        from ..utils.config import Config, ConfigReloader
 
     # Load configuration
     try:
-        config = Config()
-        logger.info(f"Config loaded with trigger emoji: '{config.trigger_emoji}'")
+        with profile.stage("load config"):
+            config = Config()
+        logger.info("Config loaded with trigger emoji: '%s'", config.trigger_emoji)
     except Exception as e:
-        logger.error(f"Failed to load configuration: {e}")
+        logger.error("Failed to load configuration: %s", e)
         sys.exit(1)
 
-    # Initialize publishers
-    publishers = get_publishers(config)
-    logger.info(f"Initialized publishers: {list(publishers.keys())}")
-
-    # Initialize the Discord client
-    client = HedwigBot(
-        token=config.discord_token,
-        server_ids=config.server_ids,
-        admin_ids=config.admin_ids,
-        channel_ids=config.allowed_channel_ids,
-        trigger_emoji=config.trigger_emoji,
-        send_notifications=config.send_notifications,
-    )
+    # Keep only a sample of records from high-frequency loggers
+    set_sample_rates(config.log_sample_rates)
+
+    # Initialize publishers; their SDKs are imported here on first use. With a
+    # process pool they only run in the worker processes.
+    publisher_pool = None
+    with profile.stage("init publishers"):
+        if config.process_pool_enabled:
+            publishers = {}
+            publisher_pool = ProcessPublisherPool(
+                configured_publishers(config),
+                config_path=config.path,
+                workers=config.process_pool_workers,
+                publish_timeout=config.publish_timeout,
+                log_level=log_level,
+                shared_rate_limits_path=config.process_pool_shared_rate_limits_path,
+            )
+            logger.info(
+                "Publishing to %s in %s worker processes",
+                publisher_pool.publisher_names,
+                config.process_pool_workers,
+            )
+        else:
+            publishers = get_publishers(config)
+            logger.info("Initialized publishers: %s", list(publishers.keys()))
+
+    with profile.stage("init client"):
+        # Persist publish jobs so they survive restarts
+        outbox = None
+        if config.outbox_enabled:
+            outbox = Outbox(config.outbox_path, max_attempts=config.outbox_max_attempts)
+
+        # Remember published messages across restarts
+        idempotency = None
+        if config.idempotency_enabled:
+            idempotency = IdempotencyIndex(
+                config.idempotency_path,
+                retention_days=config.idempotency_retention_days,
+            )
+
+        # Pick up configuration changes on SIGHUP or when the file is edited
+        config_reloader = None
+        if config.reload_enabled:
+            config_reloader = ConfigReloader(
+                config.path, interval=config.reload_interval
+            )
+            config_reloader.subscribe(
+                lambda new_config: set_sample_rates(new_config.log_sample_rates)
+            )
+
+        # Sharded mode runs several gateway connections, optionally only
+        # some of the bot's shards in this process
+        client_class = HedwigBot
+        client_options = {}
+        if config.sharding_enabled:
+            client_class = ShardedHedwigBot
+            client_options = {
+                "shard_count": config.shard_count,
+                "shard_ids": config.shard_ids,
+            }
+
+        # Initialize the Discord client
+        client = client_class(
+            token=config.discord_token,
+            server_ids=config.server_ids,
+            admin_ids=config.admin_ids,
+            channel_ids=config.allowed_channel_ids,
+            trigger_emoji=config.trigger_emoji,
+            send_notifications=config.send_notifications,
+            publish_timeout=config.publish_timeout,
+            downloader=MediaDownloader(
+                max_concurrency=config.media_max_concurrent_downloads,
+                connections_per_host=config.media_connections_per_host,
+                max_size=config.media_max_attachment_mb * 1024 * 1024,
+            ),
+            publish_workers=config.queue_workers,
+            publish_queue_size=config.queue_max_size,
+            outbox=outbox,
+            idempotency=idempotency,
+            message_cache_size=config.message_cache_size,
+            low_memory=config.low_memory,
+            reaction_rules=config.trigger_rules,
+            publisher_scopes=config.publisher_scopes,
+            config_reloader=config_reloader,
+            publisher_pool=publisher_pool,
+            **client_options,
+        )
+
+        # Add publishers after initialization
+        for name, publisher in publishers.items():
+            client.add_publisher(name, publisher)
 
-    # Add publishers after initialization
-    for name, publisher in publishers.items():
-        client.add_publisher(name, publisher)
+    if args.startup_profile:
+        asyncio.run(_profile_services(client, profile))
+        print(profile.report())
+        return
+    logger.info("Initialized in %.0f ms", profile.total * 1000)
 
     # Run the client
     try:
@@ -71,7 +191,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Bot crashed: {e}")
+        logger.error("Bot crashed: %s", e)
         sys.exit(1)
 
 
@@ -1,10 +1,36 @@
 """
 Utilities module for DiscoPilot.
 Contains configuration, logging, and other utility functions.
+
+Attributes are imported on first access, so importing one utility module
+doesn't load the dependencies of all the others.
 """
 
-from .config import Config
-from .rate_limiter import RateLimiter
-from .setup import setup_config
+import importlib
+
+# Attribute name -> module defining it
+_LAZY_ATTRIBUTES = {
+    "Config": ".config",
+    "ConfigReloader": ".config",
+    "RateLimiter": ".rate_limiter",
+    "RateLimitExceeded": ".rate_limiter",
+    "setup_config": ".setup",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["Config", "RateLimiter", "setup_config"]
+__all__ = [
+    "Config",
+    "ConfigReloader",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "setup_config",
+]
@@ -1,7 +1,10 @@
+import asyncio
 import logging
 import os
+import signal
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Tuple
 
 import yaml
 from dotenv import load_dotenv
@@ -27,7 +30,7 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     """
     # If config_path is provided, use it
     if config_path:
-        logger.info(f"Loading configuration from specified path: {config_path}")
+        logger.info("Loading configuration from specified path: %s", config_path)
         with open(config_path, "r") as f:
             return yaml.safe_load(f)
 
@@ -35,8 +38,8 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     if "DISCOPILOT_CONFIG" in os.environ:
         env_path = os.environ["DISCOPILOT_CONFIG"]
         logger.info(
-            f"Loading configuration from environment variable DISCOPILOT_CONFIG: "
-            f"{env_path}"
+            "Loading configuration from environment variable DISCOPILOT_CONFIG: %s",
+            env_path,
         )
         with open(env_path, "r") as f:
             return yaml.safe_load(f)
@@ -48,13 +51,13 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     ]
 
     logger.info(
-        f"Checking for configuration file in current directory and user config directory: "
-        f"{[str(p) for p in config_paths]}"
+        "Checking for configuration file in current directory and user config directory: %s",
+        [str(p) for p in config_paths],
     )
 
     for path in config_paths:
         if path.exists():
-            logger.info(f"Found configuration file at {path}")
+            logger.info("Found configuration file at %s", path)
             with open(path, "r") as f:
                 return yaml.safe_load(f)
 
@@ -66,120 +69,200 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     )
 
 
+# Environment variables that override a value from the configuration file
+ENV_OVERRIDES = {
+    "discord_token": "DISCORD_TOKEN",
+    "twitter_api_key": "TWITTER_API_KEY",
+    "twitter_api_secret": "TWITTER_API_SECRET",
+    "twitter_access_token": "TWITTER_ACCESS_TOKEN",
+    "twitter_access_secret": "TWITTER_ACCESS_SECRET",
+    "twitter_bearer_token": "TWITTER_BEARER_TOKEN",
+    "_trigger_emoji": "TRIGGER_EMOJI",
+}
+
+# Environment variables holding comma-separated ID lists
+ENV_ID_OVERRIDES = {
+    "admin_ids": "ADMIN_IDS",
+    "server_ids": "SERVER_IDS",
+}
+
+# Seconds between checks of the configuration file for changes
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+
+def find_config_path(config_path: Optional[str] = None) -> str:
+    """
+    Find the configuration file to use.
+
+    Args:
+        config_path: Explicit path; otherwise DISCOPILOT_CONFIG, ./config.yaml
+            and ~/.config/discopilot/config.yaml are tried in turn
+
+    Returns:
+        str: Path of the configuration file
+
+    Raises:
+        FileNotFoundError: If no configuration file is found
+    """
+    config_path = config_path or os.environ.get("DISCOPILOT_CONFIG")
+    if config_path and os.path.exists(config_path):
+        return config_path
+
+    if os.path.exists("config.yaml"):
+        return "config.yaml"
+
+    user_config_path = os.path.expanduser("~/.config/discopilot/config.yaml")
+    if os.path.exists(user_config_path):
+        return user_config_path
+
+    raise FileNotFoundError(
+        "No configuration file found. Please create a config.yaml file based on the example "
+        "in the examples directory, or set the DISCOPILOT_CONFIG environment variable."
+    )
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class PublisherConfig:
+    """
+    The configuration of one named publisher instance.
+
+    Publishers read their settings as "<type>_<key>" attributes or get()
+    keys, as from the flat Config. A view answers those from the instance's
+    own block only, so credentials, limiter state and other per-account
+    settings are never taken from another account. Anything else, such as
+    publish_timeout or the media settings, comes from the base config.
+
+    Flat platform sections (e.g. "twitter") are views too. Config already
+    parses some of them, applying environment overrides and defaults, so
+    for those the base config's attributes take precedence.
+    """
+
+    def __init__(self, base: "Config", name: str, options: Dict, flat: bool = False):
+        """
+        Initialize the view.
+
+        Args:
+            base: The configuration the instance is defined in
+            name: The instance's name, used to route jobs to it
+            options: The instance's block; "type" selects the publisher
+                class and defaults to the name
+            flat: Whether the options are a flat platform section
+        """
+        self.base = base
+        self.publisher_name = name
+        self.publisher_type = options.get("type", name)
+        self.options = options
+        self.flat = flat
+        self._prefix = f"{self.publisher_type}_"
+
+        # Guilds and channels the instance is limited to; empty for everywhere
+        self.guild_ids = tuple(int(guild_id) for guild_id in options.get("guilds", ()))
+        self.channel_ids = tuple(
+            int(channel_id) for channel_id in options.get("channels", ())
+        )
+
+    def _option(self, key: str, default=None):
+        if self.flat and hasattr(self.base, self._prefix + key):
+            return getattr(self.base, self._prefix + key)
+        value = self.options.get(key, default)
+        if key.endswith("_path") and isinstance(value, str):
+            value = os.path.expanduser(value)
+        return value
+
+    def __getattr__(self, attr):
+        # Only called for attributes not set in __init__
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr.startswith(self._prefix):
+            return self._option(attr[len(self._prefix) :])
+        return getattr(self.base, attr)
+
+    def get(self, key, default=None):
+        """Get a setting of the instance, or of the base config if not per-instance."""
+        if key.startswith(self._prefix):
+            return self._option(key[len(self._prefix) :], default)
+        return self.base.get(key, default)
+
+    def __repr__(self):
+        return f"PublisherConfig({self.publisher_name!r}, type={self.publisher_type!r})"
+
+
 class Config:
+    """
+    An immutable snapshot of the bot configuration.
+
+    The file is parsed once and every derived value is computed up front, so
+    reading settings on hot paths is a plain attribute lookup. Config()
+    returns the current snapshot; ConfigReloader replaces it with a freshly
+    parsed one when the file changes, and never modifies a snapshot in place.
+    """
+
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, config_path=None):
         if cls._instance is None:
-            cls._instance = super(Config, cls).__new__(cls)
-            cls._instance._load_config()
+            cls._instance = cls.load(config_path)
         return cls._instance
 
     def __init__(self, config_path=None):
-        self.config = {}
-        self._load_config(config_path)
-        self._process_config()
-
-    def _load_config(self, config_path=None):
-        # First try user-specified config path
-        if config_path:
-            config_path = config_path
-        else:
-            config_path = os.environ.get("DISCOPILOT_CONFIG")
-
-        # If not specified, look in standard locations
-        if not config_path or not os.path.exists(config_path):
-            # Check current directory
-            if os.path.exists("config.yaml"):
-                config_path = "config.yaml"
-            # Check user's config directory
-            else:
-                user_config_dir = os.path.expanduser("~/.config/discopilot")
-                user_config_path = os.path.join(user_config_dir, "config.yaml")
-                if os.path.exists(user_config_path):
-                    config_path = user_config_path
-                else:
-                    # No config found, raise an error with helpful message
-                    raise FileNotFoundError(
-                        "No configuration file found. Please create a config.yaml file based on the example "
-                        "in the examples directory, or set the DISCOPILOT_CONFIG environment variable."
-                    )
-
-        with open(config_path, "r") as f:
-            self.config = yaml.safe_load(f)
+        # Everything is set up by load(); Config() only returns the snapshot
+        pass
 
-        # Override with environment variables
-        self.discord_token = os.environ.get(
-            "DISCORD_TOKEN", self.config.get("discord", {}).get("token")
-        )
-        self.twitter_api_key = os.environ.get(
-            "TWITTER_API_KEY", self.config.get("twitter", {}).get("api_key")
-        )
-        self.twitter_api_secret = os.environ.get(
-            "TWITTER_API_SECRET", self.config.get("twitter", {}).get("api_secret")
-        )
-        self.twitter_access_token = os.environ.get(
-            "TWITTER_ACCESS_TOKEN", self.config.get("twitter", {}).get("access_token")
-        )
-        self.twitter_access_secret = os.environ.get(
-            "TWITTER_ACCESS_SECRET", self.config.get("twitter", {}).get("access_secret")
-        )
-        self.twitter_bearer_token = os.environ.get(
-            "TWITTER_BEARER_TOKEN", self.config.get("twitter", {}).get("bearer_token")
-        )
+    @classmethod
+    def load(cls, config_path: Optional[str] = None) -> "Config":
+        """
+        Parse a configuration file into a new snapshot.
 
-        # Add other platform configs as needed
+        The snapshot isn't made current; see ConfigReloader for that.
 
-        # Reaction configuration
-        self._trigger_emoji = os.environ.get(
-            "TRIGGER_EMOJI", self.config.get("triggers", {}).get("emoji", "📢")
-        )
-        self.admin_ids = [
-            int(id) for id in os.environ.get("ADMIN_IDS", "").split(",") if id
-        ] or self.config.get("admin_ids", [])
-
-        # Discord configuration from environment variables
-        self.discord_token = os.environ.get("DISCORD_TOKEN", self.discord_token)
-
-        # Server IDs from environment variables
-        server_ids_env = os.environ.get("SERVER_IDS", "")
-        if server_ids_env:
-            self.server_ids = [int(id) for id in server_ids_env.split(",") if id]
-
-        # Admin IDs from environment variables
-        admin_ids_env = os.environ.get("ADMIN_IDS", "")
-        if admin_ids_env:
-            self.admin_ids = [int(id) for id in admin_ids_env.split(",") if id]
-
-        # Trigger emoji from environment variables
-        self._trigger_emoji = os.environ.get("TRIGGER_EMOJI", self._trigger_emoji)
-
-        # Twitter configuration from environment variables
-        self.twitter_api_key = os.environ.get("TWITTER_API_KEY", self.twitter_api_key)
-        self.twitter_api_secret = os.environ.get(
-            "TWITTER_API_SECRET", self.twitter_api_secret
-        )
-        self.twitter_access_token = os.environ.get(
-            "TWITTER_ACCESS_TOKEN", self.twitter_access_token
-        )
-        self.twitter_access_secret = os.environ.get(
-            "TWITTER_ACCESS_SECRET", self.twitter_access_secret
-        )
-        self.twitter_bearer_token = os.environ.get(
-            "TWITTER_BEARER_TOKEN", self.twitter_bearer_token
-        )
+        Args:
+            config_path: Path to the configuration file, or None to search
 
-        # New OAuth 2.0 credentials
-        self.twitter_client_id = self.config.get("twitter", {}).get("client_id")
-        self.twitter_client_secret = self.config.get("twitter", {}).get("client_secret")
-        self.twitter_oauth2_refresh_token = self.config.get("twitter", {}).get(
-            "oauth2_refresh_token"
-        )
-        self.twitter_oauth2_access_token = self.config.get("twitter", {}).get(
-            "oauth2_access_token"
-        )
+        Returns:
+            Config: The parsed configuration
 
-        # ... other configurations ...
+        Raises:
+            FileNotFoundError: If no configuration file is found
+            yaml.YAMLError: If the configuration file is invalid
+        """
+        path = find_config_path(config_path)
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+
+        snapshot = super().__new__(cls)
+        snapshot.path = path
+        snapshot.config = _freeze(data)
+        snapshot._process_config()
+        snapshot._apply_env_overrides()
+        snapshot._frozen = True
+        return snapshot
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Config is read-only, cannot set {name!r}")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Config is read-only, cannot delete {name!r}")
+
+    def _apply_env_overrides(self):
+        """Let environment variables take precedence over the file."""
+        for attr, env_var in ENV_OVERRIDES.items():
+            if os.environ.get(env_var):
+                setattr(self, attr, os.environ[env_var])
+
+        for attr, env_var in ENV_ID_OVERRIDES.items():
+            ids = tuple(int(id) for id in os.environ.get(env_var, "").split(",") if id)
+            if ids:
+                setattr(self, attr, ids)
 
     def _process_config(self):
         """Process the loaded configuration and set attributes."""
@@ -188,13 +271,18 @@ class Config:
         self.discord_token = discord_config.get("token")
 
         # Server IDs - support both new and old format for backward compatibility
-        self.server_ids = discord_config.get("servers", []) or discord_config.get(
-            "server_ids", []
+        self.server_ids = discord_config.get("servers", ()) or discord_config.get(
+            "server_ids", ()
         )
 
         # Admin IDs - support both new and old format for backward compatibility
-        self.admin_ids = discord_config.get("admins", []) or self.config.get(
-            "admin_ids", []
+        self.admin_ids = discord_config.get("admins", ()) or self.config.get(
+            "admin_ids", ()
+        )
+
+        # Channel IDs may be written as strings; empty means all channels
+        self._allowed_channel_ids = tuple(
+            int(channel_id) for channel_id in discord_config.get("allowed_channels", ())
         )
 
         # Trigger configuration - support both new and old format
@@ -202,9 +290,29 @@ class Config:
             "emoji"
         ) or self.config.get("triggers", {}).get("emoji", "📢")
 
+        # Per-guild and per-channel trigger rules routing to publisher subsets
+        self.trigger_rules = discord_config.get("triggers", {}).get(
+            "rules"
+        ) or self.config.get("triggers", {}).get("rules", ())
+
         # Notification settings
         self._send_notifications = discord_config.get("send_notifications", False)
 
+        # Seconds each publisher may take before it is cancelled
+        self.publish_timeout = discord_config.get("publish_timeout", 120)
+
+        # Number of fetched messages kept in memory to avoid refetching
+        self.message_cache_size = discord_config.get("message_cache_size", 1000)
+
+        # Trim gateway intents and discord.py's caches to what the bot uses
+        self.low_memory = discord_config.get("low_memory", False)
+
+        # Gateway sharding, for bots in thousands of guilds
+        sharding_config = discord_config.get("sharding", {})
+        self.sharding_enabled = sharding_config.get("enabled", False)
+        self.shard_count = sharding_config.get("shard_count")
+        self.shard_ids = sharding_config.get("shard_ids")
+
         # Twitter configuration
         twitter_config = self.config.get("twitter", {})
         self.twitter_api_key = twitter_config.get("api_key")
@@ -212,6 +320,25 @@ class Config:
         self.twitter_access_token = twitter_config.get("access_token")
         self.twitter_access_secret = twitter_config.get("access_secret")
         self.twitter_bearer_token = twitter_config.get("bearer_token")
+        self.twitter_max_workers = twitter_config.get("max_workers")
+        self.twitter_publish_timeout = twitter_config.get("publish_timeout")
+        self.twitter_rate_limits = twitter_config.get("rate_limits", {})
+        self.twitter_shared_rate_limits_path = twitter_config.get(
+            "shared_rate_limits_path"
+        )
+        if self.twitter_shared_rate_limits_path:
+            self.twitter_shared_rate_limits_path = os.path.expanduser(
+                self.twitter_shared_rate_limits_path
+            )
+        self.twitter_max_rate_limit_wait = twitter_config.get("max_rate_limit_wait")
+        self.twitter_rate_limit_refresh_interval = twitter_config.get(
+            "rate_limit_refresh_interval"
+        )
+        self.twitter_rate_limit_state_path = os.path.expanduser(
+            twitter_config.get(
+                "rate_limit_state_path", "~/.local/share/discopilot/twitter_limits.json"
+            )
+        )
 
         # New OAuth 2.0 credentials
         self.twitter_client_id = twitter_config.get("client_id")
@@ -219,6 +346,69 @@ class Config:
         self.twitter_oauth2_refresh_token = twitter_config.get("oauth2_refresh_token")
         self.twitter_oauth2_access_token = twitter_config.get("oauth2_access_token")
 
+        # Attachment download settings
+        media_config = self.config.get("media", {})
+        self.media_max_concurrent_downloads = media_config.get(
+            "max_concurrent_downloads", 4
+        )
+        self.media_connections_per_host = media_config.get("connections_per_host", 8)
+        self.media_max_attachment_mb = media_config.get("max_attachment_mb", 512)
+
+        # Publish worker pool settings
+        queue_config = self.config.get("queue", {})
+        self.queue_workers = queue_config.get("workers", 2)
+        self.queue_max_size = queue_config.get("max_size", 100)
+
+        # Publisher worker processes, separate from the gateway process
+        pool_config = self.config.get("process_pool", {})
+        self.process_pool_enabled = pool_config.get("enabled", False)
+        self.process_pool_workers = pool_config.get("workers", 2)
+        # Rate limit store shared by the workers; None for the default
+        self.process_pool_shared_rate_limits_path = pool_config.get(
+            "shared_rate_limits_path"
+        )
+        if self.process_pool_shared_rate_limits_path:
+            self.process_pool_shared_rate_limits_path = os.path.expanduser(
+                self.process_pool_shared_rate_limits_path
+            )
+
+        # Logger name -> N, keeping one in every N records below WARNING
+        self.log_sample_rates = self.config.get("logging", {}).get("sample_rates", {})
+
+        # Named publisher instances, each with its own account and settings.
+        # When given, they replace the single publisher of the flat sections.
+        self.publisher_configs = tuple(
+            PublisherConfig(self, name, options or {})
+            for name, options in self.config.get("publishers", {}).items()
+        )
+        self.publisher_scopes = MappingProxyType(
+            {
+                view.publisher_name: (view.guild_ids, view.channel_ids)
+                for view in self.publisher_configs
+            }
+        )
+
+        # Durable outbox for publish jobs
+        outbox_config = self.config.get("outbox", {})
+        self.outbox_enabled = outbox_config.get("enabled", True)
+        self.outbox_path = os.path.expanduser(
+            outbox_config.get("path", "~/.local/share/discopilot/outbox.db")
+        )
+        self.outbox_max_attempts = outbox_config.get("max_attempts", 3)
+
+        # Index of published messages used to avoid republishing
+        idempotency_config = self.config.get("idempotency", {})
+        self.idempotency_enabled = idempotency_config.get("enabled", True)
+        self.idempotency_path = os.path.expanduser(
+            idempotency_config.get("path", "~/.local/share/discopilot/published.db")
+        )
+        self.idempotency_retention_days = idempotency_config.get("retention_days", 30)
+
+        # Reloading the configuration file while the bot runs
+        reload_config = self.config.get("reload", {})
+        self.reload_enabled = reload_config.get("enabled", True)
+        self.reload_interval = reload_config.get("interval", DEFAULT_RELOAD_INTERVAL)
+
         # ... other configurations ...
 
     @property
@@ -246,16 +436,128 @@ class Config:
         return self._trigger_emoji
 
     @property
-    def allowed_channel_ids(self) -> List[int]:
-        """Get the list of allowed channel IDs."""
-        channels = self.config.get("discord", {}).get("allowed_channels", [])
-        if not channels:
-            return []  # Empty list means all channels are allowed
-
-        # Convert string IDs to integers
-        return [int(channel_id) for channel_id in channels]
+    def allowed_channel_ids(self) -> Tuple[int, ...]:
+        """Get the allowed channel IDs; empty means all channels are allowed."""
+        return self._allowed_channel_ids
 
     @property
     def send_notifications(self) -> bool:
         """Get whether to send notifications about publishing."""
         return self._send_notifications
+
+
+class ConfigReloader:
+    """
+    Reloads the configuration on SIGHUP or when the file changes.
+
+    Each reload parses the file into a new Config snapshot off the event
+    loop, makes it current and passes it to every subscriber. If the file
+    can't be parsed, the error is logged and the current snapshot is kept.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        interval: float = DEFAULT_RELOAD_INTERVAL,
+    ):
+        """
+        Initialize the reloader.
+
+        Args:
+            path: Configuration file to watch, defaults to the current
+                snapshot's file
+            interval: Seconds between checks of the file's modification time,
+                or 0 to only reload on SIGHUP
+        """
+        self.path = path or Config().path
+        self.interval = interval
+        self.reloads = 0
+        self._subscribers: List[Callable[[Config], None]] = []
+        self._stamp = self._file_stamp()
+        self._task: Optional[asyncio.Task] = None
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self._signal_installed = False
+
+    def subscribe(self, callback: Callable[[Config], None]):
+        """Call callback with each new snapshot after it is made current."""
+        self._subscribers.append(callback)
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def start(self):
+        """Install the SIGHUP handler and start watching the file."""
+        loop = asyncio.get_running_loop()
+        sighup = getattr(signal, "SIGHUP", None)
+        if sighup is not None:
+            try:
+                loop.add_signal_handler(sighup, self._on_sighup)
+                self._signal_installed = True
+            except (NotImplementedError, RuntimeError) as e:
+                # Not supported on this platform or outside the main thread
+                logger.debug("Can't reload configuration on SIGHUP: %s", e)
+
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(
+                self._watch(), name="discopilot-config-watch"
+            )
+
+    async def stop(self):
+        """Stop watching the file and remove the SIGHUP handler."""
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+            self._signal_installed = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_sighup(self):
+        logger.info("Received SIGHUP, reloading configuration")
+        asyncio.ensure_future(self.reload())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            stamp = self._file_stamp()
+            if stamp is not None and stamp != self._stamp:
+                logger.info("Configuration file %s changed, reloading", self.path)
+                await self.reload()
+
+    async def reload(self) -> Optional[Config]:
+        """
+        Parse the file, make the new snapshot current and notify subscribers.
+
+        Returns:
+            Optional[Config]: The new snapshot, or None if the file is invalid
+        """
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+
+        async with self._reload_lock:
+            # Remember the file version first, so a write during the parse
+            # triggers another reload
+            self._stamp = self._file_stamp()
+            loop = asyncio.get_running_loop()
+            try:
+                snapshot = await loop.run_in_executor(None, Config.load, self.path)
+            except Exception as e:
+                logger.error("Keeping current configuration, reload failed: %s", e)
+                return None
+
+            Config._instance = snapshot
+            self.reloads += 1
+            for callback in self._subscribers:
+                try:
+                    callback(snapshot)
+                except Exception:
+                    logger.exception("Error applying reloaded configuration")
+            logger.info("Configuration reloaded from %s", self.path)
+            return snapshot
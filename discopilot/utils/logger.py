@@ -0,0 +1,160 @@
+"""
+Logging setup that keeps formatting and I/O off the event loop thread.
+
+Records are put on an in-memory queue by a QueueHandler and written by a
+QueueListener on a background thread. The message is only formatted there,
+so log calls on the hot paths cost little more than creating the record.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampling_filter: Optional["SamplingFilter"] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes only one in every N records from high-frequency loggers.
+
+    Warnings and errors are never dropped. Rates apply to a logger and its
+    children, e.g. a rate for "discord.gateway" also covers
+    "discord.gateway.shard".
+    """
+
+    def __init__(self, rates: Optional[Dict[str, int]] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            rates: Logger name to N, keeping one in every N records
+        """
+        super().__init__()
+        self.rates: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        self.set_rates(rates or {})
+
+    def set_rates(self, rates: Dict[str, int]):
+        """Replace the sampling rates."""
+        self.rates = {name: int(rate) for name, rate in rates.items() if rate > 1}
+        self._counts = {name: 0 for name in self.rates}
+        self._resolved = {}
+
+    def _rate_name(self, logger_name: str) -> Optional[str]:
+        """Find the most specific configured logger covering logger_name."""
+        name = logger_name
+        while name:
+            if name in self.rates:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.rates or record.levelno >= logging.WARNING:
+            return True
+        try:
+            name = self._resolved[record.name]
+        except KeyError:
+            name = self._resolved[record.name] = self._rate_name(record.name)
+        if name is None:
+            return True
+        count = self._counts[name]
+        self._counts[name] = count + 1
+        return count % self.rates[name] == 0
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record doesn't need to
+        # be made picklable by formatting it here
+        return record
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    json_format: bool = False,
+    sample_rates: Optional[Dict[str, int]] = None,
+    stream=None,
+) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a queue to a background writer thread.
+
+    Calling this again replaces the previous setup.
+
+    Args:
+        level: Level of the root logger
+        json_format: Write one JSON object per line instead of plain text
+        sample_rates: Logger name to N, keeping one in every N records below
+            WARNING from that logger
+        stream: Stream to write to, defaults to stderr
+
+    Returns:
+        QueueListener: The running listener; it is stopped at exit
+    """
+    global _listener, _sampling_filter
+
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if json_format else logging.Formatter(DEFAULT_FORMAT)
+    )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(log_queue)
+    _sampling_filter = SamplingFilter(sample_rates)
+    handler.addFilter(_sampling_filter)
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, output, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
+
+
+def set_sample_rates(rates: Dict[str, int]):
+    """Update the sampling rates of the logging set up by setup_logging()."""
+    if _sampling_filter is not None:
+        _sampling_filter.set_rates(rates)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -2,46 +2,276 @@
 Utility functions for handling media files in messages.
 """
 
+import asyncio
+import logging
 import os
 import tempfile
 from typing import List, Optional
 
 import aiohttp
 
+logger = logging.getLogger(__name__)
 
-async def download_attachments(attachments: List) -> List[str]:
+# Defaults for the shared attachment download session
+DEFAULT_MAX_CONCURRENT_DOWNLOADS = 4
+DEFAULT_CONNECTIONS_PER_HOST = 8
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+
+# Attachments are streamed to disk in chunks of this many bytes
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Largest attachment we download (Twitter's own video size limit)
+DEFAULT_MAX_ATTACHMENT_SIZE = 512 * 1024 * 1024
+
+
+def create_session(
+    connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+    dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+    keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """
+    Create an HTTP session suited for reuse across many downloads.
+
+    Args:
+        connections_per_host: Maximum open connections to a single host
+        dns_cache_ttl: Seconds to cache DNS lookups
+        keepalive_timeout: Seconds to keep idle connections open
+
+    Returns:
+        A new aiohttp session; the caller is responsible for closing it
+    """
+    connector = aiohttp.TCPConnector(
+        limit_per_host=connections_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def download_attachment(
+    session: aiohttp.ClientSession,
+    attachment,
+    max_size: int = DEFAULT_MAX_ATTACHMENT_SIZE,
+) -> Optional[str]:
+    """
+    Stream a single attachment to a temporary file.
+
+    The download is aborted as soon as the attachment is known to exceed
+    max_size, either from its declared size or from the bytes received so far.
+
+    Args:
+        session: The HTTP session to download with
+        attachment: A Discord attachment object
+        max_size: Maximum attachment size in bytes
+
+    Returns:
+        Path to the downloaded file, or None if the download failed or was too large
+    """
+    declared_size = getattr(attachment, "size", None)
+    if isinstance(declared_size, int) and declared_size > max_size:
+        logger.warning(
+            "Skipping attachment %s: %s bytes exceeds limit of %s bytes",
+            attachment.filename,
+            declared_size,
+            max_size,
+        )
+        return None
+
+    # Create a temporary file
+    fd, file_path = tempfile.mkstemp(suffix=f".{attachment.filename.split('.')[-1]}")
+    os.close(fd)
+
+    try:
+        async with session.get(attachment.url) as resp:
+            if resp.status != 200:
+                logger.warning(
+                    "Failed to download attachment %s: HTTP %s",
+                    attachment.filename,
+                    resp.status,
+                )
+            elif resp.content_length is not None and resp.content_length > max_size:
+                logger.warning(
+                    "Skipping attachment %s: Content-Length %s exceeds limit of %s bytes",
+                    attachment.filename,
+                    resp.content_length,
+                    max_size,
+                )
+            elif await _stream_to_file(resp, file_path, max_size):
+                return file_path
+            else:
+                logger.warning(
+                    "Aborted download of %s: exceeded limit of %s bytes",
+                    attachment.filename,
+                    max_size,
+                )
+    except BaseException:
+        cleanup_files([file_path])
+        raise
+
+    cleanup_files([file_path])
+    return None
+
+
+async def _stream_to_file(
+    resp: aiohttp.ClientResponse, file_path: str, max_size: int
+) -> bool:
+    """
+    Write a response body to disk chunk by chunk.
+
+    Args:
+        resp: The response to read
+        file_path: Path of the file to write
+        max_size: Maximum number of bytes to accept
+
+    Returns:
+        True if the whole body was written, False if it exceeded max_size
+    """
+    received = 0
+    with open(file_path, "wb") as f:
+        async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            received += len(chunk)
+            if received > max_size:
+                return False
+            f.write(chunk)
+    return True
+
+
+async def download_attachments(
+    attachments: List,
+    session: Optional[aiohttp.ClientSession] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+    max_size: int = DEFAULT_MAX_ATTACHMENT_SIZE,
+) -> List[str]:
     """
     Download attachments from a Discord message.
 
     Args:
         attachments: List of Discord attachment objects
+        session: HTTP session to reuse. A temporary one is created if omitted.
+        max_concurrency: Maximum number of attachments downloaded at once
+        max_size: Maximum size in bytes of a single attachment
 
     Returns:
-        List of paths to downloaded files
+        List of paths to downloaded files, in attachment order
     """
-    file_paths = []
-
     if not attachments:
-        return file_paths
+        return []
 
-    async with aiohttp.ClientSession() as session:
-        for attachment in attachments:
-            # Create a temporary file
-            fd, file_path = tempfile.mkstemp(
-                suffix=f".{attachment.filename.split('.')[-1]}"
+    if session is None:
+        async with create_session() as session:
+            return await download_attachments(
+                attachments, session, max_concurrency, max_size
             )
-            os.close(fd)
 
-            # Download the attachment
-            async with session.get(attachment.url) as resp:
-                if resp.status == 200:
-                    with open(file_path, "wb") as f:
-                        f.write(await resp.read())
-                    file_paths.append(file_path)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded_download(attachment):
+        async with semaphore:
+            return await download_attachment(session, attachment, max_size)
+
+    return await _gather_downloads(
+        bounded_download(attachment) for attachment in attachments
+    )
+
+
+async def _gather_downloads(downloads) -> List[str]:
+    """Run downloads concurrently, deleting every file if any of them raises."""
+    results = await asyncio.gather(*downloads, return_exceptions=True)
+
+    file_paths = [result for result in results if isinstance(result, str)]
+    for result in results:
+        if isinstance(result, BaseException):
+            cleanup_files(file_paths)
+            raise result
 
     return file_paths
 
 
+class MediaDownloader:
+    """Downloads message attachments over a long-lived, pooled HTTP session."""
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENT_DOWNLOADS,
+        connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+        dns_cache_ttl: int = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        max_size: int = DEFAULT_MAX_ATTACHMENT_SIZE,
+    ):
+        """
+        Initialize the downloader.
+
+        Args:
+            max_concurrency: Maximum attachments downloaded at once, across
+                all messages and publishers sharing the downloader
+            connections_per_host: Maximum open connections to a single host
+            dns_cache_ttl: Seconds to cache DNS lookups
+            keepalive_timeout: Seconds to keep idle connections open
+            max_size: Maximum size in bytes of a single attachment
+        """
+        self.max_concurrency = max_concurrency
+        self.connections_per_host = connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.max_size = max_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Bounds every download, created on the event loop that uses it
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        """Open the shared HTTP session if it isn't open already."""
+        if self.session is None or self.session.closed:
+            self.session = create_session(
+                connections_per_host=self.connections_per_host,
+                dns_cache_ttl=self.dns_cache_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def download_one(self, attachment) -> Optional[str]:
+        """
+        Download a single attachment using the shared session.
+
+        Args:
+            attachment: A Discord attachment object
+
+        Returns:
+            Path to the downloaded file, or None if the download failed
+        """
+        await self.start()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await download_attachment(self.session, attachment, self.max_size)
+
+    async def download(self, attachments: List) -> List[str]:
+        """
+        Download attachments using the shared session.
+
+        Args:
+            attachments: List of Discord attachment objects
+
+        Returns:
+            List of paths to downloaded files, in attachment order
+        """
+        return await _gather_downloads(
+            self.download_one(attachment) for attachment in attachments
+        )
+
+
 def get_media_type(file_path: str) -> Optional[str]:
     """
     Determine the media type of a file based on its extension.
@@ -1,67 +1,358 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
 import time
-from collections import deque
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call can't be made until the rate limit resets."""
+
+    def __init__(self, retry_after: float, message: Optional[str] = None):
+        super().__init__(message or f"Rate limited, retry in {retry_after:.0f} seconds")
+        self.retry_after = retry_after
 
 
 class RateLimiter:
     """
-    A utility class to handle rate limiting for API calls
+    An async token bucket that paces API calls to stay under a rate limit.
+
+    The bucket holds up to max_calls tokens and refills continuously at
+    max_calls per period. Each call spends one token; callers that find the
+    bucket empty wait in turn with acquire() instead of sending requests that
+    would be rejected.
+
+    When the server reports its actual quota with update(), the bucket
+    follows the server's window instead: the reported remaining calls are
+    all that is available until the window resets.
     """
 
-    def __init__(self, max_calls, period):
+    def __init__(
+        self,
+        max_calls: int,
+        period: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
         """
         Initialize the rate limiter
 
         Args:
             max_calls (int): Maximum number of calls allowed in the period
-            period (int): Time period in seconds
+            period (float): Time period in seconds
+            clock: Monotonic clock returning seconds, injectable for tests
+            sleep: Coroutine function used to wait, injectable for tests
         """
         self.max_calls = max_calls
         self.period = period
-        self.calls = deque()
-        self.cooldown_until = 0
+        self.clock = clock
+        self.sleep = sleep
 
-    def add_call(self):
-        """Record an API call"""
-        now = time.time()
-        self.calls.append(now)
+        self.tokens = float(max_calls)
+        self.updated = clock()
+        self.cooldown_until = 0.0
+        # End of the server-reported window, while the server's quota applies
+        self.window_reset: Optional[float] = None
 
-        # Remove calls older than the period
-        while self.calls and self.calls[0] < now - self.period:
-            self.calls.popleft()
+        # Waiters take turns so tokens are handed out in arrival order
+        self._lock: Optional[asyncio.Lock] = None
 
-    def is_limited(self):
-        """Check if rate limited"""
-        now = time.time()
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.max_calls / self.period
+
+    def _refill(self) -> float:
+        """Add the tokens earned since the last update and return the time."""
+        now = self.clock()
+        if self.window_reset is not None:
+            if now < self.window_reset:
+                self.updated = now
+                return now
+            # The server's window is over, so its full quota is available again
+            self.tokens = float(self.max_calls)
+            self.window_reset = None
+            self.updated = now
+            return now
 
-        # Check if we're in a cooldown period
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.max_calls, self.tokens + elapsed * self.rate)
+            self.updated = now
+        return now
+
+    def _wait_time(self, now: float) -> float:
+        """Seconds until a token is available, assuming the bucket is refilled."""
         if now < self.cooldown_until:
-            return True
+            return self.cooldown_until - now
+        if self.tokens >= 1:
+            return 0.0
+        if self.window_reset is not None:
+            return self.window_reset - now
+        return (1 - self.tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """
+        Spend a token if one is available, without waiting.
+
+        Returns:
+            bool: True if a token was spent, False if rate limited
+        """
+        if self._wait_time(self._refill()) > 0:
+            return False
+        self.tokens -= 1
+        return True
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait until a token is available and spend it.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Raises:
+            asyncio.TimeoutError: If no token became available within timeout
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            deadline = None if timeout is None else self.clock() + timeout
+            while True:
+                now = self._refill()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    self.tokens -= 1
+                    return
+                if deadline is not None and now + wait > deadline:
+                    raise asyncio.TimeoutError(
+                        f"Rate limited for another {wait:.1f} seconds"
+                    )
+                await self.sleep(wait)
+
+    def update(self, remaining: int, reset_after: float, limit: Optional[int] = None):
+        """
+        Sync the bucket with the quota reported by the server.
+
+        Args:
+            remaining: Calls the server will still accept in its current window
+            reset_after: Seconds until the server's window resets
+            limit: Calls allowed per window, if the server reported it
+        """
+        if limit:
+            self.max_calls = limit
+        self.tokens = float(min(max(remaining, 0), self.max_calls))
+        self.updated = self.clock()
+        self.window_reset = self.updated + max(reset_after, 0.0)
+
+    def snapshot(self, wall_now: Optional[float] = None) -> Dict:
+        """
+        Capture the limiter's state so it can be restored after a restart.
+
+        Deadlines are converted from the monotonic clock to wall-clock time,
+        since monotonic time doesn't carry over between processes.
+
+        Args:
+            wall_now: Current wall-clock time, defaults to time.time()
+
+        Returns:
+            Dict: JSON-serializable limiter state
+        """
+        wall_now = time.time() if wall_now is None else wall_now
+        now = self._refill()
+
+        def to_wall(deadline):
+            if deadline is None or deadline <= now:
+                return None
+            return wall_now + (deadline - now)
+
+        return {
+            "max_calls": self.max_calls,
+            "tokens": self.tokens,
+            "saved_at": wall_now,
+            "cooldown_until": to_wall(self.cooldown_until),
+            "window_reset": to_wall(self.window_reset),
+        }
 
-        # Clean up old calls
-        while self.calls and self.calls[0] < now - self.period:
-            self.calls.popleft()
+    def restore(self, state: Mapping, wall_now: Optional[float] = None):
+        """
+        Restore state captured with snapshot(), accounting for the time since.
+
+        Args:
+            state: State returned by snapshot()
+            wall_now: Current wall-clock time, defaults to time.time()
+        """
+        wall_now = time.time() if wall_now is None else wall_now
+        now = self.clock()
+        # Ignore clock steps backwards rather than granting negative time
+        elapsed = max(0.0, wall_now - state["saved_at"])
+
+        def to_monotonic(deadline):
+            if deadline is None or deadline <= wall_now:
+                return None
+            return now + (deadline - wall_now)
 
-        # Check if we've exceeded the maximum calls
-        return len(self.calls) >= self.max_calls
+        self.cooldown_until = to_monotonic(state.get("cooldown_until")) or 0.0
+        self.window_reset = to_monotonic(state.get("window_reset"))
+        if self.window_reset is not None:
+            # The server's quota still applies, and it doesn't refill
+            self.max_calls = state.get("max_calls", self.max_calls)
+            self.tokens = float(min(state["tokens"], self.max_calls))
+            self.updated = now
+        elif state.get("window_reset") is not None:
+            # The server's window ended while we were down
+            self.tokens = float(self.max_calls)
+            self.updated = now
+        else:
+            self.tokens = float(min(state["tokens"], self.max_calls))
+            self.updated = now - elapsed
+            self._refill()
+
+    def add_call(self):
+        """Record an API call made without acquire()"""
+        self._refill()
+        self.tokens = max(0.0, self.tokens - 1)
+
+    def is_limited(self):
+        """Check if rate limited"""
+        return self._wait_time(self._refill()) > 0
 
     def set_cooldown(self, seconds):
         """Set a cooldown period"""
-        self.cooldown_until = time.time() + seconds
+        self.cooldown_until = max(self.cooldown_until, self.clock() + seconds)
 
     def get_remaining_calls(self):
         """Get the number of remaining calls allowed"""
-        self.is_limited()  # Clean up old calls
-        return max(0, self.max_calls - len(self.calls))
+        if self.clock() < self.cooldown_until:
+            return 0
+        self._refill()
+        return int(self.tokens)
 
     def get_reset_time(self):
         """Get the time until rate limit resets"""
-        now = time.time()
+        return self._wait_time(self._refill())
 
-        if self.cooldown_until > now:
-            return self.cooldown_until - now
 
-        if not self.calls:
-            return 0
+async def acquire_or_reschedule(limiter: RateLimiter, timeout: float, label: str):
+    """
+    Wait for a token from a limiter, for at most timeout seconds.
+
+    Args:
+        limiter: The endpoint's limiter
+        timeout: Maximum seconds to wait
+        label: Names the platform and endpoint in the error message
+
+    Raises:
+        RateLimitExceeded: If no capacity frees up in time, so the job can be
+            rescheduled instead of holding a worker
+    """
+    try:
+        await limiter.acquire(timeout=timeout)
+    except asyncio.TimeoutError:
+        raise RateLimitExceeded(
+            limiter.get_reset_time(),
+            f"{label} rate limited for another "
+            f"{limiter.get_reset_time():.0f} seconds",
+        )
+
+
+def pause_after_rate_limit(
+    limiter: Optional[RateLimiter],
+    headers: Mapping[str, str],
+    label: str,
+    default_retry_after: float,
+) -> RateLimitExceeded:
+    """
+    Pause a limiter after a 429 and build the error to reschedule with.
+
+    The pause lasts until the limiter's window resets or for the response's
+    Retry-After, whichever is longer, and default_retry_after if neither
+    says.
+
+    Args:
+        limiter: The endpoint's limiter, or None if it has none
+        headers: The 429 response's headers
+        label: Names the platform and endpoint in messages
+        default_retry_after: Seconds to pause when the response doesn't say
+
+    Returns:
+        RateLimitExceeded: Carries the seconds until the limit resets
+    """
+    retry_after = limiter.get_reset_time() if limiter is not None else 0.0
+    lowered = {key.lower(): value for key, value in headers.items()}
+    if lowered.get("retry-after", "").isdigit():
+        retry_after = max(retry_after, float(lowered["retry-after"]))
+    if retry_after <= 0:
+        retry_after = default_retry_after
+    if limiter is not None:
+        limiter.set_cooldown(retry_after)
+    logger.warning("%s rate limited, pausing for %.0f seconds", label, retry_after)
+    return RateLimitExceeded(
+        retry_after, f"{label} rate limited for {retry_after:.0f} seconds"
+    )
+
+
+def save_limiter_state(path: str, states: Mapping[str, Dict]):
+    """
+    Atomically write limiter snapshots to a JSON file.
+
+    The file is written to a temporary file and renamed into place, so a
+    crash mid-write never leaves a truncated state file behind. Only file I/O
+    happens here, so it is safe to call from a worker thread with snapshots
+    taken on the event loop.
+
+    Args:
+        path: Path of the state file
+        states: Snapshots returned by RateLimiter.snapshot(), by limiter name
+    """
+    data = json.dumps(states, sort_keys=True)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".limits-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_limiter_state(path: str, limiters: Mapping[str, RateLimiter]) -> int:
+    """
+    Restore limiters from a file written by save_limiter_state.
+
+    Missing or unreadable files are ignored, so the limiters keep their
+    fresh state.
+
+    Args:
+        path: Path of the state file
+        limiters: Limiters to restore, by name
+
+    Returns:
+        int: Number of limiters restored
+    """
+    try:
+        with open(path) as f:
+            states = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable rate limiter state %s: %s", path, e)
+        return 0
 
-        oldest_call = self.calls[0]
-        return max(0, (oldest_call + self.period) - now)
+    restored = 0
+    for name, limiter in limiters.items():
+        if name in states:
+            try:
+                limiter.restore(states[name])
+                restored += 1
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Ignoring invalid state for limiter %s: %s", name, e)
+    return restored
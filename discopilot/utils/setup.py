@@ -1,7 +1,6 @@
 import os
 import shutil
-
-import pkg_resources
+from importlib import resources
 
 
 def setup_config():
@@ -23,13 +22,10 @@ def setup_config():
         print(f"Configuration file already exists at {user_config_path}")
         return user_config_path
 
-    # Get the example config from the package
-    example_config = pkg_resources.resource_filename(
-        "discopilot", "examples/config.example.yaml"
-    )
-
-    # Copy the example config to the user's directory
-    shutil.copy(example_config, user_config_path)
+    # Copy the example config from the package to the user's directory
+    example_config = resources.files("discopilot") / "examples/config.example.yaml"
+    with resources.as_file(example_config) as example_path:
+        shutil.copy(example_path, user_config_path)
 
     print(f"Configuration file created at {user_config_path}")
     print("Please edit this file with your Discord token and other settings.")
@@ -0,0 +1,333 @@
+"""
+Token-bucket rate limiter shared between processes on one host.
+
+Several bot processes can share one set of API credentials. Each bucket is a
+row in a local SQLite database, and every read-modify-write of a bucket
+happens inside a BEGIN IMMEDIATE transaction, so concurrent processes never
+spend the same token twice. Buckets use wall-clock time, since monotonic
+clocks aren't comparable between processes.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, Set
+
+from .rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_LIMITS_PATH = os.path.expanduser(
+    "~/.local/share/discopilot/rate_limits.db"
+)
+
+# Seconds a process waits for another to finish its transaction
+DEFAULT_BUSY_TIMEOUT = 30.0
+
+# Longest single sleep in acquire(), so tokens freed by a server window
+# reset seen by another process are picked up promptly
+MAX_POLL_INTERVAL = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    max_calls INTEGER NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    cooldown_until REAL NOT NULL DEFAULT 0,
+    window_reset REAL
+);
+"""
+
+
+class SharedLimiterStore:
+    """SQLite database holding the buckets of shared rate limiters."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SHARED_LIMITS_PATH,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            path: Path to the SQLite database shared by all processes
+            busy_timeout: Seconds to wait for a lock held by another process
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # The connection is used from the event loop and the executor thread
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def transact(
+        self,
+        name: str,
+        max_calls: int,
+        period: float,
+        now: float,
+        func: Callable[[RateLimiter], object],
+    ):
+        """
+        Run func on a bucket inside an exclusive transaction and save it.
+
+        The bucket is loaded into a RateLimiter clocked at now, so the token
+        bucket logic is shared with the in-process limiter.
+
+        Args:
+            name: The bucket name
+            max_calls: Calls per period for a new bucket
+            period: Period in seconds
+            now: The current wall-clock time
+            func: Function applied to the loaded bucket
+
+        Returns:
+            The return value of func
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                bucket = RateLimiter(max_calls, period, clock=lambda: now)
+                row = conn.execute(
+                    "SELECT max_calls, tokens, updated, cooldown_until, window_reset "
+                    "FROM buckets WHERE name = ?",
+                    (name,),
+                ).fetchone()
+                if row is not None:
+                    (
+                        bucket.max_calls,
+                        bucket.tokens,
+                        bucket.updated,
+                        bucket.cooldown_until,
+                        bucket.window_reset,
+                    ) = row
+                    # Guard against the wall clock stepping backwards
+                    bucket.updated = min(bucket.updated, now)
+
+                result = func(bucket)
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets "
+                    "(name, max_calls, tokens, updated, cooldown_until, window_reset) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        name,
+                        bucket.max_calls,
+                        bucket.tokens,
+                        bucket.updated,
+                        bucket.cooldown_until,
+                        bucket.window_reset,
+                    ),
+                )
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def run(self, func, *args):
+        """Run a blocking store call on the store's database thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="discopilot-limits"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def close(self):
+        """Close the database connection."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SharedRateLimiter:
+    """
+    A rate limiter whose bucket is shared by every process using the store.
+
+    Offers the same interface as RateLimiter, without blocking the event
+    loop on the database: acquire() runs its transactions on the store's
+    database thread, writes such as update() and set_cooldown() are applied
+    to a local copy of the bucket and queued to that thread, and status
+    reads are answered from the copy. The copy is refreshed by every
+    transaction, and by refresh().
+    """
+
+    def __init__(
+        self,
+        store: SharedLimiterStore,
+        name: str,
+        max_calls: int,
+        period: float,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        """
+        Initialize the shared rate limiter
+
+        Args:
+            store: The store holding the shared buckets
+            name: Name of the bucket; processes using the same name share it
+            max_calls (int): Maximum number of calls allowed in the period
+            period (float): Time period in seconds
+            clock: Wall-clock time function, injectable for tests
+            sleep: Coroutine function used to wait, injectable for tests
+        """
+        self.store = store
+        self.name = name
+        self.max_calls = max_calls
+        self.period = period
+        self.clock = clock
+        self.sleep = sleep
+        self._lock: Optional[asyncio.Lock] = None
+        # Local copy of the bucket as last seen in the store
+        self._cached = RateLimiter(max_calls, period, clock=clock)
+        # Writes queued to the database thread
+        self._pending: Set[asyncio.Future] = set()
+
+    def _transact(self, func: Callable[[RateLimiter], object]):
+        """Run func on the stored bucket and keep a copy of the result."""
+
+        def apply(bucket: RateLimiter):
+            result = func(bucket)
+            cached = RateLimiter(bucket.max_calls, self.period, clock=self.clock)
+            cached.tokens = bucket.tokens
+            cached.updated = bucket.updated
+            cached.cooldown_until = bucket.cooldown_until
+            cached.window_reset = bucket.window_reset
+            self._cached = cached
+            return result
+
+        return self.store.transact(
+            self.name, self.max_calls, self.period, self.clock(), apply
+        )
+
+    def _write(self, func: Callable[[RateLimiter], object]):
+        """Apply func to the local copy now and to the stored bucket in the background."""
+        func(self._cached)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an event loop, so there is nothing to block
+            self._transact(func)
+            return
+        future = loop.create_task(self.store.run(self._transact, func))
+        self._pending.add(future)
+        future.add_done_callback(self._write_done)
+
+    def _write_done(self, future: asyncio.Future):
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(
+                "Failed to update shared rate limit %s: %s",
+                self.name,
+                future.exception(),
+            )
+
+    async def flush(self):
+        """Wait for queued writes to reach the store."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def refresh(self):
+        """Reload the local copy of the bucket from the store."""
+        await self.store.run(self._transact, lambda bucket: None)
+
+    @staticmethod
+    def _take(bucket: RateLimiter) -> float:
+        """Spend a token if available; return the wait otherwise."""
+        if bucket.try_acquire():
+            return 0.0
+        return bucket.get_reset_time()
+
+    def try_acquire(self) -> bool:
+        """
+        Spend a token if one is available, without waiting.
+
+        This runs a transaction on the calling thread; on the event loop use
+        acquire() instead.
+
+        Returns:
+            bool: True if a token was spent, False if rate limited
+        """
+        return self._transact(self._take) <= 0
+
+    async def acquire(self, timeout: Optional[float] = None):
+        """
+        Wait until a token is available in the shared bucket and spend it.
+
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Raises:
+            asyncio.TimeoutError: If no token became available within timeout
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            deadline = None if timeout is None else self.clock() + timeout
+            while True:
+                wait = await self.store.run(self._transact, self._take)
+                if wait <= 0:
+                    return
+                now = self.clock()
+                if deadline is not None and now + wait > deadline:
+                    raise asyncio.TimeoutError(
+                        f"Rate limited for another {wait:.1f} seconds"
+                    )
+                await self.sleep(min(wait, MAX_POLL_INTERVAL))
+
+    def update(self, remaining: int, reset_after: float, limit: Optional[int] = None):
+        """Sync the shared bucket with the quota reported by the server."""
+        if limit:
+            self.max_calls = limit
+        self._write(lambda bucket: bucket.update(remaining, reset_after, limit))
+
+    def add_call(self):
+        """Record an API call made without acquire()"""
+        self._write(lambda bucket: bucket.add_call())
+
+    def set_cooldown(self, seconds):
+        """Set a cooldown period"""
+        self._write(lambda bucket: bucket.set_cooldown(seconds))
+
+    def is_limited(self):
+        """Check if rate limited, as of the last transaction"""
+        return self._cached.is_limited()
+
+    def get_remaining_calls(self):
+        """Get the number of remaining calls allowed, as of the last transaction"""
+        return self._cached.get_remaining_calls()
+
+    def get_reset_time(self):
+        """Get the time until rate limit resets, as of the last transaction"""
+        return self._cached.get_reset_time()
@@ -0,0 +1,59 @@
+"""
+Timing of the bot's startup stages.
+
+Used by ``discopilot --startup-profile`` to show where cold start time goes:
+importing modules, loading the configuration and initializing publishers
+and the Discord client.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+
+
+class StartupProfile:
+    """Records the wall time and modules imported by each startup stage."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Initialize the profile.
+
+        Args:
+            clock: Function returning seconds, injectable for tests
+        """
+        self.clock = clock
+        self.started = clock()
+        # (stage name, seconds, modules imported during the stage)
+        self.stages: List[Tuple[str, float, int]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the code run inside the block as one stage."""
+        modules = len(sys.modules)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.stages.append((name, self.clock() - start, len(sys.modules) - modules))
+
+    @property
+    def total(self) -> float:
+        """Seconds since the profile was created."""
+        return self.clock() - self.started
+
+    def report(self) -> str:
+        """
+        Format the recorded stages as a table.
+
+        Returns:
+            str: One line per stage followed by the total
+        """
+        width = max([len(name) for name, _, _ in self.stages] + [len("total")])
+        lines = [f"{'stage':<{width}}  {'ms':>8}  {'modules':>7}"]
+        for name, seconds, modules in self.stages:
+            lines.append(f"{name:<{width}}  {seconds * 1000:8.1f}  {modules:7d}")
+        lines.append(
+            f"{'total':<{width}}  {self.total * 1000:8.1f}  {len(sys.modules):7d}"
+        )
+        return "\n".join(lines)
@@ -18,10 +18,8 @@ async def test_twitter_publisher():
     publisher = TwitterPublisher(config)
 
     # Test rate limit check
-    rate_limit_status = await publisher.check_rate_limit()
-    logger.info(
-        f"Twitter rate limit status: {'OK' if rate_limit_status else 'Limited'}"
-    )
+    rate_limited = await publisher.check_rate_limit()
+    logger.info(f"Twitter rate limit status: {'Limited' if rate_limited else 'OK'}")
 
     # Test publishing a simple message
     test_message = "This is an integration test message from DiscoPilot 🤖 #testing"
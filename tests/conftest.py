@@ -9,7 +9,7 @@ from discopilot.utils.config import Config
 
 
 @pytest.fixture
-def mock_config():
+def mock_config(tmp_path):
     """Create a mock configuration for testing."""
     # Create a temporary config file
     with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as temp:
@@ -30,6 +30,7 @@ def mock_config():
                 "bearer_token": "test_bearer_token",
                 "client_id": "test_client_id",
                 "client_secret": "test_client_secret",
+                "rate_limit_state_path": str(tmp_path / "twitter_limits.json"),
             },
         }
         yaml.dump(config_data, temp)
@@ -1,8 +1,11 @@
+import asyncio
+import os
 import tempfile
 
+import pytest
 import yaml
 
-from discopilot.utils.config import load_config
+from discopilot.utils.config import Config, ConfigReloader, load_config
 
 
 def test_load_config_from_file():
@@ -41,3 +44,163 @@ def test_load_config_from_env_var(monkeypatch):
         assert config["discord"]["token"] == "env_token"
         assert config["discord"]["server_ids"] == [123456789]
         assert config["admin_ids"] == [987654321]
+
+
+def write_config(path, data):
+    with open(path, "w") as f:
+        yaml.dump(data, f)
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Point Config at a fresh file and reset the current snapshot."""
+    path = tmp_path / "config.yaml"
+    write_config(
+        path,
+        {
+            "discord": {
+                "token": "file_token",
+                "servers": [1],
+                "admins": [2],
+                "allowed_channels": ["3", 4],
+                "triggers": {"emoji": "📢"},
+            },
+        },
+    )
+    monkeypatch.setenv("DISCOPILOT_CONFIG", str(path))
+    for env_var in ("DISCORD_TOKEN", "ADMIN_IDS", "SERVER_IDS", "TRIGGER_EMOJI"):
+        monkeypatch.delenv(env_var, raising=False)
+    Config._instance = None
+    yield path
+    Config._instance = None
+
+
+def test_config_parses_file_once(config_file, monkeypatch):
+    """Test that creating the config reads the YAML exactly once."""
+    calls = []
+    safe_load = yaml.safe_load
+
+    def counting_safe_load(stream):
+        calls.append(stream)
+        return safe_load(stream)
+
+    monkeypatch.setattr("discopilot.utils.config.yaml.safe_load", counting_safe_load)
+
+    config = Config()
+
+    assert len(calls) == 1
+    assert Config() is config
+    assert len(calls) == 1
+
+
+def test_environment_overrides_file(config_file, monkeypatch):
+    """Test that environment variables win over the file."""
+    monkeypatch.setenv("DISCORD_TOKEN", "env_token")
+    monkeypatch.setenv("ADMIN_IDS", "7,8")
+    monkeypatch.setenv("TRIGGER_EMOJI", "🚀")
+
+    config = Config()
+
+    assert config.discord_token == "env_token"
+    assert config.admin_ids == (7, 8)
+    assert config.trigger_emoji == "🚀"
+    assert config.server_ids == (1,)
+
+
+def test_config_is_immutable_and_precomputed(config_file):
+    """Test that the snapshot can't be modified and derived values are cached."""
+    config = Config()
+
+    assert config.allowed_channel_ids == (3, 4)
+    assert config.allowed_channel_ids is config.allowed_channel_ids
+    with pytest.raises(AttributeError):
+        config.discord_token = "changed"
+    with pytest.raises(TypeError):
+        config.config["discord"]["token"] = "changed"
+
+
+def test_publisher_instances_have_separate_settings(config_file):
+    """Test that each named publisher reads only its own account settings."""
+    write_config(
+        config_file,
+        {
+            "discord": {"token": "file_token", "publish_timeout": 60},
+            "twitter": {"api_key": "flat_key"},
+            "publishers": {
+                "gaming_twitter": {
+                    "type": "twitter",
+                    "guilds": ["10"],
+                    "api_key": "gaming_key",
+                    "rate_limit_state_path": "~/gaming.json",
+                },
+                "news_twitter": {"type": "twitter", "channels": [20]},
+            },
+        },
+    )
+
+    config = Config()
+    gaming, news = config.publisher_configs
+
+    assert gaming.publisher_name == "gaming_twitter"
+    assert gaming.publisher_type == "twitter"
+    assert gaming.twitter_api_key == "gaming_key"
+    assert gaming.get("twitter_rate_limit_state_path") == os.path.expanduser(
+        "~/gaming.json"
+    )
+    assert news.twitter_api_key is None
+    assert news.get("twitter_api_key", "missing") == "missing"
+    # Settings that aren't per account come from the base config
+    assert news.publish_timeout == 60
+    assert config.publisher_scopes == {
+        "gaming_twitter": ((10,), ()),
+        "news_twitter": ((), (20,)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_snapshot_and_notifies(config_file):
+    """Test that a reload replaces the current snapshot for subscribers."""
+    old = Config()
+    reloader = ConfigReloader(interval=0)
+    received = []
+    reloader.subscribe(received.append)
+
+    write_config(config_file, {"discord": {"token": "new", "allowed_channels": [9]}})
+    new = await reloader.reload()
+
+    assert received == [new]
+    assert Config() is new
+    assert new.allowed_channel_ids == (9,)
+    assert old.allowed_channel_ids == (3, 4)
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_keeps_current_snapshot(config_file):
+    """Test that an invalid file leaves the current configuration in place."""
+    old = Config()
+    reloader = ConfigReloader(interval=0)
+    received = []
+    reloader.subscribe(received.append)
+
+    config_file.write_text("discord: [unterminated")
+
+    assert await reloader.reload() is None
+    assert Config() is old
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_reloader_detects_file_change(config_file):
+    """Test that editing the file triggers a reload."""
+    Config()
+    reloader = ConfigReloader(interval=0.01)
+    reloaded = asyncio.Event()
+    reloader.subscribe(lambda config: reloaded.set())
+    await reloader.start()
+    try:
+        write_config(config_file, {"discord": {"token": "edited", "servers": [5]}})
+        await asyncio.wait_for(reloaded.wait(), timeout=2)
+    finally:
+        await reloader.stop()
+
+    assert Config().server_ids == (5,)
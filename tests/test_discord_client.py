@@ -0,0 +1,275 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from discopilot.bot.discord_client import HedwigBot
+from discopilot.bot.idempotency import IdempotencyIndex
+from discopilot.bot.outbox import Outbox
+from discopilot.bot.publish_queue import PublishJob
+from discopilot.publishers.base_publisher import BasePublisher
+from discopilot.utils.rate_limiter import RateLimitExceeded
+
+
+class FakePublisher(BasePublisher):
+    """Publisher that sleeps for a fixed delay before succeeding."""
+
+    def __init__(self, delay=0.0, error=None, timeout=None):
+        super().__init__(config=None)
+        self.delay = delay
+        self.error = error
+        self.publish_timeout = timeout
+        self.cancelled = False
+
+    async def publish(self, content, media=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return "Success", f"https://example.com/{self.delay}"
+
+    async def check_rate_limit(self):
+        return False
+
+
+async def mark_ready(bot):
+    """Set up the client's asyncio state as login() does and mark it ready."""
+    await bot._async_setup_hook()
+    bot._ready.set()
+
+
+def make_message():
+    message = MagicMock()
+    message.id = 1
+    message.channel.send = AsyncMock()
+    return message
+
+
+@pytest.mark.asyncio
+async def test_publish_message_runs_publishers_concurrently():
+    """Test that total latency is the slowest publisher, not the sum."""
+    bot = HedwigBot(token="test_token")
+    bot.add_publisher("first", FakePublisher(delay=0.2))
+    bot.add_publisher("second", FakePublisher(delay=0.2))
+    bot.add_publisher("third", FakePublisher(delay=0.2))
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await bot.publish_message(make_message())
+    elapsed = loop.time() - start
+
+    assert list(results) == ["first", "second", "third"]
+    assert all(result["status"] == "Success" for result in results.values())
+    assert elapsed < 0.4
+
+
+@pytest.mark.asyncio
+async def test_publish_message_times_out_hung_publisher():
+    """Test that a hung publisher is cancelled without delaying the others."""
+    bot = HedwigBot(token="test_token", publish_timeout=0.1)
+    hung = FakePublisher(delay=10)
+    bot.add_publisher("hung", hung)
+    bot.add_publisher("fast", FakePublisher(delay=0.01))
+    bot.add_publisher("slow", FakePublisher(delay=0.3, timeout=1.0))
+
+    results = await bot.publish_message(make_message())
+
+    assert results["hung"]["status"].startswith("Error: Timed out")
+    assert results["hung"]["url"] is None
+    assert hung.cancelled
+    assert results["fast"] == {"status": "Success", "url": "https://example.com/0.01"}
+    assert results["slow"]["status"] == "Success"
+
+
+@pytest.mark.asyncio
+async def test_publish_message_reports_errors_and_notifies():
+    """Test that publisher errors are reported in the notification."""
+    bot = HedwigBot(token="test_token", send_notifications=True)
+    bot.add_publisher("broken", FakePublisher(error=RuntimeError("boom")))
+    bot.add_publisher("working", FakePublisher())
+
+    message = make_message()
+    results = await bot.publish_message(message)
+
+    assert results["broken"] == {"status": "Error: boom", "url": None}
+    message.channel.send.assert_awaited_once_with(
+        "Publishing results:\n"
+        "- broken: Error: boom\n"
+        "- working: Success - https://example.com/0.0"
+    )
+
+
+def make_payload(emoji="📢", user_id=42, guild_id=100, channel_id=200):
+    payload = MagicMock()
+    payload.emoji = discord.PartialEmoji.from_str(emoji)
+    payload.user_id = user_id
+    payload.guild_id = guild_id
+    payload.channel_id = channel_id
+    payload.message_id = 300
+    return payload
+
+
+@pytest.mark.asyncio
+async def test_reaction_enqueues_job_and_returns_immediately():
+    """Test that the reaction handler defers fetching and publishing."""
+    bot = HedwigBot(token="test_token", admin_ids=[42])
+    bot.add_publisher("slow", FakePublisher(delay=0.3))
+
+    message = make_message()
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=message)
+    bot.get_channel = MagicMock(return_value=channel)
+    await mark_ready(bot)
+    await bot.publish_queue.start()
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await bot.on_raw_reaction_add(make_payload())
+    await bot.on_raw_reaction_add(make_payload(user_id=7))
+    assert loop.time() - start < 0.1
+    assert bot.publish_queue.stats()["enqueued"] == 1
+
+    await bot.publish_queue.join()
+    await bot.publish_queue.stop()
+
+    channel.fetch_message.assert_awaited_once_with(300)
+    assert bot.publish_queue.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_job_uses_message_cache():
+    """Test that repeated jobs for a message fetch it over REST only once."""
+    bot = HedwigBot(token="test_token")
+    bot.add_publisher("fake", FakePublisher())
+
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=make_message())
+    bot.get_channel = MagicMock(return_value=channel)
+
+    await bot.process_job(PublishJob(message_id=1, channel_id=200))
+    bot.idempotency = IdempotencyIndex(path=None)
+    await bot.process_job(PublishJob(message_id=1, channel_id=200))
+    channel.fetch_message.assert_awaited_once_with(1)
+
+    # Editing the message makes the next job refetch it
+    await bot.on_raw_message_edit(MagicMock(message_id=1))
+    bot.idempotency = IdempotencyIndex(path=None)
+    await bot.process_job(PublishJob(message_id=1, channel_id=200))
+    assert channel.fetch_message.await_count == 2
+    assert bot.message_cache.stats()["hits"] == 1
+    assert bot.message_cache.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_publisher_reschedules_job():
+    """Test that only the rate-limited platform is retried later."""
+    bot = HedwigBot(token="test_token")
+    bot.add_publisher("limited", FakePublisher(error=RateLimitExceeded(30)))
+    bot.add_publisher("working", FakePublisher())
+
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=make_message())
+    bot.get_channel = MagicMock(return_value=channel)
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await bot.process_job(PublishJob(message_id=1, channel_id=200))
+
+    assert excinfo.value.retry_after == 30
+    assert await bot.idempotency.unpublished(1, bot.publishers) == ["limited"]
+
+
+@pytest.mark.asyncio
+async def test_apply_config_swaps_filter_without_reconnecting():
+    """Test that a reloaded config changes which reactions trigger publishing."""
+    bot = HedwigBot(token="test_token", admin_ids=[42])
+    bot.add_publisher("fake", FakePublisher())
+    bot.publish_queue.enqueue = AsyncMock()
+
+    config = MagicMock()
+    config.discord_token = "test_token"
+    config.trigger_emoji = "🚀"
+    config.admin_ids = (7,)
+    config.server_ids = ()
+    config.allowed_channel_ids = (200,)
+    config.trigger_rules = ()
+    config.publisher_scopes = {}
+    config.send_notifications = True
+    config.publish_timeout = 30
+    bot.apply_config(config)
+
+    await bot.on_raw_reaction_add(make_payload(user_id=42))
+    await bot.on_raw_reaction_add(make_payload(user_id=7))
+    bot.publish_queue.enqueue.assert_not_awaited()
+
+    await bot.on_raw_reaction_add(make_payload(emoji="🚀", user_id=7))
+    bot.publish_queue.enqueue.assert_awaited_once()
+    assert bot.send_notifications is True
+    assert bot.publish_timeout == 30
+
+
+def test_low_memory_profile_trims_intents_and_caches():
+    """Test that the low-memory profile keeps only what the bot uses."""
+    bot = HedwigBot(token="test_token", low_memory=True)
+
+    intents = bot.intents
+    assert intents.guilds and intents.guild_reactions and intents.guild_messages
+    assert intents.message_content
+    assert not intents.members
+    assert not intents.emojis_and_stickers
+    assert not intents.voice_states
+    assert not intents.dm_messages
+    assert bot._connection.member_cache_flags.value == 0
+    assert bot._connection._chunk_guilds is False
+    assert bot._connection.max_messages is None
+
+
+def test_default_profile_keeps_discord_caches():
+    """Test that the default profile is unchanged unless low memory is chosen."""
+    bot = HedwigBot(token="test_token", max_messages=50)
+
+    assert bot.intents.message_content
+    assert bot.intents.emojis_and_stickers
+    assert bot._connection.max_messages == 50
+
+
+@pytest.mark.asyncio
+async def test_outbox_jobs_are_replayed_once_connected(tmp_path):
+    """Test that replayed jobs wait for the gateway and survive missing channels."""
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(path=path)
+    await outbox.open()
+    await outbox.add(PublishJob(message_id=1, channel_id=200))
+    await outbox.close()
+
+    bot = HedwigBot(token="test_token", outbox=Outbox(path=path, max_attempts=5))
+    bot.add_publisher("fake", FakePublisher())
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=make_message())
+    bot.get_channel = MagicMock(return_value=None)
+    bot.fetch_channel = AsyncMock(
+        side_effect=discord.NotFound(MagicMock(status=404), "Unknown Channel")
+    )
+    bot.publish_queue.retry_delay = 0
+
+    # setup_hook runs from login(), before the channel cache is filled
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+    await asyncio.sleep(0.05)
+    assert bot.publish_queue.stats()["completed"] == 0
+
+    # A channel that can't be found fails the job instead of dropping it
+    bot._ready.set()
+    await bot.publish_queue.join()
+    assert bot.publish_queue.stats()["failed"] == 1
+    bot.fetch_channel.assert_awaited_once_with(200)
+
+    bot.fetch_channel = AsyncMock(return_value=channel)
+    bot.publish_queue._requeue(await bot.publish_queue.outbox.due_jobs())
+    await bot.publish_queue.join()
+    assert bot.publish_queue.stats()["completed"] == 1
+    assert await bot.publish_queue.outbox.due_jobs() == []
+    await bot.close()
@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discopilot.publishers import HttpError, HttpPublisher
+from discopilot.utils.config import PublisherConfig
+from discopilot.utils.rate_limiter import RateLimitExceeded
+
+
+class FakeStatusEndpoint:
+    """Local stand-in for a platform's status posting API."""
+
+    def __init__(self):
+        self.requests = []
+        self.failures = []
+        self.delay = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        self.requests.append(
+            (request.headers.get("Authorization"), await request.json())
+        )
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        if self.failures:
+            status, headers = self.failures.pop(0)
+            return web.Response(status=status, headers=headers, text="Failed")
+        return web.json_response({"url": f"https://example.com/{len(self.requests)}"})
+
+
+class StatusPublisher(HttpPublisher):
+    """Minimal platform built on HttpPublisher."""
+
+    platform = "status"
+    rate_limits = {"statuses": (300, 300)}
+
+    def request_headers(self, method, url):
+        return {"Authorization": f"Bearer {self.setting('token')}"}
+
+    async def publish(self, message):
+        data = await self.request(
+            "POST", "/statuses", endpoint="statuses", json={"text": message.content}
+        )
+        return "Published", data["url"]
+
+
+@pytest_asyncio.fixture
+async def endpoint():
+    fake = FakeStatusEndpoint()
+    app = web.Application()
+    app.router.add_post("/statuses", fake.handle)
+    server = TestServer(app)
+    await server.start_server()
+    fake.url = str(server.make_url(""))
+    yield fake
+    await server.close()
+
+
+def make_publisher(endpoint, **options):
+    options = {
+        "type": "status",
+        "base_url": endpoint.url,
+        "token": "secret",
+        "retry_delay": 0.01,
+        **options,
+    }
+    return StatusPublisher(PublisherConfig(MagicMock(), "status", options))
+
+
+def make_message(content="Hello"):
+    message = MagicMock()
+    message.content = content
+    return message
+
+
+@pytest.mark.asyncio
+async def test_requests_share_one_pooled_session(endpoint):
+    """Test that requests are authenticated and reuse the publisher's session."""
+    publisher = make_publisher(endpoint)
+
+    assert await publisher.publish(make_message()) == (
+        "Published",
+        "https://example.com/1",
+    )
+    session = publisher.session
+    await publisher.publish(make_message("Again"))
+
+    assert publisher.session is session
+    assert endpoint.requests == [
+        ("Bearer secret", {"text": "Hello"}),
+        ("Bearer secret", {"text": "Again"}),
+    ]
+    await publisher.close()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(endpoint):
+    """Test that 5xx responses are retried when asked and 4xx responses are not."""
+    publisher = make_publisher(endpoint, max_retries=2)
+
+    async def post(**kwargs):
+        return await publisher.request(
+            "POST", "/statuses", endpoint="statuses", json={"text": "Hi"}, **kwargs
+        )
+
+    endpoint.failures = [(503, {}), (502, {})]
+    assert await post(retry=True) == {"url": "https://example.com/3"}
+    assert len(endpoint.requests) == 3
+
+    endpoint.failures = [(400, {})]
+    with pytest.raises(HttpError) as error:
+        await post(retry=True)
+    assert error.value.status == 400
+    assert len(endpoint.requests) == 4
+
+    endpoint.failures = [(500, {})] * 3
+    with pytest.raises(HttpError):
+        await post(retry=True)
+    assert len(endpoint.requests) == 7
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_requests_are_not_retried(endpoint):
+    """Test that a failed POST isn't sent again, as it may have been published."""
+    publisher = make_publisher(endpoint, max_retries=2)
+    endpoint.failures = [(503, {})]
+
+    with pytest.raises(HttpError) as error:
+        await publisher.publish(make_message())
+    assert error.value.status == 503
+    assert len(endpoint.requests) == 1
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_endpoint_is_paused(endpoint):
+    """Test that a 429 cools the endpoint down and the job can be rescheduled."""
+    publisher = make_publisher(endpoint, max_rate_limit_wait=0)
+    endpoint.failures = [(429, {"Retry-After": "120"})]
+
+    with pytest.raises(RateLimitExceeded) as error:
+        await publisher.publish(make_message())
+    assert error.value.retry_after == 120
+    assert await publisher.check_rate_limit()
+
+    # Further publishes are rejected locally without reaching the platform
+    with pytest.raises(RateLimitExceeded):
+        await publisher.publish(make_message())
+    assert len(endpoint.requests) == 1
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_and_timeouts_are_bounded(endpoint):
+    """Test that requests in flight are capped and slow requests time out."""
+    publisher = make_publisher(endpoint, max_concurrent_requests=2)
+    endpoint.delay = 0.05
+
+    await asyncio.gather(*(publisher.publish(make_message()) for _ in range(6)))
+    assert endpoint.max_in_flight == 2
+
+    publisher.request_timeout = 0.01
+    with pytest.raises(HttpError, match="TimeoutError"):
+        await publisher.publish(make_message())
+    await publisher.close()
@@ -0,0 +1,105 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from discopilot.bot.discord_client import HedwigBot
+from discopilot.bot.idempotency import IdempotencyIndex
+from discopilot.bot.publish_queue import PublishJob
+from tests.test_discord_client import FakePublisher, make_message, make_payload
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "state" / "published.db")
+
+
+@pytest.mark.asyncio
+async def test_is_published_uses_lru():
+    """Test that recorded publishes are found without touching the store."""
+    index = IdempotencyIndex(path=None, cache_size=2)
+    await index.record(1, "twitter", "https://example.com/1")
+
+    assert index.is_published(1, ["twitter"])
+    assert not index.is_published(1, ["twitter", "mastodon"])
+    assert not index.is_published(2, ["twitter"])
+
+    # Recording two more messages evicts the least recently used one
+    await index.record(2, "twitter")
+    await index.record(3, "twitter")
+    assert not index.is_published(1, ["twitter"])
+    assert index.is_published(3, ["twitter"])
+
+
+@pytest.mark.asyncio
+async def test_unpublished_falls_back_to_store_after_restart(index_path):
+    """Test that publishes survive a restart and evictions from the LRU."""
+    index = IdempotencyIndex(index_path)
+    await index.open()
+    await index.record(1, "twitter", "https://example.com/1")
+    await index.close()
+
+    restarted = IdempotencyIndex(index_path, cache_size=1)
+    await restarted.open()
+    assert restarted.is_published(1, ["twitter"])
+
+    await restarted.record(2, "twitter")
+    assert not restarted.is_published(1, ["twitter"])
+    assert await restarted.unpublished(1, ["twitter", "mastodon"]) == ["mastodon"]
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_publishes_expire_after_retention(index_path):
+    """Test that old publishes are forgotten and pruned at startup."""
+    clock = FakeClock()
+    index = IdempotencyIndex(index_path, retention_days=1, clock=clock)
+    await index.open()
+    await index.record(1, "twitter")
+
+    clock.now += 2 * 24 * 60 * 60
+    assert not index.is_published(1, ["twitter"])
+    assert await index.unpublished(1, ["twitter"]) == ["twitter"]
+    await index.close()
+
+    restarted = IdempotencyIndex(index_path, retention_days=1, clock=clock)
+    await restarted.open()
+    assert len(restarted._cache) == 0
+    await restarted.close()
+
+
+def test_claim_and_release():
+    """Test that a message can only be claimed by one job at a time."""
+    index = IdempotencyIndex(path=None)
+    assert index.claim(1)
+    assert not index.claim(1)
+    index.release(1)
+    assert index.claim(1)
+
+
+@pytest.mark.asyncio
+async def test_bot_skips_already_published_message():
+    """Test that reacting to a published message doesn't republish it."""
+    bot = HedwigBot(token="test_token", admin_ids=[42])
+    publisher = FakePublisher()
+    publisher.publish = AsyncMock(return_value=("Success", "https://example.com/1"))
+    bot.add_publisher("fake", publisher)
+
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(return_value=make_message())
+    bot.get_channel = MagicMock(return_value=channel)
+
+    await bot.process_job(PublishJob(message_id=300, channel_id=200))
+    await bot.process_job(PublishJob(message_id=300, channel_id=200))
+    publisher.publish.assert_awaited_once()
+
+    bot.publish_queue.enqueue = AsyncMock()
+    await bot.on_raw_reaction_add(make_payload())
+    bot.publish_queue.enqueue.assert_not_awaited()
@@ -0,0 +1,97 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from discopilot.utils.logger import (
+    SamplingFilter,
+    set_sample_rates,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+class Recorder:
+    """Argument whose formatting records the thread it happened on."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "formatted"
+
+
+def test_records_are_formatted_on_listener_thread(restore_root_logger):
+    """Test that messages are formatted off the calling thread."""
+    stream = io.StringIO()
+    setup_logging(logging.INFO, stream=stream)
+    arg = Recorder()
+
+    logging.getLogger("discopilot.test").info("value: %s", arg)
+    logging.getLogger("discopilot.test").debug("hidden: %s", arg)
+    shutdown_logging()
+
+    assert "discopilot.test - INFO - value: formatted" in stream.getvalue()
+    assert "hidden" not in stream.getvalue()
+    assert arg.threads and threading.current_thread() not in arg.threads
+
+
+def test_json_output(restore_root_logger):
+    """Test that JSON output has one parseable object per record."""
+    stream = io.StringIO()
+    setup_logging(logging.INFO, json_format=True, stream=stream)
+    logger = logging.getLogger("discopilot.test")
+
+    logger.info("published %s to %s", 1, "twitter")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("failed", exc_info=True)
+    shutdown_logging()
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "published 1 to twitter"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "discopilot.test"
+    assert "ValueError: boom" in second["exc_info"]
+
+
+def test_sampling_filter_keeps_one_in_n():
+    """Test that sampled loggers keep every Nth record but all warnings."""
+    sampler = SamplingFilter({"discord.gateway": 10})
+
+    def record(name, level=logging.INFO):
+        return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+    kept = [sampler.filter(record("discord.gateway.shard")) for _ in range(100)]
+    assert sum(kept) == 10
+    assert all(sampler.filter(record("discopilot.bot")) for _ in range(10))
+    assert all(
+        sampler.filter(record("discord.gateway", logging.WARNING)) for _ in range(10)
+    )
+
+
+def test_sample_rates_can_be_updated(restore_root_logger):
+    """Test that sampling configured after setup applies to new records."""
+    stream = io.StringIO()
+    setup_logging(logging.INFO, stream=stream)
+    set_sample_rates({"noisy": 5})
+
+    for i in range(20):
+        logging.getLogger("noisy").info("event %d", i)
+    shutdown_logging()
+
+    assert len(stream.getvalue().splitlines()) == 4
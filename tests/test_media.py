@@ -0,0 +1,229 @@
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discopilot.utils.media import (
+    MediaDownloader,
+    download_attachment,
+    download_attachments,
+)
+
+MB = 1024 * 1024
+
+
+class FileServer:
+    """Local stand-in for the Discord CDN that tracks concurrency."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.client_ports = set()
+        self.bytes_sent = 0
+
+    async def handle(self, request):
+        self.client_ports.add(request.transport.get_extra_info("peername")[1])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if request.match_info["name"] == "missing.png":
+            return web.Response(status=404)
+        return web.Response(body=request.match_info["name"].encode())
+
+    async def handle_large(self, request):
+        """Stream a body of the requested size without holding it in memory."""
+        size = int(request.match_info["size"])
+        response = web.StreamResponse()
+        if request.query.get("length") != "no":
+            response.content_length = size
+        await response.prepare(request)
+        chunk = b"\0" * MB
+        sent = 0
+        while sent < size:
+            part = chunk[: size - sent]
+            await response.write(part)
+            sent += len(part)
+            self.bytes_sent += len(part)
+        await response.write_eof()
+        return response
+
+
+@pytest_asyncio.fixture
+async def file_server():
+    """Run a FileServer on a local port for the duration of a test."""
+    handler = FileServer(delay=0.05)
+    app = web.Application()
+    app.router.add_get("/large/{size}", handler.handle_large)
+    app.router.add_get("/{name}", handler.handle)
+    server = TestServer(app)
+    await server.start_server()
+    handler.url = lambda name: str(server.make_url(f"/{name}"))
+    yield handler
+    await server.close()
+
+
+def make_attachment(url, filename):
+    attachment = MagicMock()
+    attachment.url = url
+    attachment.filename = filename
+    return attachment
+
+
+@pytest.mark.asyncio
+async def test_download_attachments_in_parallel(file_server):
+    """Test that attachments download concurrently up to the limit, in order."""
+    names = [f"image{i}.png" for i in range(6)]
+    attachments = [make_attachment(file_server.url(name), name) for name in names]
+
+    paths = await download_attachments(attachments, max_concurrency=3)
+
+    try:
+        assert file_server.max_in_flight == 3
+        assert len(paths) == 6
+        for name, path in zip(names, paths):
+            assert path.endswith(".png")
+            with open(path, "rb") as f:
+                assert f.read() == name.encode()
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_download_attachments_skips_failed_downloads(file_server):
+    """Test that failed downloads are skipped and leave no temp files."""
+    attachments = [
+        make_attachment(file_server.url("missing.png"), "missing.png"),
+        make_attachment(file_server.url("found.png"), "found.png"),
+    ]
+
+    paths = await download_attachments(attachments)
+
+    assert len(paths) == 1
+    with open(paths[0], "rb") as f:
+        assert f.read() == b"found.png"
+    os.remove(paths[0])
+
+
+@pytest.mark.asyncio
+async def test_media_downloader_bounds_downloads_across_callers(file_server):
+    """Test that max_concurrency caps download_one calls from every caller."""
+    names = [f"clip{i}.mp4" for i in range(6)]
+
+    async with MediaDownloader(max_concurrency=2) as downloader:
+        paths = await asyncio.gather(
+            *(
+                downloader.download_one(make_attachment(file_server.url(name), name))
+                for name in names
+            )
+        )
+
+    try:
+        assert file_server.max_in_flight == 2
+        assert all(paths)
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_media_downloader_reuses_connections(file_server):
+    """Test that the shared session keeps connections alive between messages."""
+    downloader = MediaDownloader()
+    await downloader.start()
+    session = downloader.session
+
+    try:
+        for i in range(3):
+            name = f"photo{i}.jpg"
+            paths = await downloader.download(
+                [make_attachment(file_server.url(name), name)]
+            )
+            assert len(paths) == 1
+            os.remove(paths[0])
+
+        assert downloader.session is session
+        assert len(file_server.client_ports) == 1
+    finally:
+        await downloader.close()
+
+    assert downloader.session is None
+
+
+def peak_rss_bytes():
+    """Return the process's peak resident set size in bytes."""
+    resource = pytest.importorskip("resource")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@pytest.mark.asyncio
+async def test_large_downloads_stream_with_bounded_memory(file_server):
+    """Test that multi-hundred-MB downloads don't buffer whole files in memory."""
+    size = 300 * MB
+    attachments = [
+        make_attachment(file_server.url(f"large/{size}"), "video1.mp4"),
+        make_attachment(file_server.url(f"large/{size}?length=no"), "video2.mp4"),
+    ]
+
+    rss_before = peak_rss_bytes()
+    paths = await download_attachments(attachments, max_size=size)
+    rss_growth = peak_rss_bytes() - rss_before
+
+    try:
+        assert len(paths) == 2
+        assert all(os.path.getsize(path) == size for path in paths)
+        # Buffering either body would grow the peak RSS by at least 300 MB
+        assert rss_growth < 64 * MB
+    finally:
+        for path in paths:
+            os.remove(path)
+
+
+@pytest.mark.asyncio
+async def test_download_aborts_on_declared_size(file_server):
+    """Test that oversized attachments are skipped before any request is made."""
+    attachment = make_attachment(file_server.url("big.png"), "big.png")
+    attachment.size = 10 * MB
+
+    async with MediaDownloader(max_size=MB) as downloader:
+        assert await downloader.download([attachment]) == []
+
+    assert file_server.client_ports == set()
+
+
+@pytest.mark.asyncio
+async def test_download_aborts_on_content_length(file_server, tmp_path, monkeypatch):
+    """Test that a Content-Length over the limit aborts the download."""
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    attachment = make_attachment(file_server.url(f"large/{100 * MB}"), "clip.mp4")
+
+    async with MediaDownloader(max_size=MB) as downloader:
+        assert await downloader.download([attachment]) == []
+
+    assert file_server.bytes_sent < 100 * MB
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_download_aborts_on_running_byte_count(file_server):
+    """Test that bodies without Content-Length are cut off at the limit."""
+    attachment = make_attachment(
+        file_server.url(f"large/{100 * MB}?length=no"), "clip.mp4"
+    )
+
+    async with aiohttp.ClientSession() as session:
+        assert await download_attachment(session, attachment, max_size=MB) is None
+
+    assert file_server.bytes_sent < 100 * MB
@@ -0,0 +1,61 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from discopilot.bot.message_cache import MessageCache
+
+
+def make_channel():
+    channel = MagicMock()
+    channel.fetch_message = AsyncMock(
+        side_effect=lambda message_id: f"msg-{message_id}"
+    )
+    return channel
+
+
+@pytest.mark.asyncio
+async def test_client_cache_is_checked_first():
+    """Test that messages in the client's cache are never fetched."""
+    cache = MessageCache(client_lookup={1: "cached-1"}.get)
+    channel = make_channel()
+
+    assert await cache.get(channel, 1) == "cached-1"
+    assert await cache.get(channel, 2) == "msg-2"
+    assert await cache.get(channel, 2) == "msg-2"
+
+    channel.fetch_message.assert_awaited_once_with(2)
+    assert cache.stats()["client_hits"] == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_is_bounded():
+    """Test that the least recently used message is evicted when full."""
+    cache = MessageCache(max_size=2)
+    channel = make_channel()
+
+    await cache.get(channel, 1)
+    await cache.get(channel, 2)
+    await cache.get(channel, 1)
+    await cache.get(channel, 3)
+
+    assert len(cache) == 2
+    await cache.get(channel, 2)
+    assert channel.fetch_message.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_evicted_messages_are_refetched():
+    """Test that edited and deleted messages are fetched again."""
+    cache = MessageCache()
+    channel = make_channel()
+    for message_id in (1, 2, 3):
+        await cache.get(channel, message_id)
+
+    cache.evict(1)
+    cache.evict_many([2, 3, 4])
+    assert len(cache) == 0
+
+    await cache.get(channel, 1)
+    assert channel.fetch_message.await_count == 4
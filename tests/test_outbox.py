@@ -0,0 +1,185 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from discopilot.bot.outbox import Outbox
+from discopilot.bot.publish_queue import PublishJob, PublishQueue
+
+
+@pytest.fixture
+def outbox_path(tmp_path):
+    return str(tmp_path / "state" / "outbox.db")
+
+
+@pytest.mark.asyncio
+async def test_outbox_job_lifecycle(outbox_path):
+    """Test adding, claiming and completing a job."""
+    outbox = Outbox(outbox_path)
+    await outbox.open()
+
+    job = PublishJob(message_id=1, channel_id=2, guild_id=3, user_id=4)
+    job_id = await outbox.add(job)
+    assert job.job_id == job_id
+
+    assert await outbox.claim(job)
+    assert job.attempts == 1
+    # A job under a live lease can't be claimed twice
+    assert not await outbox.claim(job)
+    assert await outbox.due_jobs() == []
+
+    await outbox.complete(job)
+    assert await outbox.recover() == []
+    await outbox.close()
+
+    conn = sqlite3.connect(outbox_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+@pytest.mark.asyncio
+async def test_outbox_replays_jobs_after_restart(outbox_path):
+    """Test that pending and interrupted jobs are recovered at startup."""
+    outbox = Outbox(outbox_path)
+    await outbox.open()
+    interrupted = PublishJob(message_id=1, channel_id=10, guild_id=100, user_id=7)
+    waiting = PublishJob(message_id=2, channel_id=10)
+    await outbox.add(interrupted)
+    await outbox.add(waiting)
+    await outbox.claim(interrupted)
+    await outbox.close()
+
+    restarted = Outbox(outbox_path)
+    await restarted.open()
+    jobs = await restarted.recover()
+    await restarted.close()
+
+    assert [job.message_id for job in jobs] == [1, 2]
+    assert jobs[0].to_dict() == interrupted.to_dict()
+    assert jobs[0].attempts == 1
+    assert jobs[1].attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_outbox_release_retries_then_fails(outbox_path):
+    """Test that released jobs are retried until max_attempts is reached."""
+    outbox = Outbox(outbox_path, max_attempts=2)
+    await outbox.open()
+    job = PublishJob(message_id=1, channel_id=2)
+    await outbox.add(job)
+
+    await outbox.claim(job)
+    assert await outbox.release(job, delay=60)
+    # Not due until the retry delay has passed
+    assert await outbox.due_jobs() == []
+
+    await outbox.release(job)
+    await outbox.claim(job)
+    assert not await outbox.release(job)
+    assert await outbox.recover() == []
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_outbox_groups_concurrent_writes_into_batches(outbox_path):
+    """Test that a burst of reactions is committed in a few transactions."""
+    outbox = Outbox(outbox_path)
+    await outbox.open()
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    jobs = [PublishJob(message_id=i, channel_id=1) for i in range(1000)]
+    job_ids = await asyncio.gather(*(outbox.add(job) for job in jobs))
+    elapsed = loop.time() - start
+
+    assert len(set(job_ids)) == 1000
+    assert outbox.commits < 10
+    # Hundreds of reactions per second need well under a second per thousand
+    assert elapsed < 1.0
+    assert len(await outbox.due_jobs()) == 1000
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_survives_restart_with_outbox(outbox_path):
+    """Test that jobs queued before a crash are published after restart."""
+    started = asyncio.Event()
+
+    async def hang(job):
+        started.set()
+        await asyncio.sleep(10)
+
+    queue = PublishQueue(hang, workers=1, outbox=Outbox(outbox_path))
+    await queue.start()
+    await queue.enqueue(PublishJob(message_id=1, channel_id=1))
+    await queue.enqueue(PublishJob(message_id=2, channel_id=1))
+    await started.wait()
+    # Simulate the process dying while job 1 is in progress
+    await queue.stop()
+
+    published = []
+
+    async def publish(job):
+        published.append(job.message_id)
+
+    queue = PublishQueue(publish, workers=1, outbox=Outbox(outbox_path))
+    await queue.start()
+    await queue.join()
+    await queue.stop()
+
+    assert published == [1, 2]
+    outbox = Outbox(outbox_path)
+    await outbox.open()
+    assert await outbox.recover() == []
+    await outbox.close()
+
+
+@pytest.mark.asyncio
+async def test_publish_queue_retries_failed_jobs_from_outbox(outbox_path):
+    """Test that a failed job is released and picked up again by the sweeper."""
+    attempts = []
+
+    async def flaky(job):
+        attempts.append(job.attempts)
+        if len(attempts) == 1:
+            raise RuntimeError("temporary failure")
+
+    queue = PublishQueue(
+        flaky,
+        workers=1,
+        outbox=Outbox(outbox_path),
+        sweep_interval=0.05,
+        retry_delay=0,
+    )
+    await queue.start()
+    await queue.enqueue(PublishJob(message_id=1, channel_id=1))
+
+    for _ in range(40):
+        if len(attempts) == 2:
+            break
+        await asyncio.sleep(0.05)
+    await queue.join()
+    await queue.stop()
+
+    assert attempts == [1, 2]
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_outbox_defer_does_not_use_up_attempts(outbox_path):
+    """Test that rate-limited jobs are delayed without counting an attempt."""
+    outbox = Outbox(outbox_path, max_attempts=1)
+    await outbox.open()
+    job = PublishJob(message_id=1, channel_id=2)
+    await outbox.add(job)
+
+    await outbox.claim(job)
+    await outbox.defer(job, delay=60)
+    assert job.attempts == 0
+    assert await outbox.due_jobs() == []
+
+    await outbox.defer(job, delay=0)
+    assert await outbox.claim(job)
+    assert job.attempts == 1
+    await outbox.close()
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from discopilot.bot.publish_queue import PublishJob, PublishQueue
+from discopilot.utils.rate_limiter import RateLimitExceeded
+
+
+class RecordingHandler:
+    """Job handler that tracks how many jobs run at once."""
+
+    def __init__(self, delay=0.05, fail_ids=()):
+        self.delay = delay
+        self.fail_ids = set(fail_ids)
+        self.running = 0
+        self.max_running = 0
+        self.processed = []
+
+    async def __call__(self, job):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if job.message_id in self.fail_ids:
+                raise RuntimeError("publish failed")
+            self.processed.append(job.message_id)
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_workers_drain_queue_with_bounded_concurrency():
+    """Test that jobs are processed by at most `workers` coroutines at once."""
+    handler = RecordingHandler()
+    queue = PublishQueue(handler, workers=3, max_size=20)
+    await queue.start()
+
+    for message_id in range(10):
+        assert await queue.enqueue(PublishJob(message_id, channel_id=1))
+    await queue.join()
+    await queue.stop()
+
+    assert sorted(handler.processed) == list(range(10))
+    assert handler.max_running == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure_then_drops():
+    """Test that enqueue waits for space and drops jobs after its timeout."""
+    handler = RecordingHandler(delay=0.2)
+    queue = PublishQueue(handler, workers=1, max_size=1, enqueue_timeout=0.05)
+    await queue.start()
+
+    assert await queue.enqueue(PublishJob(1, channel_id=1))
+    await asyncio.sleep(0)  # let the worker pick up job 1
+    assert await queue.enqueue(PublishJob(2, channel_id=1))
+    assert not await queue.enqueue(PublishJob(3, channel_id=1))
+
+    stats = queue.stats()
+    assert stats["depth"] == 1
+    assert stats["in_progress"] == 1
+    assert stats["dropped"] == 1
+
+    await queue.join()
+    await queue.stop()
+    assert handler.processed == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_stats_track_failures_and_wait_times():
+    """Test that failed jobs are counted and wait times are recorded."""
+    handler = RecordingHandler(delay=0.05, fail_ids={2})
+    queue = PublishQueue(handler, workers=1)
+    await queue.start()
+
+    for message_id in (1, 2, 3):
+        await queue.enqueue(PublishJob(message_id, channel_id=1))
+    await queue.join()
+    await queue.stop()
+
+    stats = queue.stats()
+    assert stats["enqueued"] == 3
+    assert stats["completed"] == 2
+    assert stats["failed"] == 1
+    assert stats["depth"] == 0
+    # The last job waited behind two 50ms jobs
+    assert stats["max_wait"] >= 0.09
+    assert 0 < stats["avg_wait"] < stats["max_wait"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_jobs_are_retried_after_delay():
+    """Test that a rate-limited job is re-enqueued once the limit resets."""
+    attempts = []
+
+    async def limited(job):
+        attempts.append(asyncio.get_running_loop().time())
+        if len(attempts) == 1:
+            raise RateLimitExceeded(0.1)
+
+    queue = PublishQueue(limited, workers=1)
+    await queue.start()
+    await queue.enqueue(PublishJob(message_id=1, channel_id=1))
+
+    for _ in range(40):
+        if len(attempts) == 2:
+            break
+        await asyncio.sleep(0.05)
+    await queue.join()
+    await queue.stop()
+
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.1
+    assert queue.stats()["deferred"] == 1
+    assert queue.stats()["failed"] == 0
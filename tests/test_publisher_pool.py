@@ -0,0 +1,194 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import yaml
+
+from discopilot.bot.discord_client import HedwigBot
+from discopilot.bot.publisher_pool import (
+    MessageSnapshot,
+    ProcessPublisherPool,
+    WorkerCrashed,
+)
+from discopilot.publishers.base_publisher import BasePublisher
+from discopilot.utils.shared_rate_limiter import DEFAULT_SHARED_LIMITS_PATH
+
+
+class EchoPublisher(BasePublisher):
+    """Publisher that reports the worker process it ran in."""
+
+    shared_path = None
+
+    def share_rate_limits(self, path):
+        self.shared_path = path
+
+    async def publish(self, message):
+        if message.content == "limits":
+            return "Success", self.shared_path
+        if message.content == "crash":
+            os._exit(1)
+        if message.content == "slow":
+            await asyncio.sleep(0.5)
+        return "Success", f"https://example.com/{os.getpid()}/{message.id}"
+
+    async def check_rate_limit(self):
+        return False
+
+
+class PatientPublisher(EchoPublisher):
+    """Publisher allowed longer than the pool-wide publish timeout."""
+
+    publish_timeout = 300
+
+
+def make_publishers(config):
+    return {"echo": EchoPublisher(config), "patient": PatientPublisher(config)}
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.yaml"
+    with open(path, "w") as f:
+        yaml.dump({"discord": {"token": "test_token"}}, f)
+    return str(path)
+
+
+def make_pool(config_path, workers=2, **kwargs):
+    return ProcessPublisherPool(
+        ["echo"],
+        config_path=config_path,
+        workers=workers,
+        publish_timeout=10,
+        monitor_interval=0.05,
+        publisher_factory=make_publishers,
+        **kwargs,
+    )
+
+
+def make_discord_message(content="hello"):
+    message = MagicMock()
+    message.id = 7
+    message.content = content
+    message.author = "user#1"
+    message.channel.id = 200
+    message.guild.id = 100
+    message.jump_url = "https://discord.com/channels/100/200/7"
+    attachment = MagicMock(url="https://cdn/x.png", filename="x.png", size=10)
+    message.attachments = [attachment]
+    message.embeds = [MagicMock(title="t", description="d", url="u")]
+    return message
+
+
+def test_snapshot_copies_publishable_parts():
+    """Test that a snapshot holds plain data publishers can read."""
+    snapshot = MessageSnapshot.from_message(make_discord_message())
+
+    assert snapshot.id == 7
+    assert snapshot.content == "hello"
+    assert snapshot.author == "user#1"
+    assert snapshot.guild_id == 100
+    assert snapshot.attachments[0].url == "https://cdn/x.png"
+    assert snapshot.attachments[0].size == 10
+    assert snapshot.embeds[0].title == "t"
+
+
+@pytest.mark.asyncio
+async def test_pool_publishes_in_worker_processes(config_path):
+    """Test that jobs are published outside the gateway process, concurrently."""
+    pool = make_pool(config_path)
+    await pool.start()
+    try:
+        messages = [MessageSnapshot(id=i, content="slow") for i in range(4)]
+        loop = asyncio.get_running_loop()
+        # The first job includes the workers' startup
+        await pool.publish(MessageSnapshot(id=99, content="warm up"), ["echo"])
+        start = loop.time()
+        results = await asyncio.gather(
+            *(pool.publish(message, ["echo"]) for message in messages)
+        )
+        elapsed = loop.time() - start
+    finally:
+        await pool.stop()
+
+    pids = {int(result["echo"]["url"].split("/")[3]) for result in results}
+    assert all(result["echo"]["status"] == "Success" for result in results)
+    assert os.getpid() not in pids
+    assert elapsed < 1.5
+
+
+def test_multiple_workers_share_rate_limits_by_default(config_path):
+    """Test that workers only keep rate limits in memory when there is one."""
+    assert make_pool(config_path, workers=1).shared_rate_limits_path is None
+    assert (
+        make_pool(config_path, workers=2).shared_rate_limits_path
+        == DEFAULT_SHARED_LIMITS_PATH
+    )
+
+
+@pytest.mark.asyncio
+async def test_workers_pass_shared_store_to_publishers(config_path, tmp_path):
+    """Test that each worker's publishers use the pool's shared limiter store."""
+    path = str(tmp_path / "limits.db")
+    pool = make_pool(config_path, shared_rate_limits_path=path)
+    await pool.start()
+    try:
+        result = await pool.publish(MessageSnapshot(id=1, content="limits"), ["echo"])
+    finally:
+        await pool.stop()
+
+    assert result["echo"]["url"] == path
+
+
+@pytest.mark.asyncio
+async def test_result_deadline_follows_publisher_timeouts(config_path):
+    """Test that the gateway waits as long as the job's slowest publisher may take."""
+    pool = make_pool(config_path, result_grace=5)
+    await pool.start()
+    try:
+        result = await pool.publish(
+            MessageSnapshot(id=1, content="hi"), ["echo", "patient"]
+        )
+    finally:
+        await pool.stop()
+
+    assert result["patient"]["status"] == "Success"
+    assert pool.job_timeout(["echo"]) == 15
+    assert pool.job_timeout(["echo", "patient"]) == 305
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted(config_path):
+    """Test that a dying worker fails only its jobs and is replaced."""
+    pool = make_pool(config_path, workers=1)
+    await pool.start()
+    try:
+        with pytest.raises(WorkerCrashed):
+            await pool.publish(MessageSnapshot(id=1, content="crash"), ["echo"])
+
+        result = await pool.publish(MessageSnapshot(id=2, content="ok"), ["echo"])
+        stats = pool.stats()
+    finally:
+        await pool.stop()
+
+    assert result["echo"]["status"] == "Success"
+    assert stats["restarts"] == 1
+    assert stats["alive"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bot_publishes_through_pool():
+    """Test that the bot hands messages to the pool instead of publishing."""
+    pool = MagicMock()
+    pool.publisher_names = ["echo"]
+    pool.publish = AsyncMock(
+        return_value={"echo": {"status": "Success", "url": "https://example.com"}}
+    )
+    bot = HedwigBot(token="test_token", publisher_pool=pool)
+
+    message = make_discord_message()
+    results = await bot.publish_message(message)
+
+    pool.publish.assert_awaited_once_with(message, ["echo"])
+    assert results["echo"]["status"] == "Success"
+    assert bot._select_publishers(None) == ["echo"]
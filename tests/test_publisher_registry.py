@@ -0,0 +1,105 @@
+import sys
+from importlib.metadata import EntryPoint, EntryPoints
+
+import pytest
+
+from discopilot.publishers import configured_publishers, get_publishers, registry
+from discopilot.utils.config import Config
+
+PLUGIN_SOURCE = """
+from discopilot.publishers import BasePublisher
+
+
+class EchoPublisher(BasePublisher):
+    async def publish(self, message):
+        return {"success": True, "text": message.content}
+
+    async def check_rate_limit(self):
+        return True
+
+
+class NotAPublisher:
+    pass
+"""
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    """Install a fake plugin package registering publishers by entry point."""
+    (tmp_path / "echo_plugin.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(
+        registry,
+        "entry_points",
+        lambda: EntryPoints(
+            [
+                EntryPoint(
+                    "echo", "echo_plugin:EchoPublisher", registry.ENTRY_POINT_GROUP
+                ),
+                EntryPoint(
+                    "bogus", "echo_plugin:NotAPublisher", registry.ENTRY_POINT_GROUP
+                ),
+                EntryPoint("other", "echo_plugin:EchoPublisher", "other.group"),
+            ]
+        ),
+    )
+    registry.reset_registry()
+    yield
+    registry.reset_registry()
+    sys.modules.pop("echo_plugin", None)
+
+
+def load_config(tmp_path, data):
+    import yaml
+
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.dump({"discord": {"token": "test_token"}, **data}))
+    return Config.load(str(path))
+
+
+def test_builtin_publishers_are_always_available(monkeypatch):
+    """Test that the built-in publishers don't depend on installed metadata."""
+    monkeypatch.setattr(registry, "entry_points", lambda: EntryPoints([]))
+    registry.reset_registry()
+    try:
+        assert list(registry.available_publishers()) == ["twitter"]
+    finally:
+        registry.reset_registry()
+
+
+def test_plugins_are_imported_only_when_enabled(plugin, tmp_path):
+    """Test that a plugin's module isn't imported until the config uses it."""
+    assert set(registry.available_publishers()) == {"twitter", "echo", "bogus"}
+
+    config = load_config(tmp_path, {"echo": {"enabled": True}})
+    assert configured_publishers(config) == ["echo"]
+    assert "echo_plugin" not in sys.modules
+
+    publishers = get_publishers(config)
+    assert type(publishers["echo"]).__name__ == "EchoPublisher"
+    assert publishers["echo"].name == "echo"
+
+    assert get_publishers(load_config(tmp_path, {})) == {}
+
+
+def test_named_instances_use_plugins(plugin, tmp_path):
+    """Test that named instances can have a plugin's type."""
+    config = load_config(
+        tmp_path,
+        {"publishers": {"first": {"type": "echo"}, "second": {"type": "echo"}}},
+    )
+
+    publishers = get_publishers(config)
+
+    assert sorted(publishers) == ["first", "second"]
+    assert publishers["first"] is not publishers["second"]
+
+
+def test_invalid_publishers_are_rejected(plugin, tmp_path):
+    """Test that unknown types and classes that aren't publishers raise."""
+    with pytest.raises(ValueError, match="missing"):
+        get_publishers(
+            load_config(tmp_path, {"publishers": {"x": {"type": "missing"}}})
+        )
+    with pytest.raises(TypeError, match="bogus"):
+        get_publishers(load_config(tmp_path, {"bogus": {"enabled": True}}))
@@ -0,0 +1,176 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from discopilot.utils.rate_limiter import (
+    RateLimiter,
+    load_limiter_state,
+    save_limiter_state,
+)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the fake sleep is awaited."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def make_limiter(max_calls=2, period=10.0):
+    clock = FakeClock()
+    return RateLimiter(max_calls, period, clock=clock, sleep=clock.sleep), clock
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_refill():
+    """Test that callers wait for a token instead of exceeding the limit."""
+    limiter, clock = make_limiter(max_calls=2, period=10.0)
+
+    await limiter.acquire()
+    await limiter.acquire()
+    assert clock.sleeps == []
+    assert limiter.is_limited()
+
+    await limiter.acquire()
+    assert clock.sleeps == [pytest.approx(5.0)]
+    assert clock.now == pytest.approx(5.0)
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_order():
+    """Test that concurrent callers are paced one refill interval apart."""
+    limiter, clock = make_limiter(max_calls=1, period=1.0)
+    finished = []
+
+    async def call(i):
+        await limiter.acquire()
+        finished.append((i, clock.now))
+
+    await asyncio.gather(*(call(i) for i in range(4)))
+
+    assert [i for i, _ in finished] == [0, 1, 2, 3]
+    assert [now for _, now in finished] == pytest.approx([0.0, 1.0, 2.0, 3.0])
+
+
+@pytest.mark.asyncio
+async def test_acquire_times_out():
+    """Test that acquire gives up when the wait would exceed the timeout."""
+    limiter, clock = make_limiter(max_calls=1, period=60.0)
+    await limiter.acquire()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await limiter.acquire(timeout=1.0)
+    assert clock.sleeps == []
+    assert limiter.get_reset_time() == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_cooldown_blocks_until_expired():
+    """Test that a cooldown holds back calls even with tokens available."""
+    limiter, clock = make_limiter(max_calls=5, period=10.0)
+    limiter.set_cooldown(30)
+
+    assert limiter.is_limited()
+    assert limiter.get_remaining_calls() == 0
+    assert not limiter.try_acquire()
+
+    await limiter.acquire()
+    assert clock.now == pytest.approx(30.0)
+    assert limiter.get_remaining_calls() == 4
+
+
+def test_polling_interface():
+    """Test the synchronous add_call/is_limited interface."""
+    limiter, clock = make_limiter(max_calls=2, period=10.0)
+
+    limiter.add_call()
+    assert limiter.get_remaining_calls() == 1
+    limiter.add_call()
+    assert limiter.is_limited()
+
+    clock.now += 5.0
+    assert not limiter.is_limited()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_update_follows_server_window():
+    """Test that reported quota caps calls until the server's window resets."""
+    limiter, clock = make_limiter(max_calls=100, period=900.0)
+    limiter.update(remaining=1, reset_after=60.0, limit=50)
+
+    assert limiter.max_calls == 50
+    await limiter.acquire()
+    clock.now += 30.0
+    # No refill within the window, even though the local rate would allow it
+    assert limiter.is_limited()
+
+    await limiter.acquire()
+    assert clock.now == pytest.approx(60.0)
+    assert limiter.get_remaining_calls() == 49
+
+
+def test_snapshot_restores_across_processes(tmp_path):
+    """Test that spent budget and cooldowns survive a restart."""
+    path = str(tmp_path / "limits.json")
+    limiter, clock = make_limiter(max_calls=10, period=100.0)
+    for _ in range(10):
+        assert limiter.try_acquire()
+    other, _ = make_limiter(max_calls=5, period=100.0)
+    other.set_cooldown(60)
+    save_limiter_state(
+        path,
+        {
+            "tweets": limiter.snapshot(wall_now=1000.0),
+            "media": other.snapshot(wall_now=1000.0),
+        },
+    )
+
+    # A new process, 20 seconds later, with an unrelated monotonic clock
+    restarted, new_clock = make_limiter(max_calls=10, period=100.0)
+    restarted_other, _ = make_limiter(max_calls=5, period=100.0)
+    new_clock.now = 5000.0
+    limiters = {"tweets": restarted, "media": restarted_other}
+    with patch("discopilot.utils.rate_limiter.time.time", return_value=1020.0):
+        assert load_limiter_state(path, limiters) == 2
+
+    # 20 seconds at 0.1 tokens per second refilled 2 tokens
+    assert restarted.get_remaining_calls() == 2
+    assert restarted_other.get_reset_time() == pytest.approx(40.0)
+
+
+def test_restore_after_server_window_reset():
+    """Test that a server window that ended during the restart is refilled."""
+    limiter, _ = make_limiter(max_calls=10, period=100.0)
+    limiter.update(remaining=0, reset_after=30.0)
+    state = limiter.snapshot(wall_now=1000.0)
+
+    restarted, _ = make_limiter(max_calls=10, period=100.0)
+    restarted.restore(state, wall_now=1010.0)
+    assert restarted.is_limited()
+    assert restarted.get_reset_time() == pytest.approx(20.0)
+
+    restarted.restore(state, wall_now=1100.0)
+    assert restarted.get_remaining_calls() == 10
+
+
+def test_load_ignores_missing_and_corrupt_files(tmp_path):
+    """Test that limiters keep their fresh state if the file can't be used."""
+    limiter, _ = make_limiter()
+    assert load_limiter_state(str(tmp_path / "missing.json"), {"a": limiter}) == 0
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert load_limiter_state(str(corrupt), {"a": limiter}) == 0
+    assert limiter.get_remaining_calls() == 2
@@ -0,0 +1,121 @@
+import tracemalloc
+from unittest.mock import MagicMock
+
+import discord
+
+from discopilot.bot.reaction_filter import (
+    ALL_PUBLISHERS,
+    REJECTED,
+    ReactionFilter,
+    emoji_key,
+)
+
+
+def make_payload(emoji="📢", user_id=42, guild_id=100, channel_id=200):
+    payload = MagicMock()
+    payload.emoji = discord.PartialEmoji.from_str(emoji)
+    payload.user_id = user_id
+    payload.guild_id = guild_id
+    payload.channel_id = channel_id
+    return payload
+
+
+def test_emoji_key_normalizes_unicode_and_custom_emoji():
+    """Test that variation selectors are ignored and custom emoji use their ID."""
+    assert emoji_key("❤️") == emoji_key("❤") == "❤"
+    assert emoji_key("<:announce:123456789012345678>") == 123456789012345678
+    assert emoji_key(discord.PartialEmoji(name="x", id=5)) == 5
+
+
+def test_filter_checks_emoji_and_allow_lists():
+    """Test the trigger emoji, admin, server and channel checks."""
+    rules = ReactionFilter(["📢"], admin_ids=[42], server_ids=[100], channel_ids=[200])
+
+    assert rules.match(make_payload()) == ALL_PUBLISHERS
+    assert rules.match(make_payload(emoji="👍")) == REJECTED
+    assert rules.match(make_payload(user_id=7)) == REJECTED
+    assert rules.match(make_payload(guild_id=101)) == REJECTED
+    assert rules.match(make_payload(channel_id=201)) == REJECTED
+
+
+def test_filter_matches_variation_selector_forms():
+    """Test that an emoji matches with or without a variation selector."""
+    rules = ReactionFilter(["❤"])
+    assert rules.match(make_payload(emoji="❤️")) == ALL_PUBLISHERS
+    rules = ReactionFilter(["❤️"])
+    assert rules.match(make_payload(emoji="❤")) == ALL_PUBLISHERS
+
+
+def test_rules_route_to_publisher_subsets():
+    """Test that channel rules beat guild rules, which beat global triggers."""
+    rules = ReactionFilter(
+        ["📢"],
+        rules=[
+            {"emoji": "📢", "guild_id": 100, "publishers": ["twitter", "mastodon"]},
+            {"emoji": "📢", "channel_id": 200, "publishers": ["twitter"]},
+            {"emoji": "<:bird:123456789012345678>", "channel_id": 201},
+        ],
+    )
+
+    assert rules.match(make_payload()) == (True, frozenset(["twitter"]))
+    assert rules.match(make_payload(channel_id=202)) == (
+        True,
+        frozenset(["twitter", "mastodon"]),
+    )
+    assert rules.match(make_payload(guild_id=101, channel_id=202)) == ALL_PUBLISHERS
+
+    custom = "<:bird:123456789012345678>"
+    assert rules.match(make_payload(emoji=custom, channel_id=201)) == ALL_PUBLISHERS
+    assert rules.match(make_payload(emoji=custom)) == REJECTED
+
+
+def test_publisher_scopes_route_by_guild_and_channel():
+    """Test that reactions only go to the instances that apply where they were added."""
+    rules = ReactionFilter(
+        ["📢"],
+        rules=[{"emoji": "📢", "channel_id": 300, "publishers": ["gaming", "news"]}],
+        publisher_scopes={
+            "gaming": ([100], []),
+            "news": ([], [201]),
+            "global": ([], []),
+        },
+    )
+
+    assert rules.match(make_payload()) == (True, frozenset(["gaming", "global"]))
+    assert rules.match(make_payload(guild_id=101, channel_id=201)) == (
+        True,
+        frozenset(["news", "global"]),
+    )
+    assert rules.match(make_payload(guild_id=101)) == (True, frozenset(["global"]))
+    # Rule publishers are narrowed to the instances in scope
+    assert rules.match(make_payload(channel_id=300)) == (True, frozenset(["gaming"]))
+    assert rules.match(make_payload(guild_id=101, channel_id=300)) == REJECTED
+    assert rules.match(make_payload(emoji="👍")) == REJECTED
+
+
+def test_rejecting_reactions_does_not_allocate():
+    """Test that irrelevant reactions are rejected without allocating memory."""
+    rules = ReactionFilter(["📢"], admin_ids=[42], channel_ids=[200])
+    payloads = [
+        make_payload(emoji="👍"),
+        make_payload(emoji="<:other:123456789012345678>"),
+        make_payload(user_id=7),
+        make_payload(channel_id=201),
+    ]
+    match = rules.match
+    match(payloads[0])
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for payload in payloads * 1000:
+            match(payload)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    filter_allocations = [
+        stat for stat in stats if "reaction_filter.py" in str(stat.traceback)
+    ]
+    assert sum(stat.count_diff for stat in filter_allocations) == 0
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import discord
+import pytest
+
+from discopilot.bot.sharded_client import ShardedHedwigBot
+
+
+def make_guild(shard_id):
+    guild = MagicMock()
+    guild.shard_id = shard_id
+    return guild
+
+
+def test_sharded_bot_runs_a_subset_of_shards():
+    """Test that a process can be given some of the bot's shards."""
+    bot = ShardedHedwigBot(token="test_token", shard_count=4, shard_ids=(2, 3))
+
+    assert isinstance(bot, discord.AutoShardedClient)
+    assert bot.shard_count == 4
+    assert bot.shard_ids == [2, 3]
+
+
+def test_sharded_bot_rejects_invalid_shard_ids():
+    """Test that shard IDs must be given with a count and fit within it."""
+    with pytest.raises(ValueError):
+        ShardedHedwigBot(token="test_token", shard_ids=[0])
+    with pytest.raises(ValueError):
+        ShardedHedwigBot(token="test_token", shard_count=2, shard_ids=[0, 2])
+
+
+@pytest.mark.asyncio
+async def test_shard_status_reports_readiness_and_latency():
+    """Test that each shard's readiness, latency and guilds are reported."""
+    bot = ShardedHedwigBot(token="test_token", shard_count=4, shard_ids=[0, 1])
+    latencies = {0: 0.05, 1: float("inf")}
+    bot.get_shard = lambda shard_id: MagicMock(latency=latencies[shard_id])
+    guilds = [make_guild(0), make_guild(0), make_guild(1)]
+
+    with patch.object(
+        ShardedHedwigBot, "guilds", new_callable=PropertyMock, return_value=guilds
+    ):
+        await bot.on_shard_ready(0)
+        await bot.on_shard_ready(1)
+        await bot.on_shard_disconnect(1)
+        status = bot.shard_status()
+
+    assert [shard["shard_id"] for shard in status] == [0, 1]
+    assert status[0]["ready"] is True
+    assert status[0]["latency"] == 0.05
+    assert status[0]["guilds"] == 2
+    assert status[0]["ready_for"] >= 0
+    assert status[1]["ready"] is False
+    assert status[1]["latency"] is None
+    assert status[1]["guilds"] == 1
+    assert status[1]["ready_for"] is None
+
+
+@pytest.mark.asyncio
+async def test_sharded_bot_filters_reactions_like_hedwig_bot():
+    """Test that the sharded bot keeps the reaction handling of HedwigBot."""
+    bot = ShardedHedwigBot(token="test_token", shard_count=2, admin_ids=[42])
+
+    payload = MagicMock()
+    payload.emoji = discord.PartialEmoji.from_str("👍")
+    payload.user_id = 42
+    await bot.on_raw_reaction_add(payload)
+
+    assert bot.publish_queue.stats()["enqueued"] == 0
@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from discopilot.utils.shared_rate_limiter import SharedLimiterStore, SharedRateLimiter
+
+
+def make_limiter(path, max_calls=5, period=100.0, now=None):
+    store = SharedLimiterStore(path)
+    clock = (lambda: now[0]) if now is not None else None
+    kwargs = {"clock": clock} if clock else {}
+    return SharedRateLimiter(store, "test", max_calls, period, **kwargs), store
+
+
+def spend_tokens(path, start, attempts, results):
+    """Worker process: grab as many tokens as possible from the shared bucket."""
+    start.wait()
+    limiter, store = make_limiter(path, max_calls=50, period=10_000.0)
+    granted = sum(limiter.try_acquire() for _ in range(attempts))
+    store.close()
+    results.put(granted)
+
+
+def acquire_tokens(path, count, results):
+    """Worker process: wait for count tokens with the async interface."""
+
+    async def run():
+        limiter, store = make_limiter(path, max_calls=4, period=1.0)
+        loop = asyncio.get_running_loop()
+        times = []
+        for _ in range(count):
+            await limiter.acquire(timeout=30)
+            times.append(loop.time())
+        store.close()
+        return times
+
+    results.put(len(asyncio.run(run())))
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_shared_between_limiters(tmp_path):
+    """Test that limiters with the same name spend from one bucket."""
+    path = str(tmp_path / "limits.db")
+    now = [1000.0]
+    first, first_store = make_limiter(path, now=now)
+    second, second_store = make_limiter(path, now=now)
+
+    for _ in range(3):
+        await first.acquire()
+    await second.refresh()
+    assert second.get_remaining_calls() == 2
+    assert second.try_acquire()
+    assert second.try_acquire()
+    assert not first.try_acquire()
+
+    # Refill is based on wall-clock time and seen by both
+    now[0] += 20.0
+    assert first.get_remaining_calls() == 1
+
+    second.set_cooldown(60)
+    await second.flush()
+    await first.refresh()
+    assert first.is_limited()
+    assert first.get_reset_time() == pytest.approx(60.0)
+
+    first_store.close()
+    second_store.close()
+
+
+@pytest.mark.asyncio
+async def test_writes_and_status_reads_do_not_block_the_loop(tmp_path):
+    """Test that updates are queued to the store thread and reads use the copy."""
+    path = str(tmp_path / "limits.db")
+    limiter, store = make_limiter(path)
+    other, other_store = make_limiter(path)
+    await limiter.refresh()
+
+    # Hold the store's lock as a long transaction in another thread would
+    with store._lock:
+        limiter.update(remaining=0, reset_after=30.0)
+        limiter.set_cooldown(10)
+        assert limiter.is_limited()
+        assert limiter.get_remaining_calls() == 0
+        assert limiter.get_reset_time() > 0
+
+    await limiter.flush()
+    await other.refresh()
+    assert other.is_limited()
+
+    store.close()
+    other_store.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_shared_window(tmp_path):
+    """Test that a server window reported by one process pauses the others."""
+    path = str(tmp_path / "limits.db")
+    now = [1000.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    first, first_store = make_limiter(path, now=now)
+    second, second_store = make_limiter(path, now=now)
+    second.sleep = fake_sleep
+
+    first.update(remaining=0, reset_after=12.0, limit=10)
+    await first.flush()
+    await second.acquire()
+    # Sleeps are capped so windows reset by other processes are noticed
+    assert sleeps == [pytest.approx(5.0), pytest.approx(5.0), pytest.approx(2.0)]
+    await first.refresh()
+    assert first.get_remaining_calls() == 9
+
+    first.update(remaining=0, reset_after=60.0)
+    await first.flush()
+    with pytest.raises(asyncio.TimeoutError):
+        await second.acquire(timeout=1.0)
+
+    first_store.close()
+    second_store.close()
+
+
+def test_no_tokens_are_overspent_under_contention(tmp_path):
+    """Stress test: concurrent processes never grant more than the budget."""
+    path = str(tmp_path / "limits.db")
+    ctx = multiprocessing.get_context("spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=spend_tokens, args=(path, start, 40, results))
+        for _ in range(6)
+    ]
+    for worker in workers:
+        worker.start()
+    start.set()
+    granted = [results.get(timeout=60) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert all(worker.exitcode == 0 for worker in workers)
+    # 240 attempts against a 50-token bucket with negligible refill
+    assert 50 <= sum(granted) <= 51
+
+
+def test_processes_share_throughput(tmp_path):
+    """Stress test: waiting processes are paced by the shared rate together."""
+    path = str(tmp_path / "limits.db")
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=acquire_tokens, args=(path, 4, results)) for _ in range(3)
+    ]
+
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    counts = [results.get(timeout=60) for _ in workers]
+    elapsed = time.monotonic() - started
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert counts == [4, 4, 4]
+    # 12 tokens at 4 per second after a burst of 4 need at least 2 seconds
+    assert elapsed >= 2.0
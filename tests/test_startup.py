@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from discopilot.bot.discord_client import HedwigBot
+from discopilot.bot.outbox import Outbox
+from discopilot.bot.publish_queue import PublishJob
+from discopilot.scripts.run_bot import _profile_services
+from discopilot.utils.setup import setup_config
+from discopilot.utils.startup import StartupProfile
+
+# Modules that must only be imported once a publisher or setup helper is used
+LAZY_MODULES = ["tweepy", "requests_oauthlib", "pkg_resources"]
+
+# Modules importing the top-level package alone must not load
+PACKAGE_LAZY_MODULES = ["discord", "tweepy", "aiohttp"]
+
+IMPORT_SCRIPT = """
+import json, sys
+{imports}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def imported_modules(*imports):
+    """Get the modules loaded by a fresh interpreter running the imports."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            IMPORT_SCRIPT.format(imports="\n".join(f"import {m}" for m in imports)),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_keeps_sdks_lazy():
+    """Test that importing the package doesn't load publisher SDKs."""
+    modules = imported_modules("discopilot")
+    for module in PACKAGE_LAZY_MODULES:
+        assert module not in modules
+
+    modules = imported_modules(
+        "discopilot.bot",
+        "discopilot.publishers",
+        "discopilot.utils",
+        "discopilot.scripts.run_bot",
+    )
+    for module in LAZY_MODULES:
+        assert module not in modules
+
+
+def test_publisher_classes_load_on_first_access():
+    """Test that publisher classes are still importable from the package."""
+    import discopilot.publishers as publishers
+    from discopilot.publishers.twitter_publisher import TwitterPublisher
+
+    assert publishers.TwitterPublisher is TwitterPublisher
+
+
+def test_startup_profile_reports_stages():
+    """Test that each stage's time is recorded and reported."""
+    now = [0.0]
+    profile = StartupProfile(clock=lambda: now[0])
+
+    with profile.stage("load config"):
+        now[0] += 0.25
+    with profile.stage("init client"):
+        now[0] += 0.5
+
+    assert [(name, seconds) for name, seconds, _ in profile.stages] == [
+        ("load config", 0.25),
+        ("init client", 0.5),
+    ]
+    report = profile.report()
+    assert "load config" in report
+    assert "250.0" in report
+    assert "750.0" in report.splitlines()[-1]
+
+
+def test_setup_config_copies_packaged_example(tmp_path, monkeypatch):
+    """Test that the example config is found without pkg_resources."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    path = setup_config()
+
+    assert path == str(tmp_path / ".config" / "discopilot" / "config.yaml")
+    with open(path) as f:
+        assert "discord:" in f.read()
+
+
+@pytest.mark.asyncio
+async def test_profiling_services_leaves_outbox_and_publishers_alone(tmp_path):
+    """Test that --startup-profile doesn't replay jobs or start publishers."""
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(path=path)
+    await outbox.open()
+    await outbox.add(PublishJob(message_id=1, channel_id=200))
+    await outbox.close()
+
+    client = HedwigBot(token="test_token", outbox=Outbox(path=path))
+    publisher = MagicMock()
+    publisher.start = AsyncMock()
+    publisher.close = AsyncMock()
+    client.add_publisher("fake", publisher)
+    profile = StartupProfile()
+
+    await _profile_services(client, profile)
+    await asyncio.sleep(0.05)
+
+    publisher.start.assert_not_awaited()
+    assert [name for name, _, _ in profile.stages] == ["open downloader"]
+    await outbox.open()
+    assert len(await outbox.due_jobs()) == 1
+    await outbox.close()
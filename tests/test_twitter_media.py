@@ -0,0 +1,188 @@
+import os
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discopilot.publishers.twitter_media import (
+    ChunkedUploader,
+    MediaUploadError,
+    OAuth1Signer,
+    get_media_category,
+)
+
+
+class FakeMediaEndpoint:
+    """Local stand-in for Twitter's chunked media upload endpoint."""
+
+    def __init__(self):
+        self.segments = {}
+        self.commands = []
+        self.failures = {}
+        self.failure_status = 503
+        self.processing_states = ["pending", "in_progress", "succeeded"]
+        self.authorized = True
+
+    async def handle(self, request):
+        command = request.query["command"]
+        self.commands.append(command)
+        self.authorized = self.authorized and request.headers.get(
+            "Authorization", ""
+        ).startswith("OAuth ")
+
+        if command == "INIT":
+            self.total_bytes = int(request.query["total_bytes"])
+            self.media_category = request.query["media_category"]
+            return web.json_response({"media_id_string": "42"})
+
+        if command == "APPEND":
+            index = int(request.query["segment_index"])
+            if self.failures.get(index):
+                self.failures[index] -= 1
+                return web.Response(
+                    status=self.failure_status,
+                    headers={"x-rate-limit-reset": "1700000000"},
+                    text="Failed",
+                )
+            form = await request.post()
+            self.segments[index] = form["media"].file.read()
+            return web.Response(status=204)
+
+        if command == "FINALIZE":
+            return web.json_response(
+                {"media_id_string": "42", "processing_info": self._next_state()}
+            )
+
+        if command == "STATUS":
+            return web.json_response(
+                {"media_id_string": "42", "processing_info": self._next_state()}
+            )
+
+        return web.Response(status=400)
+
+    def _next_state(self):
+        state = self.processing_states.pop(0)
+        info = {"state": state, "check_after_secs": 0}
+        if state == "failed":
+            info["error"] = {"message": "InvalidMedia"}
+        return info
+
+    @property
+    def uploaded(self):
+        return b"".join(self.segments[i] for i in sorted(self.segments))
+
+
+@pytest_asyncio.fixture
+async def media_endpoint():
+    """Run a FakeMediaEndpoint on a local port."""
+    endpoint = FakeMediaEndpoint()
+    app = web.Application()
+    app.router.add_route("*", "/1.1/media/upload.json", endpoint.handle)
+    server = TestServer(app)
+    await server.start_server()
+    endpoint.url = str(server.make_url("/1.1/media/upload.json"))
+    yield endpoint
+    await server.close()
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """A 1 MB fake video file with non-repeating content."""
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(os.urandom(1024 * 1024))
+    return str(path)
+
+
+def make_uploader(session, endpoint, **kwargs):
+    signer = OAuth1Signer("key", "secret", "token", "token_secret")
+    return ChunkedUploader(
+        session,
+        signer,
+        upload_url=endpoint.url,
+        chunk_size=256 * 1024,
+        retry_delay=0,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_streams_file_and_waits_for_processing(
+    media_endpoint, video_file
+):
+    """Test the full INIT/APPEND/FINALIZE/STATUS flow."""
+    async with aiohttp.ClientSession() as session:
+        media_id = await make_uploader(session, media_endpoint).upload(video_file)
+
+    assert media_id == "42"
+    assert media_endpoint.commands == ["INIT"] + ["APPEND"] * 4 + [
+        "FINALIZE",
+        "STATUS",
+        "STATUS",
+    ]
+    assert media_endpoint.media_category == "tweet_video"
+    assert media_endpoint.total_bytes == 1024 * 1024
+    with open(video_file, "rb") as f:
+        assert media_endpoint.uploaded == f.read()
+    assert media_endpoint.authorized
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_retries_only_failed_segment(media_endpoint, video_file):
+    """Test that a transient APPEND failure resends just that segment."""
+    media_endpoint.failures = {2: 2}
+
+    async with aiohttp.ClientSession() as session:
+        await make_uploader(session, media_endpoint).upload(video_file)
+
+    assert media_endpoint.commands.count("APPEND") == 6
+    with open(video_file, "rb") as f:
+        assert media_endpoint.uploaded == f.read()
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_gives_up_after_max_retries(media_endpoint, video_file):
+    """Test that a segment failing past max_retries aborts the upload."""
+    media_endpoint.failures = {0: 5}
+
+    async with aiohttp.ClientSession() as session:
+        uploader = make_uploader(session, media_endpoint, max_retries=2)
+        with pytest.raises(MediaUploadError, match="Segment 0"):
+            await uploader.upload(video_file)
+
+    assert media_endpoint.commands == ["INIT"] + ["APPEND"] * 3
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_does_not_retry_rate_limited_segment(
+    media_endpoint, video_file
+):
+    """Test that a 429 is raised with its status and headers, without retries."""
+    media_endpoint.failures = {1: 5}
+    media_endpoint.failure_status = 429
+
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(MediaUploadError) as error:
+            await make_uploader(session, media_endpoint).upload(video_file)
+
+    assert error.value.status == 429
+    assert error.value.headers["x-rate-limit-reset"] == "1700000000"
+    assert media_endpoint.commands.count("APPEND") == 2
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_reports_processing_failure(media_endpoint, video_file):
+    """Test that failed server-side processing raises MediaUploadError."""
+    media_endpoint.processing_states = ["in_progress", "failed"]
+
+    async with aiohttp.ClientSession() as session:
+        with pytest.raises(MediaUploadError, match="InvalidMedia"):
+            await make_uploader(session, media_endpoint).upload(video_file)
+
+
+def test_get_media_category():
+    """Test mapping files to Twitter media categories."""
+    assert get_media_category("clip.mp4") == "tweet_video"
+    assert get_media_category("funny.gif") == "tweet_gif"
+    assert get_media_category("photo.jpg") == "tweet_image"
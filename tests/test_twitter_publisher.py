@@ -1,9 +1,33 @@
 #!/usr/bin/env python3
-from unittest.mock import MagicMock, mock_open, patch
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+import tweepy
 
+from discopilot.publishers.twitter_media import MediaUploadError
 from discopilot.publishers.twitter_publisher import TwitterPublisher
+from discopilot.utils.rate_limiter import RateLimiter, RateLimitExceeded
+
+
+class FakeDownloader:
+    """Stand-in for MediaDownloader that serves local files by filename."""
+
+    def __init__(self, files, delays=None):
+        self.files = files
+        self.delays = delays or {}
+        self.cancelled = []
+
+    async def download_one(self, attachment):
+        try:
+            await asyncio.sleep(self.delays.get(attachment.filename, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(attachment.filename)
+            raise
+        return self.files[attachment.filename]
 
 
 @pytest.mark.asyncio
@@ -107,7 +131,7 @@ async def test_twitter_publisher_publish_with_attachment(mock_config):
 
     # Mock media upload
     mock_media = MagicMock()
-    mock_media.media_id = "media123"
+    mock_media.media_id_string = "media123"
     publisher.api.media_upload.return_value = mock_media
 
     # Create a mock message with attachment
@@ -122,44 +146,170 @@ async def test_twitter_publisher_publish_with_attachment(mock_config):
     message.attachments = [mock_attachment]
     message.embeds = []
 
-    # Let's look at the actual implementation of TwitterPublisher
-    # and patch the specific methods it uses for handling attachments
+    # Serve the attachment from a local temp file instead of the network
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp:
+        temp.write(b"fake_image_data")
+    publisher.downloader = FakeDownloader({"image.jpg": temp.name})
+
+    # Test publishing
+    status, url = await publisher.publish(message)
+
+    # Verify results
+    assert status == "Success"
+    assert url == "https://twitter.com/user/status/12345"
+
+    # Check that the tweet contains the correct text and media
+    call_args = publisher.client.create_tweet.call_args[1]
+    assert call_args["text"] == "Test with attachment"
+    assert call_args["media_ids"] == ["media123"]
+    publisher.api.media_upload.assert_called_once_with(filename=temp.name)
+
+    # The temp file is removed once uploaded
+    assert not os.path.exists(temp.name)
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_pipelines_media_transfers(mock_config):
+    """Test that each upload starts as soon as its own download finishes."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+
+    mock_response = MagicMock()
+    mock_response.data = {"id": "12345"}
+    publisher.client.create_tweet.return_value = mock_response
+
+    def slow_upload(filename):
+        time.sleep(0.2)
+        uploaded = MagicMock()
+        uploaded.media_id_string = os.path.basename(filename)
+        return uploaded
+
+    publisher.api.media_upload.side_effect = slow_upload
+
+    # Downloads take 0.1s, 0.2s and 0.3s; uploads take 0.2s each
+    files = {}
+    for name in ("a.png", "b.png", "c.png", "d.png", "e.png"):
+        with tempfile.NamedTemporaryFile(suffix=name, delete=False) as temp:
+            files[name] = temp.name
+    publisher.downloader = FakeDownloader(
+        files, delays={"a.png": 0.1, "b.png": 0.2, "c.png": 0.3}
+    )
+
+    message = MagicMock()
+    message.content = "Test with attachments"
+    message.embeds = []
+    message.attachments = []
+    for name in files:
+        attachment = MagicMock()
+        attachment.filename = name
+        message.attachments.append(attachment)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    status, _ = await publisher.publish(message)
+    elapsed = loop.time() - start
+
+    assert status == "Success"
+    # Sequential transfers would take 1.4s; the slowest pipeline takes 0.5s
+    assert elapsed < 0.9
+    # Only Twitter's four media limit is uploaded, in attachment order
+    media_ids = publisher.client.create_tweet.call_args[1]["media_ids"]
+    assert media_ids == [os.path.basename(files[n]) for n in list(files)[:4]]
+    await publisher.close()
+    os.remove(files["e.png"])
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_uploads_videos_in_chunks(mock_config):
+    """Test that videos go through the chunked uploader, not media_upload."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+
+    mock_response = MagicMock()
+    mock_response.data = {"id": "12345"}
+    publisher.client.create_tweet.return_value = mock_response
+
+    publisher._uploader = MagicMock()
+    publisher._uploader.upload = AsyncMock(return_value="video123")
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp:
+        temp.write(b"fake_video_data")
+    publisher.downloader = FakeDownloader({"clip.mp4": temp.name})
+
+    message = MagicMock()
+    message.content = "Test with video"
+    message.embeds = []
+    attachment = MagicMock()
+    attachment.filename = "clip.mp4"
+    message.attachments = [attachment]
+
+    status, _ = await publisher.publish(message)
+
+    assert status == "Success"
+    publisher._uploader.upload.assert_awaited_once_with(temp.name)
+    publisher.api.media_upload.assert_not_called()
+    assert publisher.client.create_tweet.call_args[1]["media_ids"] == ["video123"]
+    assert not os.path.exists(temp.name)
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_cancels_transfers_on_failure(mock_config):
+    """Test that a failed upload cancels the remaining transfers."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+    publisher.api.media_upload.side_effect = Exception("Upload failed")
+
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp:
+        fast_file = temp.name
+    publisher.downloader = FakeDownloader(
+        {"fast.png": fast_file, "slow.png": "unused"}, delays={"slow.png": 10}
+    )
+
+    message = MagicMock()
+    message.content = "Test with attachments"
+    message.embeds = []
+    message.attachments = []
+    for name in ("fast.png", "slow.png"):
+        attachment = MagicMock()
+        attachment.filename = name
+        message.attachments.append(attachment)
 
-    # Option 1: If it uses tempfile
-    with (
-        patch("tempfile.NamedTemporaryFile") as mock_temp_file,
-        patch("requests.get") as mock_get,
-        patch("builtins.open", mock_open(read_data=b"fake_image_data")),
-    ):
+    status, url = await asyncio.wait_for(publisher.publish(message), timeout=2)
 
-        # Setup mock temp file
-        mock_file = MagicMock()
-        mock_file.name = "temp_image.jpg"
-        mock_file.__enter__.return_value = mock_file
-        mock_temp_file.return_value = mock_file
+    assert status == "Error uploading media: Upload failed"
+    assert url is None
+    assert publisher.downloader.cancelled == ["slow.png"]
+    publisher.client.create_tweet.assert_not_called()
 
-        # Setup mock response
-        mock_response = MagicMock()
-        mock_response.content = b"fake_image_data"
-        mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
 
-        # Test publishing
-        status, url = await publisher.publish(message)
+@pytest.mark.asyncio
+async def test_twitter_publisher_fails_on_missing_download(mock_config):
+    """Test that a failed download stops the tweet instead of dropping media."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+    publisher.downloader = FakeDownloader(
+        {"missing.png": None, "slow.png": "unused"}, delays={"slow.png": 10}
+    )
 
-        # Verify results
-        assert status == "Success"
-        assert url == "https://twitter.com/user/status/12345"
+    message = MagicMock()
+    message.content = "Test with attachments"
+    message.embeds = []
+    message.attachments = []
+    for name in ("missing.png", "slow.png"):
+        attachment = MagicMock()
+        attachment.filename = name
+        message.attachments.append(attachment)
 
-        # Check that the tweet contains the correct text
-        call_args = publisher.client.create_tweet.call_args[1]
-        assert "text" in call_args
-        assert call_args["text"] == "Test with attachment"
+    status, url = await asyncio.wait_for(publisher.publish(message), timeout=2)
 
-        # If media_ids is in the call args, check it
-        if "media_ids" in call_args:
-            assert call_args["media_ids"] == ["media123"]
-            publisher.api.media_upload.assert_called_once()
+    assert status == "Error uploading media: Failed to download missing.png"
+    assert url is None
+    assert publisher.downloader.cancelled == ["slow.png"]
+    publisher.client.create_tweet.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -189,6 +339,306 @@ async def test_twitter_publisher_publish_error(mock_config):
     assert url is None
 
 
+@pytest.mark.asyncio
+async def test_twitter_publisher_publish_does_not_block_event_loop(mock_config):
+    """Test that slow Twitter API calls don't stall other coroutines."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+
+    mock_response = MagicMock()
+    mock_response.data = {"id": "12345"}
+
+    def slow_create_tweet(**kwargs):
+        time.sleep(0.3)
+        return mock_response
+
+    publisher.client.create_tweet.side_effect = slow_create_tweet
+
+    message = MagicMock()
+    message.content = "Test message"
+    message.attachments = []
+    message.embeds = []
+
+    # Measure how late a 10ms ticker wakes up while publishes are in flight
+    max_lag = 0.0
+
+    async def ticker():
+        nonlocal max_lag
+        loop = asyncio.get_running_loop()
+        for _ in range(20):
+            start = loop.time()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, loop.time() - start - 0.01)
+
+    results = await asyncio.gather(
+        publisher.publish(message), publisher.publish(message), ticker()
+    )
+    await publisher.close()
+
+    assert results[0] == ("Success", "https://twitter.com/user/status/12345")
+    assert results[1] == ("Success", "https://twitter.com/user/status/12345")
+    assert max_lag < 0.1
+
+
 # For running the test directly
 if __name__ == "__main__":
     pytest.main()
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_waits_for_rate_limiter(mock_config):
+    """Test that tweets wait for the local rate limiter instead of failing."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+    response = MagicMock()
+    response.data = {"id": "12345"}
+    publisher.client.create_tweet.return_value = response
+
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    publisher.limiters["create_tweet"] = RateLimiter(
+        1, 60, clock=lambda: now[0], sleep=fake_sleep
+    )
+    publisher.max_rate_limit_wait = 120
+
+    message = MagicMock()
+    message.content = "Test message"
+    message.attachments = []
+    message.embeds = []
+
+    assert (await publisher.publish(message))[0] == "Success"
+    assert (await publisher.publish(message))[0] == "Success"
+    assert sleeps == [pytest.approx(60.0)]
+    assert publisher.client.create_tweet.call_count == 2
+
+
+def make_response(url, status=200, **headers):
+    response = MagicMock()
+    response.url = url
+    response.status_code = status
+    response.headers = headers
+    return response
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_tracks_quota_from_headers(mock_config):
+    """Test that rate limit headers seen on executor threads update the limiter."""
+    publisher = TwitterPublisher(mock_config)
+    loop = asyncio.get_running_loop()
+    publisher._loop = loop
+    reset = time.time() + 600
+
+    response = make_response(
+        "https://api.twitter.com/2/tweets",
+        **{
+            "x-rate-limit-limit": "100",
+            "x-rate-limit-remaining": "1",
+            "x-rate-limit-reset": str(int(reset)),
+        },
+    )
+    await loop.run_in_executor(None, publisher._on_response, response)
+    await asyncio.sleep(0)
+
+    limiter = publisher.limiters["create_tweet"]
+    assert limiter.max_calls == 100
+    assert limiter.get_remaining_calls() == 1
+    assert limiter.try_acquire()
+    assert 590 < limiter.get_reset_time() <= 600
+    # Other endpoints are unaffected
+    assert not publisher.limiters["media_upload"].is_limited()
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_reschedules_on_429(mock_config):
+    """Test that a 429 pauses the endpoint and asks for the job to be retried."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+    response = make_response(
+        "https://api.twitter.com/2/tweets",
+        status=429,
+        **{
+            "x-rate-limit-remaining": "0",
+            "x-rate-limit-reset": str(int(time.time() + 300)),
+        },
+    )
+    publisher.client.create_tweet.side_effect = tweepy.TooManyRequests(response)
+
+    message = MagicMock()
+    message.content = "Test message"
+    message.attachments = []
+    message.embeds = []
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await publisher.publish(message)
+    assert 290 < excinfo.value.retry_after <= 300
+    assert publisher.limiters["create_tweet"].is_limited()
+
+    # While paused, publishing is rescheduled without calling the API
+    publisher.client.create_tweet.reset_mock()
+    with pytest.raises(RateLimitExceeded):
+        await publisher.publish(message)
+    publisher.client.create_tweet.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_reschedules_rate_limited_video(mock_config):
+    """Test that a 429 from the chunked uploader reschedules with its reset time."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.client = MagicMock()
+    publisher.api = MagicMock()
+    publisher._uploader = MagicMock()
+    publisher._uploader.upload = AsyncMock(
+        side_effect=MediaUploadError(
+            "APPEND failed with HTTP 429",
+            429,
+            {
+                "x-rate-limit-remaining": "0",
+                "x-rate-limit-reset": str(int(time.time() + 300)),
+            },
+        )
+    )
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as temp:
+        temp.write(b"fake_video_data")
+    publisher.downloader = FakeDownloader({"clip.mp4": temp.name})
+    message = MagicMock()
+    message.content = "Test with video"
+    message.embeds = []
+    attachment = MagicMock()
+    attachment.filename = "clip.mp4"
+    message.attachments = [attachment]
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await publisher.publish(message)
+    assert 290 < excinfo.value.retry_after <= 300
+    assert publisher.limiters["media_upload"].is_limited()
+    publisher.client.create_tweet.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_status_reads_cached_snapshot(mock_config):
+    """Test that polling the rate limit status doesn't call the API each time."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.api = MagicMock()
+    publisher.api.rate_limit_status.return_value = {"resources": {"statuses": {}}}
+    publisher.rate_limit_refresh_interval = 0.1
+
+    await publisher.start()
+    await asyncio.sleep(0.05)
+    for _ in range(100):
+        status = await publisher.get_rate_limit_status()
+    assert publisher.api.rate_limit_status.call_count == 1
+    assert status["resources"] == {"statuses": {}}
+    assert status["age"] < 0.5
+    assert status["limiters"]["create_tweet"]["remaining"] == 200
+
+    # The rate limit check answers from the local limiters
+    assert await publisher.check_rate_limit() is False
+    publisher.limiters["create_tweet"].set_cooldown(60)
+    assert await publisher.check_rate_limit() is True
+    assert publisher.api.rate_limit_status.call_count == 1
+
+    # The background task keeps the snapshot fresh
+    await asyncio.sleep(0.1)
+    assert publisher.api.rate_limit_status.call_count == 2
+    await publisher.close()
+    assert publisher._refresh_task is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_status_fetches_once_without_background_task(mock_config):
+    """Test that the first status read fetches it when nothing is cached."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.api = MagicMock()
+    publisher.api.rate_limit_status.return_value = {"resources": {}}
+
+    await publisher.get_rate_limit_status()
+    await publisher.get_rate_limit_status()
+    assert publisher.api.rate_limit_status.call_count == 1
+    await publisher.close()
+
+
+@pytest.mark.asyncio
+async def test_twitter_publisher_persists_limiters(mock_config):
+    """Test that limiter state is saved on shutdown and restored on startup."""
+    publisher = TwitterPublisher(mock_config)
+    publisher.api = None
+    await publisher.start()
+    publisher.limiters["create_tweet"].set_cooldown(600)
+    await publisher.close()
+
+    restarted = TwitterPublisher(mock_config)
+    restarted.api = None
+    assert not restarted.limiters["create_tweet"].is_limited()
+    await restarted.start()
+    assert 590 < restarted.limiters["create_tweet"].get_reset_time() <= 600
+    await restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_named_instances_are_separate_accounts(tmp_path, monkeypatch):
+    """Test that each named instance gets its own client, limiters and state file."""
+    import yaml
+
+    from discopilot.publishers import get_publishers
+    from discopilot.utils.config import Config
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    path = tmp_path / "config.yaml"
+    account = {
+        "access_token": "token",
+        "access_secret": "secret",
+        "bearer_token": "bearer",
+    }
+    path.write_text(
+        yaml.dump(
+            {
+                "discord": {"token": "test_token"},
+                "publishers": {
+                    "gaming_twitter": {"type": "twitter", "api_key": "a", **account},
+                    "news_twitter": {"type": "twitter", "api_key": "b", **account},
+                },
+            }
+        )
+    )
+
+    publishers = get_publishers(Config.load(str(path)))
+    gaming, news = publishers["gaming_twitter"], publishers["news_twitter"]
+
+    assert (gaming.api_key, news.api_key) == ("a", "b")
+    assert gaming.limiters["create_tweet"] is not news.limiters["create_tweet"]
+    assert gaming.rate_limit_state_path == str(
+        tmp_path / ".local/share/discopilot/gaming_twitter_limits.json"
+    )
+    assert news.rate_limit_state_path.endswith("news_twitter_limits.json")
+    await gaming.close()
+    await news.close()
+
+
+@pytest.mark.asyncio
+async def test_share_rate_limits_replaces_per_process_state(mock_config, tmp_path):
+    """Test that shared limiters are used and no per-process state file is kept."""
+    from discopilot.utils.shared_rate_limiter import SharedRateLimiter
+
+    publisher = TwitterPublisher(mock_config)
+    publisher.api = None
+    publisher.share_rate_limits(str(tmp_path / "limits.db"))
+
+    assert all(
+        isinstance(limiter, SharedRateLimiter)
+        for limiter in publisher.limiters.values()
+    )
+    await publisher.start()
+    publisher.limiters["create_tweet"].set_cooldown(600)
+    await publisher.close()
+
+    assert not os.path.exists(publisher.rate_limit_state_path)
+    assert os.path.exists(tmp_path / "limits.db")